@@ -9,3 +9,14 @@ class AiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "ai"
     verbose_name = "AI"
+
+    def ready(self):
+        from jobs import engine
+        from jobs.models import AIJob
+
+        from . import pipeline
+
+        engine.register(AIJob.JobKind.OUTLINE)(pipeline.run_outline)
+        engine.register_stage(AIJob.JobKind.OUTLINE)(pipeline.fan_out)
+        engine.register(AIJob.JobKind.LESSON)(pipeline.run_lesson)
+        engine.register_stage(AIJob.JobKind.LESSON)(pipeline.apply_lesson)
@@ -0,0 +1,133 @@
+"""
+Amazon Bedrock backend for ``ai.client`` (Anthropic messages API, streamed).
+
+One boto3 ``bedrock-runtime`` client per region and endpoint per process.
+Its connection pool is sized to ``AI_MAX_CONCURRENCY``, and botocore's own
+retries are off because ``ModelClient`` retries throttling itself.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+from functools import lru_cache
+from typing import Any
+
+from django.conf import settings
+
+from .client import Chunk, ModelError, ModelRequest, ThrottledError, Usage
+
+try:  # Optional dependency
+    import boto3
+    from botocore.config import Config
+    from botocore.exceptions import BotoCoreError, ClientError
+except Exception:  # pragma: no cover
+    boto3 = None
+
+ANTHROPIC_VERSION = "bedrock-2023-05-31"
+# Lower-cased: errors raised before the stream starts use "ThrottlingException",
+# while botocore raises those arriving mid-stream as an EventStreamError (a
+# ClientError) carrying the event name, e.g. "throttlingException"
+THROTTLING_CODES = {
+    "throttlingexception",
+    "toomanyrequestsexception",
+    "serviceunavailableexception",
+    "modelnotreadyexception",
+}
+STREAM_ERRORS = {
+    "throttlingException": ThrottledError,
+    "serviceUnavailableException": ThrottledError,
+    "modelStreamErrorException": ModelError,
+    "modelTimeoutException": ModelError,
+    "internalServerException": ModelError,
+    "validationException": ModelError,
+}
+
+
+@lru_cache(maxsize=4)
+def runtime_client(
+    region: str, endpoint_url: str | None, max_connections: int, read_timeout: float
+) -> Any:
+    if boto3 is None:
+        raise RuntimeError("The boto3 package is required for the Bedrock backend")
+    config = Config(
+        max_pool_connections=max_connections,
+        read_timeout=read_timeout,
+        connect_timeout=5,
+        retries={"total_max_attempts": 1, "mode": "standard"},
+    )
+    return boto3.client(
+        "bedrock-runtime", region_name=region, endpoint_url=endpoint_url, config=config
+    )
+
+
+def client_error(code: str, message: str) -> ModelError:
+    """The ``ai.client`` error for a Bedrock error code, in either spelling."""
+    if code.lower() in THROTTLING_CODES:
+        return ThrottledError(message)
+    return ModelError(message)
+
+
+def request_body(request: ModelRequest) -> dict[str, Any]:
+    body: dict[str, Any] = {
+        "anthropic_version": ANTHROPIC_VERSION,
+        "max_tokens": request.max_tokens,
+        "temperature": request.temperature,
+        "messages": [{"role": "user", "content": request.prompt}],
+    }
+    if request.system:
+        body["system"] = request.system
+    return body
+
+
+def parse_events(events: Any) -> Iterator[Chunk]:
+    """Turn Bedrock response-stream events into ``Chunk``s."""
+    usage, stop_reason = Usage(), None
+    for event in events:
+        for name, error in STREAM_ERRORS.items():
+            if name in event:
+                raise error(event[name].get("message", name))
+        payload = json.loads(event["chunk"]["bytes"])
+        kind = payload.get("type")
+        if kind == "message_start":
+            usage.input_tokens = (
+                payload["message"].get("usage", {}).get("input_tokens", 0)
+            )
+        elif kind == "content_block_delta":
+            text = payload.get("delta", {}).get("text", "")
+            if text:
+                yield Chunk(text=text)
+        elif kind == "message_delta":
+            usage.output_tokens = payload.get("usage", {}).get(
+                "output_tokens", usage.output_tokens
+            )
+            stop_reason = payload.get("delta", {}).get("stop_reason") or stop_reason
+    yield Chunk(usage=usage, stop_reason=stop_reason)
+
+
+class BedrockBackend:
+    name = "bedrock"
+
+    def __init__(self) -> None:
+        self.client = runtime_client(
+            getattr(settings, "BEDROCK_REGION", "us-east-1"),
+            getattr(settings, "BEDROCK_ENDPOINT_URL", None),
+            int(getattr(settings, "AI_MAX_CONCURRENCY", 8)),
+            float(getattr(settings, "AI_READ_TIMEOUT_SECONDS", 120.0)),
+        )
+
+    def stream(self, request: ModelRequest, model_id: str) -> Iterator[Chunk]:
+        try:
+            response = self.client.invoke_model_with_response_stream(
+                modelId=model_id,
+                body=json.dumps(request_body(request)),
+                contentType="application/json",
+                accept="application/json",
+            )
+            yield from parse_events(response["body"])
+        except ClientError as exc:
+            raise client_error(
+                exc.response.get("Error", {}).get("Code", ""), str(exc)
+            ) from exc
+        except BotoCoreError as exc:
+            raise ModelError(str(exc)) from exc
@@ -0,0 +1,285 @@
+"""
+Model client layer.
+
+``get_client()`` returns this process's ``ModelClient``, which wraps the
+backend named by ``AI_BACKEND`` (``ai.bedrock.BedrockBackend`` in production,
+``ai.fake.FakeBackend`` for tests and offline load tests). Every call goes
+through the same limits, sized to the account's Bedrock quotas:
+
+* a semaphore of ``AI_MAX_CONCURRENCY`` in-flight calls (also the size of the
+  backend's HTTP connection pool);
+* token buckets for ``AI_REQUESTS_PER_MINUTE`` and ``AI_TOKENS_PER_MINUTE``,
+  charged the prompt estimate plus ``max_tokens`` up front;
+* retries of throttled calls, up to ``AI_MAX_RETRIES`` with full-jitter
+  exponential backoff, as long as no text has been delivered yet.
+
+``stream`` yields text as the model produces it, so handlers can report
+progress and persist partial output; ``complete`` collects the whole reply.
+Limits are per process: divide account quotas by the number of worker
+processes when setting them.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.utils.module_loading import import_string
+
+from core import metrics
+
+logger = logging.getLogger("omnicourse.ai")
+
+
+class ModelError(Exception):
+    """The model call failed."""
+
+
+class ThrottledError(ModelError):
+    """The service refused the call for capacity reasons; worth retrying later."""
+
+
+@dataclass(frozen=True)
+class ModelRequest:
+    prompt: str
+    system: str = ""
+    max_tokens: int = 2048
+    temperature: float = 0.7
+    # Defaults to BEDROCK_MODEL_ID
+    model_id: str = ""
+    # Free-form hints (job kind, seed) that fakes may use; never sent to Bedrock
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+    def estimated_tokens(self) -> int:
+        # ~4 characters per token is close enough for rate limiting
+        return (len(self.prompt) + len(self.system)) // 4 + self.max_tokens
+
+
+@dataclass
+class Usage:
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {"input_tokens": self.input_tokens, "output_tokens": self.output_tokens}
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A piece of streamed output; the last chunk of a call carries its ``usage``."""
+
+    text: str = ""
+    usage: Usage | None = None
+    stop_reason: str | None = None
+
+
+@dataclass(frozen=True)
+class Completion:
+    text: str
+    usage: Usage
+    model_id: str
+    stop_reason: str | None
+
+
+class Backend(Protocol):
+    name: str
+
+    def stream(self, request: ModelRequest, model_id: str) -> Iterator[Chunk]: ...
+
+
+class TokenBucket:
+    """Refills ``rate`` units per second up to ``capacity``; ``acquire`` waits for units."""
+
+    def __init__(
+        self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _take(self, amount: float) -> float:
+        """Take ``amount`` if available and return 0, else the seconds to wait."""
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            # A request larger than the bucket may go once the bucket is full
+            amount = min(amount, self.capacity)
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0.0
+            return (amount - self._tokens) / self.rate
+
+    def acquire(self, amount: float = 1.0, timeout: float | None = None) -> bool:
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            wait = self._take(amount)
+            if not wait:
+                return True
+            if deadline is not None and self.clock() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+def _bucket(per_minute: float) -> TokenBucket | None:
+    # Burst of up to one minute's quota, as Bedrock quotas are per minute
+    return TokenBucket(per_minute / 60, per_minute) if per_minute > 0 else None
+
+
+class ModelClient:
+    def __init__(
+        self,
+        backend: Backend,
+        *,
+        max_concurrency: int = 8,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_retries: int = 4,
+        retry_base: float = 0.5,
+        retry_max: float = 20.0,
+        acquire_timeout: float = 60.0,
+    ) -> None:
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._requests = _bucket(requests_per_minute)
+        self._tokens = _bucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.acquire_timeout = acquire_timeout
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.retry_max, self.retry_base * 2**attempt))
+
+    def _admit(self, request: ModelRequest) -> None:
+        for bucket, amount in (
+            (self._requests, 1),
+            (self._tokens, request.estimated_tokens()),
+        ):
+            if bucket is not None and not bucket.acquire(amount, self.acquire_timeout):
+                raise ThrottledError(
+                    "Local rate limit: no capacity within the acquire timeout"
+                )
+
+    def stream(self, request: ModelRequest) -> Iterator[Chunk]:
+        """Yield the reply as it is generated; the last chunk carries the usage."""
+        model_id = request.model_id or getattr(settings, "BEDROCK_MODEL_ID", "")
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise ThrottledError("All model slots busy within the acquire timeout")
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            attempt = 0
+            while True:
+                self._admit(request)
+                delivered = False
+                try:
+                    for chunk in self.backend.stream(request, model_id):
+                        delivered = delivered or bool(chunk.text)
+                        if chunk.usage is not None:
+                            metrics.AI_TOKENS.inc(
+                                model_id, "input", amount=chunk.usage.input_tokens
+                            )
+                            metrics.AI_TOKENS.inc(
+                                model_id, "output", amount=chunk.usage.output_tokens
+                            )
+                        yield chunk
+                    outcome = "ok"
+                    return
+                except ThrottledError:
+                    metrics.AI_THROTTLES.inc(model_id)
+                    # Text already handed to the caller cannot be taken back
+                    if delivered or attempt >= self.max_retries:
+                        outcome = "throttled"
+                        raise
+                    delay = self._backoff(attempt)
+                    attempt += 1
+                    logger.info(
+                        "Model call throttled, retry %d in %.2fs", attempt, delay
+                    )
+                    time.sleep(delay)
+        finally:
+            self._slots.release()
+            metrics.AI_REQUEST_DURATION.observe(
+                time.perf_counter() - start, model_id, outcome
+            )
+            # Calls mostly run in workers, which never serve /metrics
+            metrics.REGISTRY.flush()
+
+    def complete(
+        self, request: ModelRequest, on_text: Callable[[str], None] | None = None
+    ) -> Completion:
+        """
+        Run ``request`` to the end. ``on_text`` receives the reply so far after
+        each chunk (e.g. to report progress or persist partial output).
+        """
+        model_id = request.model_id or getattr(settings, "BEDROCK_MODEL_ID", "")
+        parts: list[str] = []
+        usage, stop_reason = Usage(), None
+        for chunk in self.stream(request):
+            if chunk.text:
+                parts.append(chunk.text)
+                if on_text is not None:
+                    on_text("".join(parts))
+            if chunk.usage is not None:
+                usage = chunk.usage
+            stop_reason = chunk.stop_reason or stop_reason
+        return Completion("".join(parts), usage, model_id, stop_reason)
+
+
+_client: tuple[int, ModelClient] | None = None
+_client_lock = threading.Lock()
+
+
+def build_client(**overrides: Any) -> ModelClient:
+    """
+    A client configured from settings. ``overrides`` replace ``ModelClient``
+    arguments; ``backend`` replaces the ``AI_BACKEND`` instance.
+    """
+    backend = (
+        overrides.pop("backend", None)
+        or import_string(getattr(settings, "AI_BACKEND", "ai.bedrock.BedrockBackend"))()
+    )
+    options = {
+        "max_concurrency": int(getattr(settings, "AI_MAX_CONCURRENCY", 8)),
+        "requests_per_minute": float(getattr(settings, "AI_REQUESTS_PER_MINUTE", 0)),
+        "tokens_per_minute": float(getattr(settings, "AI_TOKENS_PER_MINUTE", 0)),
+        "max_retries": int(getattr(settings, "AI_MAX_RETRIES", 4)),
+        "retry_base": float(getattr(settings, "AI_RETRY_BASE_SECONDS", 0.5)),
+        "retry_max": float(getattr(settings, "AI_RETRY_MAX_SECONDS", 20.0)),
+        "acquire_timeout": float(getattr(settings, "AI_ACQUIRE_TIMEOUT_SECONDS", 60.0)),
+    }
+    return ModelClient(backend, **{**options, **overrides})
+
+
+def get_client() -> ModelClient:
+    """This process's client; rebuilt after a fork (prefork Celery workers)."""
+    global _client
+    with _client_lock:
+        if _client is None or _client[0] != os.getpid():
+            _client = (os.getpid(), build_client())
+        return _client[1]
+
+
+def _reset_client(*, setting: str, **kwargs: Any) -> None:
+    global _client
+    if setting.startswith(("AI_", "BEDROCK_")):
+        with _client_lock:
+            _client = None
+
+
+setting_changed.connect(_reset_client)
@@ -0,0 +1,212 @@
+"""
+Deterministic local stand-in for the model service.
+
+Plugs into ``ai.client`` like the Bedrock backend (``AI_BACKEND =
+"ai.fake.FakeBackend"``), so the whole generation path (jobs, the client's
+limits, streaming progress) can be load-tested offline without paying for
+model calls.
+
+Replies are seeded by ``seed``, the model id, the job kind and the prompt, so
+a request always gets the same reply. ``request.metadata["kind"]`` selects
+the payload: ``outline`` (JSON modules and lessons), ``lesson`` (JSON with
+markdown content), ``quiz`` (JSON multiple-choice questions) or free text.
+``topic`` in the metadata names the subject, and ``modules``,
+``lessons_per_module`` and ``questions`` fix the shape.
+
+Options come from ``AI_FAKE_BACKEND`` (a dict) or keyword arguments:
+
+``latency``
+    Time to the first chunk. A number, or a distribution such as
+    ``{"dist": "lognormal", "median": 0.8, "sigma": 0.4}``,
+    ``{"dist": "uniform", "low": 0.2, "high": 1.5}`` or
+    ``{"dist": "fixed", "value": 0.5}``.
+``chunk_delay``
+    Time between chunks; same forms as ``latency``.
+``chunk_chars``
+    Characters per streamed chunk.
+``output_tokens``
+    Target reply length for lessons and free text, as a number, a
+    distribution, or a ``{kind: ...}`` mapping of those.
+``throttle_rate``, ``throttle_first``
+    Refuse that fraction of calls (seeded), or the first N calls, with
+    ``ThrottledError``.
+``reply``
+    Fixed text returned for every request.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from django.conf import settings
+
+from .client import Chunk, ModelRequest, ThrottledError, Usage
+
+WORDS = (
+    "analysis approach balance concept context data design energy evidence example "
+    "feedback focus framework function growth habit idea impact insight language "
+    "layer method model motion network outcome pattern practice principle process "
+    "question reason resource result scale signal skill source structure system "
+    "theory tool value variable"
+).split()
+
+
+def sample(spec: Any, rng: random.Random) -> float:
+    """Draw from a number or ``{"dist": ...}`` spec; never negative."""
+    if spec is None:
+        return 0.0
+    if isinstance(spec, (int, float)):
+        return max(0.0, float(spec))
+    dist = spec.get("dist", "fixed")
+    if dist == "fixed":
+        value = spec.get("value", 0.0)
+    elif dist == "uniform":
+        value = rng.uniform(spec.get("low", 0.0), spec.get("high", 0.0))
+    elif dist == "lognormal":
+        value = rng.lognormvariate(math.log(spec["median"]), spec.get("sigma", 0.5))
+    elif dist == "normal":
+        value = rng.gauss(spec["mean"], spec.get("stddev", 0.0))
+    else:
+        raise ValueError(f"Unknown distribution {dist!r}")
+    return max(0.0, float(value))
+
+
+class FakeBackend:
+    name = "fake"
+
+    def __init__(
+        self, *, sleep: Callable[[float], None] = time.sleep, **options: Any
+    ) -> None:
+        options = {**getattr(settings, "AI_FAKE_BACKEND", {}), **options}
+        self.seed = options.get("seed", 0)
+        self.reply: str | None = options.get("reply")
+        self.latency = options.get("latency")
+        self.chunk_delay = options.get("chunk_delay")
+        self.chunk_chars = int(options.get("chunk_chars", 16))
+        self.output_tokens = options.get("output_tokens", 400)
+        self.throttle_rate = float(options.get("throttle_rate", 0.0))
+        self.throttle_first = int(options.get("throttle_first", 0))
+        self.sleep = sleep
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._throttle_rng = random.Random(f"{self.seed}:throttle")
+
+    def _rng(self, request: ModelRequest, model_id: str, kind: str) -> random.Random:
+        digest = hashlib.sha256(
+            f"{request.system}\0{request.prompt}".encode()
+        ).hexdigest()
+        return random.Random(f"{self.seed}:{model_id}:{kind}:{digest}")
+
+    def stream(self, request: ModelRequest, model_id: str) -> Iterator[Chunk]:
+        with self._lock:
+            self.calls += 1
+            throttled = (
+                self.calls <= self.throttle_first
+                or self._throttle_rng.random() < self.throttle_rate
+            )
+        if throttled:
+            raise ThrottledError("Fake throttling")
+
+        kind = str(request.metadata.get("kind", "text"))
+        rng = self._rng(request, model_id, kind)
+        text = (
+            self.reply if self.reply is not None else self._payload(kind, request, rng)
+        )
+        self._pause(sample(self.latency, rng))
+        for start in range(0, len(text), self.chunk_chars):
+            if start:
+                self._pause(sample(self.chunk_delay, rng))
+            yield Chunk(text=text[start : start + self.chunk_chars])
+        usage = Usage(
+            input_tokens=max(1, (len(request.prompt) + len(request.system)) // 4),
+            output_tokens=max(1, len(text) // 4),
+        )
+        yield Chunk(usage=usage, stop_reason="end_turn")
+
+    def _pause(self, seconds: float) -> None:
+        if seconds:
+            self.sleep(seconds)
+
+    # --- payloads -------------------------------------------------------
+
+    def _target_tokens(self, kind: str, rng: random.Random) -> int:
+        spec = self.output_tokens
+        if isinstance(spec, dict) and "dist" not in spec:
+            spec = spec.get(kind, 400)
+        return max(1, int(sample(spec, rng)))
+
+    @staticmethod
+    def _words(rng: random.Random, count: int) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(count))
+
+    def _title(self, rng: random.Random, topic: str) -> str:
+        return f"{topic}: {self._words(rng, 3).title()}"
+
+    def _prose(self, rng: random.Random, tokens: int) -> str:
+        # ~1.3 tokens per word
+        words = max(1, int(tokens / 1.3))
+        sentences = []
+        while words > 0:
+            n = min(words, rng.randint(8, 18))
+            sentences.append(self._words(rng, n).capitalize() + ".")
+            words -= n
+        return " ".join(sentences)
+
+    def _payload(self, kind: str, request: ModelRequest, rng: random.Random) -> str:
+        meta = request.metadata
+        topic = str(
+            meta.get("topic") or " ".join(request.prompt.split()[:4]) or "Topic"
+        )
+        if kind == "outline":
+            modules = int(meta.get("modules") or rng.randint(3, 6))
+            per_module = meta.get("lessons_per_module")
+            data: dict[str, Any] = {
+                "title": self._title(rng, topic),
+                "modules": [
+                    {
+                        "title": self._title(rng, topic),
+                        "lessons": [
+                            {
+                                "title": self._title(rng, topic),
+                                "summary": self._prose(rng, 30),
+                            }
+                            for _ in range(int(per_module or rng.randint(2, 5)))
+                        ],
+                    }
+                    for _ in range(modules)
+                ],
+            }
+        elif kind == "lesson":
+            tokens = self._target_tokens(kind, rng)
+            sections = max(1, tokens // 200)
+            content = "\n\n".join(
+                f"## {self._words(rng, 3).title()}\n\n{self._prose(rng, tokens // sections)}"
+                for _ in range(sections)
+            )
+            data = {
+                "title": self._title(rng, topic),
+                "content": content,
+                "estimated_minutes": rng.randint(5, 25),
+            }
+        elif kind == "quiz":
+            data = {
+                "questions": [
+                    {
+                        "prompt": f"Which {rng.choice(WORDS)} best describes {topic}?",
+                        "choices": [self._words(rng, 3) for _ in range(4)],
+                        "answer": rng.randrange(4),
+                        "explanation": self._prose(rng, 25),
+                    }
+                    for _ in range(int(meta.get("questions") or 5))
+                ]
+            }
+        else:
+            return self._prose(rng, self._target_tokens(kind, rng))
+        return json.dumps(data)
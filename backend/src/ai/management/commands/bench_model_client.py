@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from django.test import override_settings
+
+from ai.client import ModelRequest, ThrottledError, build_client
+from ai.fake import FakeBackend
+from courses.models import Course
+from jobs import batches
+from jobs.models import AIJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the model client with concurrent requests and report throughput, "
+        "latency and throttling. Uses the seeded fake backend unless --live is given. "
+        "With --jobs, runs outline jobs (and the lessons they fan out) through the job "
+        "engine instead and reports jobs per minute."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=None,
+            help="Default: the client's concurrency",
+        )
+        parser.add_argument(
+            "--max-concurrency",
+            type=int,
+            default=None,
+            help="Override AI_MAX_CONCURRENCY",
+        )
+        parser.add_argument(
+            "--kind", default="lesson", choices=["outline", "lesson", "quiz", "text"]
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.05,
+            help="Fake median time to first chunk",
+        )
+        parser.add_argument("--chunk-delay", type=float, default=0.0005)
+        parser.add_argument("--throttle-rate", type=float, default=0.0)
+        parser.add_argument(
+            "--live", action="store_true", help="Use AI_BACKEND as configured"
+        )
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=0,
+            help="Outline jobs to run through the engine (writes to the database)",
+        )
+        parser.add_argument("--modules", type=int, default=2, help="Per outline job")
+        parser.add_argument(
+            "--lessons-per-module", type=int, default=3, help="Per outline job"
+        )
+
+    def handle(self, *args, **options):
+        if options["jobs"]:
+            return self.bench_jobs(options)
+        overrides = {}
+        if options["max_concurrency"]:
+            overrides["max_concurrency"] = options["max_concurrency"]
+        if not options["live"]:
+            overrides["backend"] = FakeBackend(
+                latency={
+                    "dist": "lognormal",
+                    "median": options["latency"],
+                    "sigma": 0.4,
+                }
+                if options["latency"]
+                else 0,
+                chunk_delay=options["chunk_delay"],
+                throttle_rate=options["throttle_rate"],
+            )
+        client = build_client(**overrides)
+
+        def call(i: int) -> tuple[float, int, bool]:
+            request = ModelRequest(
+                f"Write about topic {i}",
+                max_tokens=512,
+                metadata={"kind": options["kind"], "topic": f"Topic {i}"},
+            )
+            start = time.perf_counter()
+            try:
+                completion = client.complete(request)
+            except ThrottledError:
+                return time.perf_counter() - start, 0, False
+            return time.perf_counter() - start, completion.usage.output_tokens, True
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(
+            max_workers=options["threads"] or client.max_concurrency
+        ) as pool:
+            results = list(pool.map(call, range(options["requests"])))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency for latency, _, ok in results if ok)
+        failed = sum(1 for *_, ok in results if not ok)
+        self.stdout.write(
+            f"{options['requests']} requests in {elapsed:.2f}s "
+            f"({options['requests'] / elapsed * 60:.0f}/min), {failed} throttled after retries "
+            f"or timed out waiting for a slot"
+        )
+        if latencies:
+            p95 = latencies[int(0.95 * (len(latencies) - 1))]
+            self.stdout.write(
+                f"latency p50 {statistics.median(latencies) * 1000:.0f} ms, p95 {p95 * 1000:.0f} ms; "
+                f"{sum(tokens for _, tokens, _ in results)} output tokens"
+            )
+
+    def bench_jobs(self, options):
+        """
+        Submit each outline as its own batch from ``--threads`` threads. Jobs run
+        eagerly, so each thread plays a worker executing its outline and then the
+        lessons it fans out; everything is deleted afterwards.
+        """
+        overrides: dict[str, Any] = {
+            "CELERY_TASK_ALWAYS_EAGER": True,
+            "AIJOB_FAIR_SCHEDULING": False,
+        }
+        if options["max_concurrency"]:
+            overrides["AI_MAX_CONCURRENCY"] = options["max_concurrency"]
+        if not options["live"]:
+            overrides["AI_BACKEND"] = "ai.fake.FakeBackend"
+            overrides["AI_FAKE_BACKEND"] = {
+                "latency": {
+                    "dist": "lognormal",
+                    "median": options["latency"],
+                    "sigma": 0.4,
+                }
+                if options["latency"]
+                else 0,
+                "chunk_delay": options["chunk_delay"],
+                "throttle_rate": options["throttle_rate"],
+            }
+        owner = get_user_model().objects.create_user(f"bench-{uuid.uuid4().hex[:12]}")
+        courses = [
+            Course.objects.create(owner=owner, title=f"Topic {i}", audience="benchmark")
+            for i in range(options["jobs"])
+        ]
+
+        def run(course: Course) -> None:
+            item = {
+                "kind": AIJob.JobKind.OUTLINE,
+                "input_data": {
+                    "course_id": str(course.pk),
+                    "modules": options["modules"],
+                    "lessons_per_module": options["lessons_per_module"],
+                },
+                "use_result_cache": False,
+            }
+            try:
+                batches.submit(owner, [item])
+            finally:
+                connection.close()
+
+        try:
+            with override_settings(**overrides):
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=options["threads"] or 8) as pool:
+                    list(pool.map(run, courses))
+                elapsed = time.perf_counter() - start
+            jobs = AIJob.objects.filter(owner=owner).exclude(kind=AIJob.JobKind.BATCH)
+            counts = {
+                row["status"]: row["n"]
+                for row in jobs.values("status").annotate(n=Count("id"))
+            }
+        finally:
+            owner.delete()
+
+        total = sum(counts.values())
+        completed = counts.get(AIJob.Status.COMPLETED, 0)
+        self.stdout.write(
+            f"{total} jobs ({options['jobs']} outlines) in {elapsed:.2f}s: "
+            f"{completed / elapsed * 60:.0f} completed jobs/min, {total - completed} not completed"
+        )
@@ -0,0 +1,294 @@
+"""
+Course generation pipeline: outline, then lessons.
+
+An ``outline`` job with a ``course_id`` asks the model for the course's
+modules and lessons. Its stage (``fan_out``) then writes the skeleton in two
+``bulk_create`` statements (modules, then lessons whose content is the
+outline summary), batched by ``AI_BULK_CREATE_BATCH_SIZE``, and submits one
+``lesson`` job per lesson as a ``jobs.batches`` batch under the outline job.
+The outline job stays ``running`` with the lessons' progress until the batch
+finishes, then completes or fails with it; its ``cost_cents`` then includes
+the lessons'. The batch's id is in the outline's ``output_data["batch_id"]``.
+
+Lesson jobs run concurrently up to the ``lesson`` lane's capacity (and
+``AIJOB_OWNER_MAX_INFLIGHT`` per owner), each through the shared model
+client's limits. Each is its own job: a throttled lesson is retried alone
+with backoff, and ``batches.retry_failed`` re-runs only the lessons that
+failed. The ``lesson`` stage (``apply_lesson``) writes a finished lesson's
+content to its row.
+
+Input (``input_data``):
+
+``outline``
+    ``course_id``; optional ``topic`` (defaults to the course title),
+    ``modules``, ``lessons_per_module``, and ``generate_lessons`` (default
+    true; false writes the skeleton only).
+``lesson``
+    ``lesson_id`` (optional; without it the content is only returned),
+    ``topic``, ``module``, ``title`` and ``summary``.
+
+Prompts are the ``outline`` and ``lesson`` templates in ``ai.prompts``.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+
+from courses import ordering
+from courses.models import Course, Lesson, Module
+from jobs import batches
+from jobs.engine import RetryableJobError
+from jobs.models import AIJob
+from jobs.progress import ProgressReporter
+
+from .client import Completion, ModelRequest, ThrottledError, get_client
+from .prompts import RenderedPrompt, registry
+
+LESSON_MAX_TOKENS = 4096
+
+
+def cost_cents(completion: Completion) -> int:
+    """Price of a call per ``AI_INPUT/OUTPUT_CENTS_PER_1K_TOKENS``, rounded up."""
+    usage = completion.usage
+    cents = (
+        usage.input_tokens
+        * float(getattr(settings, "AI_INPUT_CENTS_PER_1K_TOKENS", 0.3))
+        + usage.output_tokens
+        * float(getattr(settings, "AI_OUTPUT_CENTS_PER_1K_TOKENS", 1.5))
+    ) / 1000
+    return math.ceil(cents)
+
+
+def _complete(
+    job: AIJob, prompt: RenderedPrompt, request: ModelRequest, **kwargs: Any
+) -> dict[str, Any]:
+    """Run ``prompt`` for ``job``, record its usage on the row and parse the JSON reply."""
+    try:
+        completion = get_client().complete(request, **kwargs)
+    except ThrottledError as exc:
+        raise RetryableJobError(str(exc)) from exc
+    AIJob.objects.filter(pk=job.pk).update(
+        token_usage={
+            **completion.usage.as_dict(),
+            "model_id": completion.model_id,
+            "prompt": prompt.name,
+            "prompt_version": prompt.version,
+        },
+        cost_cents=cost_cents(completion),
+    )
+    text = completion.text
+    try:
+        # Tolerate prose or code fences around the object
+        data = json.loads(text[text.index("{") : text.rindex("}") + 1])
+    except ValueError as exc:
+        # Sampling differs on the next attempt
+        raise RetryableJobError(f"Model reply for {job.kind} job is not JSON") from exc
+    if not isinstance(data, dict):
+        raise RetryableJobError(f"Model reply for {job.kind} job is not a JSON object")
+    return data
+
+
+def run_outline(job: AIJob) -> dict[str, Any]:
+    data = job.input_data
+    course = Course.objects.get(pk=data["course_id"], owner=job.owner)
+    topic = data.get("topic") or course.title
+    prompt = registry.render(
+        "outline",
+        topic=topic,
+        description=course.description,
+        modules=data.get("modules"),
+        lessons_per_module=data.get("lessons_per_module"),
+    )
+    outline = _complete(
+        job,
+        prompt,
+        ModelRequest(
+            prompt=prompt.text,
+            system=prompt.system,
+            metadata={
+                "kind": "outline",
+                "topic": topic,
+                "modules": data.get("modules"),
+                "lessons_per_module": data.get("lessons_per_module"),
+            },
+        ),
+    )
+    modules = outline.get("modules")
+    if not isinstance(modules, list) or not all(
+        isinstance(m, dict) and m.get("title") for m in modules
+    ):
+        raise RetryableJobError("Outline has no valid modules")
+    return {
+        "title": str(outline.get("title") or topic),
+        "modules": [
+            {
+                "title": str(module["title"]),
+                "lessons": [
+                    {
+                        "title": str(lesson["title"]),
+                        "summary": str(lesson.get("summary") or ""),
+                    }
+                    for lesson in module.get("lessons") or []
+                    if isinstance(lesson, dict) and lesson.get("title")
+                ],
+            }
+            for module in modules
+        ],
+    }
+
+
+def persist_outline(
+    course: Course, outline: dict[str, Any]
+) -> list[tuple[Module, list[Lesson]]]:
+    """
+    Append the outline's modules and lessons to ``course`` with one batched
+    ``bulk_create`` per model. ``bulk_create`` skips ``save()``, so the
+    denormalized keys and sparse orders are set here.
+    """
+    batch_size = int(getattr(settings, "AI_BULK_CREATE_BATCH_SIZE", 500))
+    title_length = Module._meta.get_field("title").max_length
+    with transaction.atomic():
+        # Serialises concurrent appends to the course's module orders
+        course = Course.objects.select_for_update().get(pk=course.pk)
+        first = ordering.Siblings(Module, "course").next_order(course.pk)
+        tree = []
+        for i, entry in enumerate(outline["modules"]):
+            module = Module(
+                course=course,
+                owner_id=course.owner_id,
+                title=entry["title"][:title_length],
+                order=first + i * ordering.ORDER_GAP,
+            )
+            lessons = [
+                Lesson(
+                    module=module,
+                    course_id=course.pk,
+                    owner_id=course.owner_id,
+                    title=lesson["title"][:title_length],
+                    content=lesson["summary"],
+                    order=(j + 1) * ordering.ORDER_GAP,
+                )
+                for j, lesson in enumerate(entry["lessons"])
+            ]
+            tree.append((module, lessons))
+        Module.objects.bulk_create(
+            [module for module, _ in tree], batch_size=batch_size
+        )
+        Lesson.objects.bulk_create(
+            [lesson for _, lessons in tree for lesson in lessons], batch_size=batch_size
+        )
+    # post_save never fired; invalidate what the new rows show up in
+    module_ids = [module.pk for module, _ in tree]
+    lesson_ids = [lesson.pk for _, lessons in tree for lesson in lessons]
+    transaction.on_commit(
+        lambda: ordering.orders_changed.send(sender=Module, pks=module_ids)
+    )
+    transaction.on_commit(
+        lambda: ordering.orders_changed.send(sender=Lesson, pks=lesson_ids)
+    )
+    return tree
+
+
+def fan_out(job: AIJob, output: dict[str, Any]) -> dict[str, Any] | None:
+    """``outline`` stage: write the course skeleton and submit its lesson jobs."""
+    data = job.input_data
+    if "course_id" not in data:
+        return None
+    previous = (
+        job.children.filter(kind=AIJob.JobKind.BATCH)
+        .values_list("pk", flat=True)
+        .first()
+    )
+    if previous is not None:
+        # Already applied by an attempt that lost its lease before completing
+        return {**output, "batch_id": str(previous)}
+    course = Course.objects.get(pk=data["course_id"], owner=job.owner)
+    topic = data.get("topic") or course.title
+    with transaction.atomic():
+        tree = persist_outline(course, output)
+        result = {
+            **output,
+            "course_id": str(course.pk),
+            "module_ids": [str(module.pk) for module, _ in tree],
+            "lesson_ids": [str(lesson.pk) for _, lessons in tree for lesson in lessons],
+        }
+        items = [
+            {
+                "kind": AIJob.JobKind.LESSON,
+                "input_data": {
+                    "lesson_id": str(lesson.pk),
+                    "topic": topic,
+                    "module": module.title,
+                    "title": lesson.title,
+                    "summary": lesson.content,
+                },
+                "use_result_cache": job.use_result_cache,
+            }
+            for module, lessons in tree
+            for lesson in lessons
+        ]
+        if data.get("generate_lessons", True) and items:
+            batch, _ = batches.submit(job.owner, items, parent=job)
+            result["batch_id"] = str(batch.pk)
+    return result
+
+
+def run_lesson(job: AIJob) -> dict[str, Any]:
+    data = job.input_data
+    topic = data.get("topic") or data.get("title") or "the course"
+    prompt = registry.render(
+        "lesson",
+        topic=topic,
+        title=data.get("title", ""),
+        module=data.get("module", ""),
+        summary=data.get("summary", ""),
+    )
+    # ~4 characters per token
+    expected = LESSON_MAX_TOKENS * 4
+    with ProgressReporter(job) as progress:
+        lesson = _complete(
+            job,
+            prompt,
+            ModelRequest(
+                prompt=prompt.text,
+                system=prompt.system,
+                max_tokens=LESSON_MAX_TOKENS,
+                metadata={"kind": "lesson", "topic": topic},
+            ),
+            on_text=lambda text: progress.update(
+                min(95, 100 * len(text) // expected), "Writing"
+            ),
+        )
+    if not lesson.get("content"):
+        raise RetryableJobError("Lesson reply has no content")
+    minutes = lesson.get("estimated_minutes")
+    return {
+        "title": str(lesson.get("title") or data.get("title", "")),
+        "content": str(lesson["content"]),
+        "estimated_minutes": min(180, max(1, int(minutes)))
+        if isinstance(minutes, (int, float))
+        else 10,
+    }
+
+
+def apply_lesson(job: AIJob, output: dict[str, Any]) -> None:
+    """``lesson`` stage: write the generated content to the lesson row."""
+    lesson_id = job.input_data.get("lesson_id")
+    if not lesson_id:
+        return
+    lesson = (
+        Lesson.objects.filter(pk=lesson_id, owner=job.owner)
+        .select_related("module")
+        .first()
+    )
+    if lesson is None:
+        raise LookupError(f"Lesson {lesson_id} no longer exists")
+    lesson.content = output["content"]
+    lesson.estimated_minutes = output["estimated_minutes"]
+    # save() rather than update() so post_save invalidates cached copies
+    lesson.save(update_fields=["content", "estimated_minutes", "updated_at"])
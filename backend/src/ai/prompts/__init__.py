@@ -0,0 +1,134 @@
+"""
+Prompt templates for generation jobs.
+
+Each ``<name>.jinja`` file in this directory renders one job kind's prompt.
+The body is the user prompt; a ``{% set system %}...{% endset %}`` block in
+the template sets the system prompt. Rendering uses ``StrictUndefined``, so
+a missing variable raises instead of silently sending a hole to the model.
+
+``registry`` compiles each template the first time it is used and keeps it
+for the life of the process, so a job renders from compiled code and never
+re-reads or re-parses its template. A template's ``version`` is a hash of
+its source. Result caching (``ai.result_cache``) keys on it, so editing a
+template stops old cached results from matching, and jobs record it in
+``token_usage`` for cost attribution.
+
+    prompt = registry.render("lesson", topic="Photosynthesis", title="Light")
+    client.complete(ModelRequest(prompt.text, system=prompt.system, ...))
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import jinja2
+except Exception:  # pragma: no cover - optional dependency
+    jinja2 = None  # type: ignore[assignment]
+
+DIRECTORY = Path(__file__).resolve().parent
+SUFFIX = ".jinja"
+
+
+@dataclass(frozen=True)
+class RenderedPrompt:
+    name: str
+    version: str
+    system: str
+    text: str
+
+
+@dataclass(frozen=True)
+class Template:
+    name: str
+    version: str
+    compiled: Any
+
+    def render(self, **context: Any) -> RenderedPrompt:
+        # The module exposes the template's top-level {% set %} variables
+        module = self.compiled.make_module(context)
+        return RenderedPrompt(
+            name=self.name,
+            version=self.version,
+            system=str(getattr(module, "system", "")).strip(),
+            text=str(module).strip(),
+        )
+
+
+class PromptRegistry:
+    def __init__(self, directory: Path = DIRECTORY) -> None:
+        self.directory = Path(directory)
+        self._sources: dict[str, tuple[str, str] | None] = {}
+        self._templates: dict[str, Template] = {}
+        self._lock = threading.Lock()
+        self._env: Any = None
+
+    def _source(self, name: str) -> tuple[str, str] | None:
+        """``(source, version)`` of a template, or ``None`` if there is none."""
+        if name not in self._sources:
+            path = self.directory / f"{name}{SUFFIX}"
+            if path.is_file():
+                source = path.read_text(encoding="utf-8")
+                self._sources[name] = (
+                    source,
+                    hashlib.sha256(source.encode()).hexdigest()[:16],
+                )
+            else:
+                self._sources[name] = None
+        return self._sources[name]
+
+    def names(self) -> list[str]:
+        return sorted(path.stem for path in self.directory.glob(f"*{SUFFIX}"))
+
+    def version(self, name: str) -> str:
+        """Content hash of ``name``'s template; empty when it has none."""
+        with self._lock:
+            source = self._source(name)
+        return source[1] if source else ""
+
+    def get(self, name: str) -> Template:
+        template = self._templates.get(name)
+        if template is not None:
+            return template
+        if jinja2 is None:
+            raise ImproperlyConfigured(
+                "Rendering prompts requires jinja2 (pip install jinja2)"
+            )
+        with self._lock:
+            if name not in self._templates:
+                source = self._source(name)
+                if source is None:
+                    raise LookupError(
+                        f"No prompt template {name}{SUFFIX} in {self.directory}"
+                    )
+                if self._env is None:
+                    self._env = jinja2.Environment(
+                        undefined=jinja2.StrictUndefined,
+                        autoescape=False,
+                        trim_blocks=True,
+                        lstrip_blocks=True,
+                        # Every template is compiled once, below; nothing to look up or reload
+                        cache_size=0,
+                        auto_reload=False,
+                    )
+                self._templates[name] = Template(
+                    name, source[1], self._env.from_string(source[0])
+                )
+            return self._templates[name]
+
+    def render(self, name: str, **context: Any) -> RenderedPrompt:
+        return self.get(name).render(**context)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sources.clear()
+            self._templates.clear()
+
+
+registry = PromptRegistry()
@@ -0,0 +1,142 @@
+"""
+Exact-match cache of AI job results.
+
+Re-running a job with the same kind and input (a retried lesson, a
+regeneration after an unrelated edit) would pay the model's latency and cost
+again for the same answer. Results are stored under a content address: the
+SHA-256 of a canonical JSON document holding the kind, the normalised
+``input_data`` (sorted keys, NFC strings trimmed of surrounding whitespace),
+the prompt template's content hash (``ai.prompts``) and ``BEDROCK_MODEL_ID``.
+Changing a template or the model therefore misses without any explicit
+invalidation.
+
+Entries live in the ``AI_RESULT_CACHE_ALIAS`` cache, which is on the shared
+Redis tier when ``AI_RESULT_CACHE_REDIS_URL`` (default ``CACHE_REDIS_URL``) is
+set, so every worker sees every result. Its ``TIMEOUT`` is the TTL. Point it
+at a Redis with ``maxmemory-policy allkeys-lru`` (docker-compose's
+``ai-cache``) to bound it; without Redis each process keeps its own LocMem
+copy bounded by ``MAX_ENTRIES``.
+
+A job with ``use_result_cache`` off skips the lookup but still stores its
+fresh result, so "regenerate" refreshes the entry. A hit completes the job at
+no cost and records the saving in ``token_usage["result_cache"]``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import unicodedata
+from dataclasses import dataclass
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from core import metrics
+
+from .prompts import registry
+
+DEFAULT_KINDS = ("outline", "lesson", "quiz", "lecture")
+
+
+@dataclass(frozen=True)
+class Hit:
+    key: str
+    output: dict[str, Any]
+    token_usage: dict[str, Any]
+    cost_cents: int
+    cached_at: str
+
+    def usage_record(self) -> dict[str, Any]:
+        """``token_usage`` of the job served from the cache."""
+        return {
+            "result_cache": {
+                "hit": True,
+                "key": self.key,
+                "cached_at": self.cached_at,
+                "saved_cost_cents": self.cost_cents,
+                "saved_token_usage": self.token_usage,
+            }
+        }
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "AI_RESULT_CACHE_ENABLED", True))
+
+
+def cacheable(kind: str) -> bool:
+    return enabled() and kind in getattr(
+        settings, "AI_RESULT_CACHE_KINDS", DEFAULT_KINDS
+    )
+
+
+def _cache() -> Any:
+    return caches[getattr(settings, "AI_RESULT_CACHE_ALIAS", "ai_results")]
+
+
+def normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return unicodedata.normalize("NFC", value).strip()
+    if isinstance(value, dict):
+        return {str(k): normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    return value
+
+
+def template_version(kind: str) -> str:
+    """
+    Content hash of the kind's prompt template (``ai.prompts``), plus any
+    manual bump from ``AI_PROMPT_VERSIONS`` for prompt changes made in code.
+    """
+    version = registry.version(kind)
+    bump = getattr(settings, "AI_PROMPT_VERSIONS", {}).get(kind)
+    return f"{version}+{bump}" if bump else version
+
+
+def key_for(kind: str, input_data: dict[str, Any]) -> str:
+    document = {
+        "kind": kind,
+        "input": normalize(input_data),
+        "template": template_version(kind),
+        "model": getattr(settings, "BEDROCK_MODEL_ID", ""),
+    }
+    # Stdlib json, not core.jsonlib: the encoding must not vary with the backend
+    canonical = json.dumps(
+        document, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def lookup(job: Any) -> Hit | None:
+    """The cached result for ``job``, unless it opted out or nothing matches."""
+    if not cacheable(job.kind) or not job.use_result_cache:
+        return None
+    key = key_for(job.kind, job.input_data)
+    entry = _cache().get(f"ai:result:{key}")
+    metrics.CACHE_REQUESTS.inc("ai_result", "miss" if entry is None else "hit")
+    if entry is None:
+        return None
+    return Hit(key=key, **entry)
+
+
+def store(
+    job: Any,
+    output: dict[str, Any] | None,
+    token_usage: dict[str, Any],
+    cost_cents: int,
+) -> None:
+    if not cacheable(job.kind):
+        return
+    key = key_for(job.kind, job.input_data)
+    _cache().set(
+        f"ai:result:{key}",
+        {
+            "output": output or {},
+            "token_usage": token_usage,
+            "cost_cents": cost_cents,
+            "cached_at": timezone.now().isoformat(),
+        },
+    )
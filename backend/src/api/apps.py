@@ -9,3 +9,21 @@ class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
     verbose_name = "API"
+
+    def ready(self):
+        import logging
+
+        from django.conf import settings
+
+        from . import cache, signals
+
+        signals.connect()
+        if (
+            getattr(settings, "REPRESENTATION_CACHE_ENABLED", True)
+            and not cache.enabled()
+        ):
+            logging.getLogger("omnicourse.cache").warning(
+                "Representation cache disabled: the %r cache is per-process; point it at Redis "
+                "(REPRESENTATION_CACHE_REDIS_URL) or set REPRESENTATION_CACHE_ALLOW_LOCAL",
+                settings.REPRESENTATION_CACHE_ALIAS,
+            )
@@ -0,0 +1,176 @@
+"""
+Async read endpoints for the ASGI deployment.
+
+Under ASGI every sync view is run through ``sync_to_async`` on a single
+thread-sensitive executor, so requests waiting on the database or cache queue
+behind one another. These views await the async ORM and cache APIs instead:
+
+* health probes (``livez`` without touching dependencies);
+* ``GET jobs/<id>/status/``: the small progress shape clients poll, with
+  live progress from the cache (see ``jobs.progress``);
+* ``GET artifacts/<id>/metadata/``: artifact metadata as one narrow row read;
+* ``GET courses/<id>/tree/``: the cached course tree (see ``api.cache``).
+
+Job status and artifact metadata are always routed here; probes and the
+course tree replace their DRF counterparts when ``API_ASYNC_READS`` is on,
+which ``core.asgi`` enables by default.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from core import jsonlib
+from core.exceptions import problem_response
+from core.health import ahealth_payload
+from courses.models import Course
+from jobs import progress
+from jobs.models import AIJob, ExportArtifact
+
+from . import cache as representation_cache
+from .fieldsets import has_fieldset_params
+from .serializers import CourseTreeSerializer
+
+JOB_STATUS_FIELDS = (
+    "id",
+    "kind",
+    "status",
+    "progress_percentage",
+    "progress_message",
+    "error_message",
+    "started_at",
+    "completed_at",
+    "updated_at",
+)
+ARTIFACT_FIELDS = (
+    "id",
+    "course",
+    "job",
+    "kind",
+    "file_path",
+    "file_size_bytes",
+    "checksum",
+    "download_count",
+    "expires_at",
+    "created_at",
+    "updated_at",
+)
+
+
+def authenticate(request: Any) -> Any:
+    """
+    Resolve the caller from a JWT bearer token, falling back to the session
+    (``EventSource`` cannot send an Authorization header).
+    """
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    if result is not None:
+        return result[0]
+    user = getattr(request, "user", None)
+    return user if user is not None and user.is_authenticated else None
+
+
+async def _scope(request: Any) -> tuple[bool, Any]:
+    """
+    Return ``(allowed, owner_id)``; ``owner_id`` is ``None`` for unrestricted reads.
+
+    Authenticated callers only see their own rows. Anonymous reads are refused
+    unless the test-only ``ALLOW_ANON_WRITE_FOR_TESTS`` flag is set.
+    """
+    user = await sync_to_async(authenticate)(request)
+    if user is not None:
+        return True, user.pk
+    return bool(getattr(settings, "ALLOW_ANON_WRITE_FOR_TESTS", False)), None
+
+
+def _json(data: Any) -> HttpResponse:
+    return HttpResponse(jsonlib.dumps(data), content_type="application/json")
+
+
+def _unauthorized() -> JsonResponse:
+    return problem_response(401, "Authentication credentials were not provided.")
+
+
+async def livez(_request: Any) -> JsonResponse:
+    return JsonResponse({"ok": True, "status": "alive"})
+
+
+async def healthz(_request: Any) -> JsonResponse:
+    return JsonResponse(await ahealth_payload())
+
+
+async def readinessz(_request: Any) -> JsonResponse:
+    return JsonResponse(await ahealth_payload())
+
+
+async def job_status(request: Any, pk: Any) -> HttpResponse:
+    allowed, owner_id = await _scope(request)
+    if not allowed:
+        return _unauthorized()
+    jobs = AIJob.objects.filter(pk=pk)
+    if owner_id is not None:
+        jobs = jobs.filter(owner_id=owner_id)
+    row = await jobs.values(*JOB_STATUS_FIELDS).afirst()
+    if row is None:
+        return problem_response(404, "Job not found.")
+    if row["status"] == AIJob.Status.RUNNING:
+        # Coalesced reports reach the row late; the cache has the latest one
+        row.update(await progress.alive(row["id"]) or {})
+    row["id"] = str(row["id"])
+    return _json(row)
+
+
+async def artifact_metadata(request: Any, pk: Any) -> HttpResponse:
+    allowed, owner_id = await _scope(request)
+    if not allowed:
+        return _unauthorized()
+    artifacts = ExportArtifact.objects.filter(pk=pk)
+    if owner_id is not None:
+        artifacts = artifacts.filter(course__owner_id=owner_id)
+    row = await artifacts.values(*ARTIFACT_FIELDS).afirst()
+    if row is None:
+        return problem_response(404, "Artifact not found.")
+    for key in ("id", "course", "job"):
+        row[key] = str(row[key]) if row[key] is not None else None
+    return _json(row)
+
+
+def _load_tree(request: Any, pk: Any, owner_id: Any) -> tuple[Any, Any]:
+    courses = Course.objects.filter(pk=pk).prefetch_related("modules__lessons")
+    if owner_id is not None:
+        courses = courses.filter(owner_id=owner_id)
+    course = courses.first()
+    if course is None:
+        raise Course.DoesNotExist
+    return course.owner_id, CourseTreeSerializer(
+        course, context={"request": request}
+    ).data
+
+
+async def course_tree(request: Any, pk: Any) -> HttpResponse:
+    allowed, owner_id = await _scope(request)
+    if not allowed:
+        return _unauthorized()
+    build = sync_to_async(_load_tree)
+    try:
+        if has_fieldset_params(request) or not representation_cache.enabled():
+            return _json((await build(request, pk, owner_id))[1])
+        body, hit = await representation_cache.aget_or_build(
+            representation_cache.TREE,
+            str(pk),
+            owner_id,
+            lambda: build(request, pk, owner_id),
+        )
+    except Course.DoesNotExist:
+        return problem_response(404, "Course not found.")
+    response = HttpResponse(body, content_type="application/json")
+    response["X-Cache"] = "HIT" if hit else "MISS"
+    return response
@@ -0,0 +1,234 @@
+"""
+Cache of encoded course, module, lesson and course-tree representations.
+
+Entries are keyed by ``(kind, pk, owner_id, version)``. Each cached object has
+a version token of its own in the cache; writers replace the token (on save,
+delete or reorder, see ``api.signals``) instead of deleting entries, so a
+reader that raced a writer can only store its stale body under a version
+nobody asks for again. Tokens are replaced immediately and again on commit to
+close the window where a reader sees the new token but the old rows.
+
+The backend is the ``REPRESENTATION_CACHE_ALIAS`` entry of ``CACHES``; its
+``TIMEOUT``/``MAX_ENTRIES`` options control eviction. Version tokens must be
+seen by every process, so the cache must be shared (the Redis tier,
+``core.cache``). On a per-process backend a write would only invalidate the
+process that made it; there the cache stays off unless ``DEBUG`` (one
+``runserver`` process) or ``REPRESENTATION_CACHE_ALLOW_LOCAL`` is set.
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+from core import jsonlib, metrics
+
+from .fieldsets import has_fieldset_params
+
+COURSE = "course"
+MODULE = "module"
+LESSON = "lesson"
+TREE = "tree"
+
+_stats: Counter[str] = Counter()
+_stats_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    if not getattr(settings, "REPRESENTATION_CACHE_ENABLED", True):
+        return False
+    return (
+        shared()
+        or settings.DEBUG
+        or bool(getattr(settings, "REPRESENTATION_CACHE_ALLOW_LOCAL", False))
+    )
+
+
+def shared() -> bool:
+    """Whether every process reads the same entries (and version tokens)."""
+    return not isinstance(_cache(), (LocMemCache, DummyCache))
+
+
+def _cache() -> Any:
+    return caches[getattr(settings, "REPRESENTATION_CACHE_ALIAS", "default")]
+
+
+# pks are stringified so URL kwargs and model instances share keys; callers
+# normalise URL values first (see CachedRetrieveMixin).
+def _version_key(kind: str, pk: Any) -> str:
+    return f"repr:v:{kind}:{pk}"
+
+
+def _body_key(kind: str, pk: Any, owner_id: Any, version: str) -> str:
+    return f"repr:{owner_id}:{kind}:{pk}:{version}"
+
+
+def _record(kind: str, outcome: str) -> None:
+    with _stats_lock:
+        _stats[f"{kind}.{outcome}"] += 1
+    if outcome != "invalidate":
+        metrics.CACHE_REQUESTS.inc(f"representation.{kind}", outcome)
+
+
+def stats() -> dict[str, Any]:
+    """Per-kind hit/miss/invalidation counters for this process."""
+    with _stats_lock:
+        snapshot = dict(_stats)
+    out: dict[str, Any] = {}
+    for kind in (COURSE, MODULE, LESSON, TREE):
+        hits, misses = snapshot.get(f"{kind}.hit", 0), snapshot.get(f"{kind}.miss", 0)
+        out[kind] = {
+            "hits": hits,
+            "misses": misses,
+            "invalidations": snapshot.get(f"{kind}.invalidate", 0),
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+        }
+    return out
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+def current_version(kind: str, pk: Any) -> str:
+    cache = _cache()
+    key = _version_key(kind, pk)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key) or version
+    return version
+
+
+def get_or_build(
+    kind: str, pk: Any, owner_id: Any, build: Callable[[], tuple[Any, Any]]
+) -> tuple[bytes, bool]:
+    """
+    Return ``(body, hit)`` for the representation of ``kind``/``pk``.
+
+    ``build`` returns ``(owner_id, data)`` for the freshly loaded object; the
+    body is stored under that owner so a cache entry only ever answers the
+    owner it was built for.
+    """
+    cache = _cache()
+    version = current_version(kind, pk)
+    body = cache.get(_body_key(kind, pk, owner_id, version))
+    if body is not None:
+        _record(kind, "hit")
+        return body, True
+    _record(kind, "miss")
+    actual_owner, data = build()
+    body = jsonlib.dumps(data)
+    cache.set(_body_key(kind, pk, actual_owner, version), body)
+    return body, False
+
+
+async def acurrent_version(kind: str, pk: Any) -> str:
+    cache = _cache()
+    key = _version_key(kind, pk)
+    version = await cache.aget(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not await cache.aadd(key, version, timeout=None):
+            version = await cache.aget(key) or version
+    return version
+
+
+async def aget_or_build(
+    kind: str, pk: Any, owner_id: Any, build: Callable[[], Awaitable[tuple[Any, Any]]]
+) -> tuple[bytes, bool]:
+    """Async ``get_or_build`` for ASGI views; ``build`` is awaited on a miss."""
+    cache = _cache()
+    version = await acurrent_version(kind, pk)
+    body = await cache.aget(_body_key(kind, pk, owner_id, version))
+    if body is not None:
+        _record(kind, "hit")
+        return body, True
+    _record(kind, "miss")
+    actual_owner, data = await build()
+    body = jsonlib.dumps(data)
+    await cache.aset(_body_key(kind, pk, actual_owner, version), body)
+    return body, False
+
+
+def invalidate(refs: Iterable[tuple[str, Any]]) -> None:
+    """Give each ``(kind, pk)`` a fresh version now and again after commit."""
+    refs = {(kind, str(pk)) for kind, pk in refs if pk is not None}
+    if not refs:
+        return
+
+    def bump() -> None:
+        tokens = {_version_key(kind, pk): uuid.uuid4().hex for kind, pk in refs}
+        _cache().set_many(tokens, timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
+    for kind, _ in refs:
+        _record(kind, "invalidate")
+
+
+def normalize_pk(model: Any, value: Any) -> str | None:
+    """Canonical string form of a URL pk, or ``None`` if it is not valid."""
+    try:
+        return str(model._meta.pk.to_python(value))
+    except (ValidationError, ValueError, TypeError):
+        return None
+
+
+def _owner_key(request: Any) -> tuple[bool, Any]:
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return True, user.pk
+    if getattr(settings, "ALLOW_ANON_WRITE_FOR_TESTS", False):
+        return True, None
+    return False, None
+
+
+def cached_response(
+    request: Any, kind: str, pk: Any, build: Callable[[], tuple[Any, Any]]
+) -> Any:
+    """Serve a representation from cache, building it on a miss."""
+    usable, owner_id = _owner_key(request)
+    if not enabled() or not usable or has_fieldset_params(request):
+        return Response(build()[1])
+
+    body, hit = get_or_build(kind, str(pk), owner_id, build)
+    renderer = getattr(request, "accepted_renderer", None)
+    if getattr(renderer, "format", None) == "json":
+        response = HttpResponse(body, content_type="application/json")
+    else:
+        response = Response(jsonlib.loads(body))
+    response["X-Cache"] = "HIT" if hit else "MISS"
+    return response
+
+
+class CachedRetrieveMixin:
+    """Cache ``retrieve`` output per owner; set ``cache_kind`` on the view."""
+
+    cache_kind: str
+
+    def retrieve(self, request: Any, *args: Any, **kwargs: Any) -> Any:
+        lookup = self.lookup_url_kwarg or self.lookup_field  # type: ignore[attr-defined]
+        pk = normalize_pk(self.queryset.model, kwargs[lookup])  # type: ignore[attr-defined]
+        if pk is None:
+            return super().retrieve(request, *args, **kwargs)  # type: ignore[misc]
+
+        def build() -> tuple[Any, Any]:
+            instance = self.get_object()  # type: ignore[attr-defined]
+            return instance.owner_id, self.get_serializer(instance).data  # type: ignore[attr-defined]
+
+        return cached_response(request, self.cache_kind, pk, build)
@@ -0,0 +1,289 @@
+"""
+Fast read-only serialization for hot list endpoints.
+
+List views that opt in via ``FastListMixin`` skip DRF's per-row field
+machinery: rows are fetched as ``.values_list()`` tuples and turned into dicts
+with converters precompiled from the serializer declaration, then encoded in
+one pass with ``core.jsonlib``. The output matches what the declared
+serializer would render; any serializer field we cannot reproduce exactly
+disables the fast path for that serializer and the view falls back to the
+regular ``list()``.
+"""
+
+from __future__ import annotations
+
+import datetime
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, replace
+from functools import cache
+from typing import Any
+
+from django.conf import settings
+from django.db import models
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+from core import jsonlib
+
+from .fieldsets import has_fieldset_params, select_field_names
+
+# Converter kinds. They are resolved to callables once per build so
+# request-scoped state (the active time zone) is not looked up per value.
+RAW = "raw"
+TEXT = "text"
+DATETIME = "datetime"
+
+Converter = Callable[[Any], Any]
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    source: str
+    kind: str = RAW
+
+
+@dataclass(frozen=True)
+class Nested:
+    """Reverse one-to-many relation rendered as a list of child rows."""
+
+    name: str
+    model: type[models.Model]
+    parent_source: str
+    spec: RowSpec
+
+
+@dataclass(frozen=True)
+class RowSpec:
+    model: type[models.Model]
+    order: tuple[str, ...]
+    columns: tuple[Column, ...]
+    nested: tuple[Nested, ...] = ()
+
+    def select(self, names: Iterable[str]) -> RowSpec:
+        keep = set(names)
+        return replace(
+            self,
+            order=tuple(n for n in self.order if n in keep),
+            columns=tuple(c for c in self.columns if c.name in keep),
+            nested=tuple(n for n in self.nested if n.name in keep),
+        )
+
+
+def _text(value: Any) -> Any:
+    return None if value is None else str(value)
+
+
+def _datetime_converter() -> Converter:
+    # Mirrors DateTimeField.enforce_timezone + to_representation for ISO 8601
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def convert(value: Any) -> Any:
+        if value is None:
+            return None
+        if tz is not None:
+            value = (
+                value.astimezone(tz)
+                if timezone.is_aware(value)
+                else timezone.make_aware(value, tz)
+            )
+        elif timezone.is_aware(value):
+            value = timezone.make_naive(value, datetime.UTC)
+        text = value.isoformat()
+        if text.endswith("+00:00"):
+            text = text[:-6] + "Z"
+        return text
+
+    return convert
+
+
+def _converters(columns: tuple[Column, ...]) -> list[Converter | None]:
+    table: dict[str, Converter | None] = {
+        RAW: None,
+        TEXT: _text,
+        DATETIME: _datetime_converter(),
+    }
+    return [table[c.kind] for c in columns]
+
+
+def _column_for(
+    name: str, ser_field: serializers.Field, model: type[models.Model]
+) -> Column | None:
+    source = ser_field.source or name
+    if "." in source or source == "*":
+        return None
+    try:
+        model_field = model._meta.get_field(source)
+    except Exception:
+        return None
+
+    if isinstance(ser_field, serializers.PrimaryKeyRelatedField):
+        if not model_field.many_to_one or ser_field.pk_field is not None:
+            return None
+        kind = TEXT if isinstance(model_field.target_field, models.UUIDField) else RAW
+        return Column(name=name, source=model_field.attname, kind=kind)
+
+    if not model_field.concrete or model_field.is_relation:
+        return None
+    if isinstance(ser_field, serializers.DateTimeField):
+        fmt = getattr(ser_field, "format", api_settings.DATETIME_FORMAT)
+        if (
+            not isinstance(fmt, str)
+            or fmt.lower() != ISO_8601
+            or "timezone" in vars(ser_field)
+        ):
+            return None
+        return Column(name=name, source=source, kind=DATETIME)
+    if isinstance(ser_field, serializers.UUIDField):
+        return (
+            Column(name=name, source=source, kind=TEXT)
+            if ser_field.uuid_format == "hex_verbose"
+            else None
+        )
+    if isinstance(ser_field, serializers.JSONField):
+        return None if ser_field.binary else Column(name=name, source=source)
+    if isinstance(
+        ser_field,
+        serializers.ChoiceField
+        | serializers.CharField
+        | serializers.IntegerField
+        | serializers.BooleanField,
+    ):
+        return Column(name=name, source=source)
+    return None
+
+
+def _nested_for(
+    name: str, ser_field: serializers.ListSerializer, model: type[models.Model]
+) -> Nested | None:
+    child = ser_field.child
+    try:
+        rel = model._meta.get_field(ser_field.source or name)
+    except Exception:
+        return None
+    if not rel.one_to_many or not isinstance(child, serializers.ModelSerializer):
+        return None
+    child_spec = compile_spec(child.__class__)
+    if child_spec is None or child_spec.nested:
+        return None
+    return Nested(
+        name=name,
+        model=rel.related_model,
+        parent_source=rel.field.attname,
+        spec=child_spec,
+    )
+
+
+@cache
+def compile_spec(serializer_class: type[serializers.Serializer]) -> RowSpec | None:
+    """Derive a ``RowSpec`` from a ModelSerializer, or ``None`` if unsupported."""
+    model = getattr(getattr(serializer_class, "Meta", None), "model", None)
+    if model is None:
+        return None
+
+    order: list[str] = []
+    columns: list[Column] = []
+    nested: list[Nested] = []
+    for name, ser_field in serializer_class().fields.items():
+        if ser_field.write_only:
+            continue
+        order.append(name)
+        if isinstance(ser_field, serializers.ListSerializer):
+            child = _nested_for(name, ser_field, model)
+            if child is None:
+                return None
+            nested.append(child)
+            continue
+        column = _column_for(name, ser_field, model)
+        if column is None:
+            return None
+        columns.append(column)
+    return RowSpec(
+        model=model, order=tuple(order), columns=tuple(columns), nested=tuple(nested)
+    )
+
+
+def _rows(spec: RowSpec, tuples: Iterable[tuple]) -> list[dict[str, Any]]:
+    names = [c.name for c in spec.columns]
+    convs = _converters(spec.columns)
+    # Rows of nested specs carry a trailing parent pk, which is left out
+    if not any(convs):
+        return [dict(zip(names, row, strict=False)) for row in tuples]
+    pairs = list(zip(names, convs, strict=True))
+    return [
+        {
+            name: conv(value) if conv else value
+            for (name, conv), value in zip(pairs, row, strict=False)
+        }
+        for row in tuples
+    ]
+
+
+def build_rows(spec: RowSpec, tuples: list[tuple]) -> list[dict[str, Any]]:
+    """
+    Build output dicts from tuples fetched with ``spec.columns`` sources.
+
+    When ``spec`` has nested relations each tuple carries the parent pk as an
+    extra trailing element; children are loaded with one query per relation.
+    """
+    if not spec.nested:
+        return _rows(spec, tuples)
+
+    rows = _rows(spec, tuples)
+    parent_ids = [t[-1] for t in tuples]
+    for nested in spec.nested:
+        sources = [c.source for c in nested.spec.columns] + [nested.parent_source]
+        children = list(
+            nested.model._default_manager.filter(
+                **{f"{nested.parent_source}__in": parent_ids}
+            ).values_list(*sources)
+        )
+        grouped: dict[Any, list[dict[str, Any]]] = defaultdict(list)
+        for child_row, raw in zip(_rows(nested.spec, children), children, strict=True):
+            grouped[raw[-1]].append(child_row)
+        for row, parent_id in zip(rows, parent_ids, strict=True):
+            row[nested.name] = grouped.get(parent_id, [])
+    return [{name: row[name] for name in spec.order} for row in rows]
+
+
+def fast_list_enabled() -> bool:
+    return bool(getattr(settings, "API_FAST_LIST_ENABLED", True))
+
+
+class FastListMixin:
+    """
+    Serve ``list`` from ``.values_list()`` rows when the serializer allows it.
+
+    JSON requests get a pre-encoded response; other formats (e.g. the browsable
+    API) still go through the negotiated renderer with the same row dicts.
+    """
+
+    def list(self, request: Any, *args: Any, **kwargs: Any) -> Any:
+        serializer_class = self.get_serializer_class()  # type: ignore[attr-defined]
+        spec = compile_spec(serializer_class) if fast_list_enabled() else None
+        if spec is None:
+            return super().list(request, *args, **kwargs)  # type: ignore[misc]
+        if has_fieldset_params(request):
+            spec = spec.select(select_field_names(list(spec.order), request))
+
+        sources = [c.source for c in spec.columns]
+        if spec.nested:
+            sources.append(spec.model._meta.pk.attname)
+
+        qs = self.filter_queryset(self.get_queryset()).prefetch_related(None)  # type: ignore[attr-defined]
+        values = qs.values_list(*sources)
+        page = self.paginate_queryset(values)  # type: ignore[attr-defined]
+        rows = build_rows(spec, list(page if page is not None else values))
+
+        data: Any = rows
+        if page is not None:
+            data = self.get_paginated_response(rows).data  # type: ignore[attr-defined]
+
+        renderer = getattr(request, "accepted_renderer", None)
+        if getattr(renderer, "format", None) == "json":
+            return HttpResponse(jsonlib.dumps(data), content_type="application/json")
+        return Response(data)
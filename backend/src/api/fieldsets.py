@@ -0,0 +1,161 @@
+"""
+Sparse fieldsets for API representations.
+
+Clients may pass ``?fields=a,b`` to select a subset of a serializer's fields or
+``?omit=a,b`` to drop some. The same selection is used to prune the SQL with
+``.only()``/``.defer()`` so unselected Text/JSON columns are never loaded.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import QuerySet
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = "fields"
+OMIT_PARAM = "omit"
+
+
+def _split(value: str | None) -> set[str]:
+    if not value:
+        return set()
+    return {part.strip() for part in value.split(",") if part.strip()}
+
+
+def fieldset_params(request: Any) -> tuple[set[str], set[str]]:
+    """Return the ``(fields, omit)`` sets requested via query params."""
+    if request is None:
+        return set(), set()
+    params = getattr(request, "query_params", None) or getattr(request, "GET", {})
+    return _split(params.get(FIELDS_PARAM)), _split(params.get(OMIT_PARAM))
+
+
+def has_fieldset_params(request: Any) -> bool:
+    fields, omit = fieldset_params(request)
+    return bool(fields or omit)
+
+
+def select_field_names(names: list[str], request: Any) -> list[str]:
+    """Apply ``fields``/``omit`` to ``names``; unknown names are ignored."""
+    fields, omit = fieldset_params(request)
+    selected = [n for n in names if n in fields] if fields else list(names)
+    # Never drop the identifier; clients need it to address the resource
+    if "id" in names and "id" not in selected:
+        selected.insert(0, "id")
+    return [n for n in selected if n not in omit or n == "id"]
+
+
+class SparseFieldsetsSerializerMixin:
+    """
+    Drop serializer fields that were not requested.
+
+    Only the top-level serializer bound to the request is pruned; nested
+    serializers are declared without context and keep their full shape.
+    Writes are never pruned: dropped fields would be left out of validation.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")  # type: ignore[attr-defined]
+        if (
+            request is None
+            or request.method not in SAFE_METHODS
+            or not has_fieldset_params(request)
+        ):
+            return
+        keep = set(select_field_names(list(self.fields), request))  # type: ignore[attr-defined]
+        for name in list(self.fields):  # type: ignore[attr-defined]
+            if name not in keep:
+                self.fields.pop(name)  # type: ignore[attr-defined]
+
+
+def _reverse_relations(qs: QuerySet, field_names: list[str]) -> list[str]:
+    opts = qs.model._meta
+    out = []
+    for name in field_names:
+        try:
+            field = opts.get_field(name)
+        except FieldDoesNotExist:
+            continue
+        if field.one_to_many or field.many_to_many:
+            out.append(name)
+    return out
+
+
+def prune_queryset(qs: QuerySet, field_names: list[str]) -> QuerySet:
+    """
+    Restrict ``qs`` to the columns backing ``field_names``.
+
+    Concrete columns go into ``.only()``; reverse relations are prefetched.
+    If any name does not map onto a model field we leave the column list alone
+    rather than risk a lazy per-row load of a deferred column.
+    """
+    opts = qs.model._meta
+    columns: list[str] = []
+    for name in field_names:
+        try:
+            field = opts.get_field(name)
+        except FieldDoesNotExist:
+            columns = []
+            break
+        if field.concrete:
+            columns.append(name)
+        elif not (field.one_to_many or field.many_to_many):
+            columns = []
+            break
+    if columns:
+        qs = qs.only(*columns)
+    prefetch = _reverse_relations(qs, field_names)
+    return qs.prefetch_related(*prefetch) if prefetch else qs
+
+
+def defer_omitted(qs: QuerySet, declared: list[str], omit: set[str]) -> QuerySet:
+    """Defer the concrete columns behind ``omit`` and prefetch what remains nested."""
+    opts = qs.model._meta
+    columns = []
+    for name in omit:
+        try:
+            field = opts.get_field(name)
+        except FieldDoesNotExist:
+            continue
+        if field.concrete and not field.primary_key and not field.is_relation:
+            columns.append(name)
+    if columns:
+        qs = qs.defer(*columns)
+    prefetch = _reverse_relations(qs, [n for n in declared if n not in omit])
+    return qs.prefetch_related(*prefetch) if prefetch else qs
+
+
+class SparseFieldsetsViewMixin:
+    """
+    Viewset support for sparse fieldsets and compact list representations.
+
+    ``list_serializer_class`` (optional) is used for the ``list`` action when no
+    fieldset params are given, so large columns stay out of list payloads.
+    """
+
+    list_serializer_class: Any = None
+
+    def get_serializer_class(self) -> Any:
+        request = getattr(self, "request", None)
+        if (
+            getattr(self, "action", None) == "list"
+            and self.list_serializer_class is not None
+            and not has_fieldset_params(request)
+        ):
+            return self.list_serializer_class
+        return super().get_serializer_class()  # type: ignore[misc]
+
+    def get_queryset(self) -> QuerySet:
+        qs = super().get_queryset()  # type: ignore[misc]
+        request = getattr(self, "request", None)
+        if request is None or request.method not in SAFE_METHODS:
+            return qs
+
+        declared = list(self.get_serializer_class().Meta.fields)
+        fields, omit = fieldset_params(request)
+        if omit and not fields:
+            return defer_omitted(qs, declared, omit - {"id"})
+        return prune_queryset(qs, select_field_names(declared, request))
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import statistics
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import RequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import async_views, views
+from courses.models import Course, Lesson, Module
+from jobs.models import AIJob, ExportArtifact
+
+
+@dataclass
+class Fixture:
+    user: Any
+    course: Any
+    job: Any
+    artifact: Any
+
+
+def create_fixture(modules: int, lessons: int) -> Fixture:
+    user = User.objects.create_user(f"bench-{uuid.uuid4().hex[:12]}")
+    course = Course.objects.create(title="Bench course", audience="bench", owner=user)
+    for m in range(modules):
+        module = Module.objects.create(course=course, title=f"Module {m}")
+        for i in range(lessons):
+            Lesson.objects.create(
+                module=module, title=f"Lesson {m}.{i}", content="Body " * 200
+            )
+    job = AIJob.objects.create(
+        owner=user, kind=AIJob.JobKind.EXPORT, output_data={"rows": list(range(500))}
+    )
+    artifact = ExportArtifact.objects.create(
+        course=course,
+        job=job,
+        kind=ExportArtifact.ExportKind.SCORM,
+        file_path="bench.zip",
+        checksum="0" * 64,
+    )
+    return Fixture(user=user, course=course, job=job, artifact=artifact)
+
+
+def _sync_call(view: Callable[..., Any], request: Any, kwargs: dict[str, Any]) -> int:
+    response = view(request, **kwargs)
+    if hasattr(response, "render"):
+        response.render()
+    return response.status_code
+
+
+async def _measure(
+    call: Callable[[], Awaitable[int]], total: int, concurrency: int
+) -> tuple[float, float]:
+    gate = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one() -> None:
+        async with gate:
+            start = time.perf_counter()
+            status = await call()
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                raise RuntimeError(f"unexpected status {status}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    wall = time.perf_counter() - start
+    p95 = (
+        statistics.quantiles(latencies, n=20)[-1]
+        if len(latencies) > 1
+        else latencies[0]
+    )
+    return total / wall, p95
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput of the sync DRF read paths and their async "
+        "counterparts at high concurrency, the way an ASGI server runs them"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=400)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--modules", type=int, default=5)
+        parser.add_argument("--lessons", type=int, default=10)
+
+    def handle(self, *args, **options):
+        fixture = create_fixture(options["modules"], options["lessons"])
+        try:
+            rows = asyncio.run(
+                self._run(fixture, options["requests"], options["concurrency"])
+            )
+        finally:
+            fixture.course.delete()
+            fixture.user.delete()
+
+        self.stdout.write(
+            f"{options['requests']} requests, concurrency {options['concurrency']}"
+        )
+        self.stdout.write(
+            f"{'endpoint':<20}{'sync req/s':>12}{'async req/s':>13}{'sync p95 ms':>13}{'async p95 ms':>14}"
+        )
+        for label, (sync_rps, sync_p95), (async_rps, async_p95) in rows:
+            self.stdout.write(
+                f"{label:<20}{sync_rps:>12.0f}{async_rps:>13.0f}"
+                f"{sync_p95 * 1000:>13.1f}{async_p95 * 1000:>14.1f}"
+            )
+
+    async def _run(self, fixture: Fixture, total: int, concurrency: int) -> list[Any]:
+        factory = RequestFactory()
+        auth = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(fixture.user)}"}
+        endpoints = [
+            ("livez", views.livez, async_views.livez, {}),
+            (
+                "job status",
+                views.AIJobViewSet.as_view({"get": "retrieve"}),
+                async_views.job_status,
+                {"pk": fixture.job.pk},
+            ),
+            (
+                "artifact metadata",
+                views.ExportArtifactViewSet.as_view({"get": "retrieve"}),
+                async_views.artifact_metadata,
+                {"pk": fixture.artifact.pk},
+            ),
+            (
+                "course tree",
+                views.CourseViewSet.as_view({"get": "tree"}),
+                async_views.course_tree,
+                {"pk": fixture.course.pk},
+            ),
+        ]
+
+        # Sync views run the way Django's ASGI handler runs them: one at a
+        # time on the thread-sensitive executor.
+        run_sync = sync_to_async(_sync_call)
+        rows = []
+        for label, sync_view, async_view, kwargs in endpoints:
+
+            def sync_call(
+                view: Any = sync_view, kwargs: dict[str, Any] = kwargs
+            ) -> Awaitable[int]:
+                return run_sync(view, factory.get("/", **auth), kwargs)
+
+            async def async_call(
+                view: Any = async_view, kwargs: dict[str, Any] = kwargs
+            ) -> int:
+                return (await view(factory.get("/", **auth), **kwargs)).status_code
+
+            # Warm caches and connections before timing
+            await sync_call()
+            await async_call()
+            rows.append(
+                (
+                    label,
+                    await _measure(sync_call, total, concurrency),
+                    await _measure(async_call, total, concurrency),
+                )
+            )
+        await sync_to_async(connections.close_all)()
+        return rows
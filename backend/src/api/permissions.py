@@ -6,25 +6,15 @@ from django.conf import settings
 from rest_framework.permissions import SAFE_METHODS, BasePermission
 
 
-def _get_owner_from_obj(obj: Any) -> Any | None:
-    if hasattr(obj, "owner") and obj.owner is not None:
-        return obj.owner
-    # Module -> Course.owner
-    if obj.__class__.__name__ == "Module":
-        try:
-            return obj.course.owner
-        except Exception:
-            return None
-    # Lesson -> Module.course.owner
-    if obj.__class__.__name__ == "Lesson":
-        try:
-            return obj.module.course.owner
-        except Exception:
-            return None
+def _get_owner_id(obj: Any) -> Any | None:
+    # Course, AIJob and the content tree (Module/Lesson/Quiz/Question) all
+    # carry an owner_id column, denormalized where needed, so no parent loads
+    if hasattr(obj, "owner_id"):
+        return obj.owner_id
     # ExportArtifact -> Course.owner
     if obj.__class__.__name__ == "ExportArtifact":
         try:
-            return obj.course.owner
+            return obj.course.owner_id
         except Exception:
             return None
     return None
@@ -59,5 +49,5 @@ class OwnerOrReadOnly(BasePermission):
         if not (request.user and request.user.is_authenticated):
             return False
 
-        owner = _get_owner_from_obj(obj)
-        return bool(owner and owner == request.user)
+        owner_id = _get_owner_id(obj)
+        return owner_id is not None and owner_id == request.user.pk
@@ -1,17 +1,20 @@
+from django.conf import settings
 from rest_framework import serializers
 
 from assessment.models import Question, Quiz
 from courses.models import Course, Lesson, Module
 from jobs.models import AIJob, ExportArtifact
 
+from .fieldsets import SparseFieldsetsSerializerMixin
 
-class ModuleSerializer(serializers.ModelSerializer):
+
+class ModuleSerializer(SparseFieldsetsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Module
         fields = ["id", "course", "title", "order"]
 
 
-class LessonSerializer(serializers.ModelSerializer):
+class LessonSerializer(SparseFieldsetsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Lesson
         fields = [
@@ -26,7 +29,15 @@ class LessonSerializer(serializers.ModelSerializer):
         ]
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class LessonSummarySerializer(serializers.ModelSerializer):
+    """Compact lesson shape for list endpoints (no Markdown body or JSON blobs)."""
+
+    class Meta:
+        model = Lesson
+        fields = ["id", "module", "title", "estimated_minutes", "order"]
+
+
+class CourseSerializer(SparseFieldsetsSerializerMixin, serializers.ModelSerializer):
     modules = ModuleSerializer(many=True, read_only=True)
 
     class Meta:
@@ -44,7 +55,7 @@ class CourseSerializer(serializers.ModelSerializer):
         ]
 
 
-class QuestionSerializer(serializers.ModelSerializer):
+class QuestionSerializer(SparseFieldsetsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Question
         fields = [
@@ -61,7 +72,7 @@ class QuestionSerializer(serializers.ModelSerializer):
         ]
 
 
-class QuizSerializer(serializers.ModelSerializer):
+class QuizSerializer(SparseFieldsetsSerializerMixin, serializers.ModelSerializer):
     questions = QuestionSerializer(many=True, read_only=True)
 
     class Meta:
@@ -81,7 +92,44 @@ class QuizSerializer(serializers.ModelSerializer):
         ]
 
 
-class AIJobSerializer(serializers.ModelSerializer):
+class QuizSummarySerializer(serializers.ModelSerializer):
+    """Compact quiz shape for list endpoints (questions are not embedded)."""
+
+    class Meta:
+        model = Quiz
+        fields = [
+            "id",
+            "title",
+            "difficulty",
+            "target_questions",
+            "time_limit_minutes",
+            "created_at",
+            "updated_at",
+        ]
+
+
+class ModuleTreeSerializer(ModuleSerializer):
+    lessons = LessonSerializer(many=True, read_only=True)
+
+    class Meta(ModuleSerializer.Meta):
+        fields = [*ModuleSerializer.Meta.fields, "lessons"]
+
+
+class CourseTreeSerializer(CourseSerializer):
+    """Whole course for editor/preview/export clients: modules, lessons, quizzes."""
+
+    modules = ModuleTreeSerializer(many=True, read_only=True)
+    quizzes = serializers.SerializerMethodField()
+
+    class Meta(CourseSerializer.Meta):
+        fields = [*CourseSerializer.Meta.fields, "quizzes"]
+
+    def get_quizzes(self, obj):
+        quizzes = Quiz.objects.filter(course_id=obj.pk).prefetch_related("questions")
+        return QuizSerializer(quizzes, many=True).data
+
+
+class AIJobSerializer(SparseFieldsetsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = AIJob
         fields = [
@@ -89,7 +137,9 @@ class AIJobSerializer(serializers.ModelSerializer):
             "kind",
             "status",
             "owner",
+            "parent",
             "input_data",
+            "use_result_cache",
             "output_data",
             "celery_task_id",
             "started_at",
@@ -103,9 +153,50 @@ class AIJobSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+        # Clients submit kind and input; everything else belongs to jobs.engine
+        read_only_fields = [
+            "status",
+            "owner",
+            "parent",
+            "output_data",
+            "celery_task_id",
+            "started_at",
+            "completed_at",
+            "error_message",
+            "retry_count",
+            "cost_cents",
+            "token_usage",
+            "progress_percentage",
+            "progress_message",
+        ]
+
+    def validate_kind(self, value):
+        if value not in AIJob.RUNNABLE_KINDS:
+            raise serializers.ValidationError(
+                "Batches are created through jobs/batch/."
+            )
+        return value
+
+
+class AIJobBatchItemSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=AIJob.RUNNABLE_KINDS)
+    input_data = serializers.JSONField(required=False, default=dict)
+    use_result_cache = serializers.BooleanField(required=False, default=True)
+
+
+class AIJobBatchSerializer(serializers.Serializer):
+    jobs = AIJobBatchItemSerializer(many=True, allow_empty=False)
+
+    def validate_jobs(self, value):
+        limit = getattr(settings, "AIJOB_BATCH_MAX_SIZE", 500)
+        if len(value) > limit:
+            raise serializers.ValidationError(f"A batch holds at most {limit} jobs.")
+        return value
 
 
-class ExportArtifactSerializer(serializers.ModelSerializer):
+class ExportArtifactSerializer(
+    SparseFieldsetsSerializerMixin, serializers.ModelSerializer
+):
     class Meta:
         model = ExportArtifact
         fields = [
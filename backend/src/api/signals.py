@@ -0,0 +1,99 @@
+"""
+Invalidate cached representations (``api.cache``) when content changes.
+
+Each handler names exactly the representations that embed the changed row:
+its own, the parent course's (courses embed their modules) and the course
+tree. Rows re-attached to another course also invalidate the previous one.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from django.db.models.signals import post_delete, post_save
+
+from assessment.models import Question, Quiz
+from courses.models import Course, Lesson, Module
+from courses.ordering import orders_changed
+
+from . import cache
+
+
+def _previous_course_id(instance: Any) -> Any:
+    # OwnershipKeysMixin still holds the loaded keys while post_save runs
+    loaded = getattr(instance, "_loaded_ownership", None)
+    fields = getattr(instance, "ownership_fields", ())
+    if loaded and "course_id" in fields:
+        return loaded[fields.index("course_id")]
+    return None
+
+
+def _refs(kind: str, model: Any, **lookup: Any) -> list[tuple[str, Any]]:
+    return [
+        (kind, pk)
+        for pk in model._default_manager.filter(**lookup).values_list("pk", flat=True)
+    ]
+
+
+def _course_refs(*course_ids: Any) -> list[tuple[str, Any]]:
+    return [(kind, cid) for cid in course_ids for kind in (cache.COURSE, cache.TREE)]
+
+
+def course_changed(
+    sender: Any, instance: Course, created: bool = False, **kwargs: Any
+) -> None:
+    refs = _course_refs(instance.pk)
+    saved = kwargs.get("signal") is post_save and not created
+    if saved and instance.ownership_changed(adding=False):
+        # Module/lesson bodies are keyed by owner; retire the old owner's copies
+        refs += _refs(cache.MODULE, Module, course_id=instance.pk)
+        refs += _refs(cache.LESSON, Lesson, course_id=instance.pk)
+    cache.invalidate(refs)
+
+
+def module_changed(sender: Any, instance: Module, **kwargs: Any) -> None:
+    previous = _previous_course_id(instance)
+    refs = [(cache.MODULE, instance.pk), *_course_refs(instance.course_id, previous)]
+    if previous not in (None, instance.course_id):
+        refs += _refs(cache.LESSON, Lesson, module_id=instance.pk)
+    cache.invalidate(refs)
+
+
+def lesson_changed(sender: Any, instance: Lesson, **kwargs: Any) -> None:
+    cache.invalidate(
+        [
+            (cache.LESSON, instance.pk),
+            (cache.TREE, instance.course_id),
+            (cache.TREE, _previous_course_id(instance)),
+        ]
+    )
+
+
+def assessment_changed(sender: Any, instance: Quiz | Question, **kwargs: Any) -> None:
+    cache.invalidate(
+        [(cache.TREE, instance.course_id), (cache.TREE, _previous_course_id(instance))]
+    )
+
+
+def reordered(sender: Any, pks: list[Any], **kwargs: Any) -> None:
+    rows = sender._default_manager.filter(pk__in=pks)
+    course_ids = set(rows.values_list("course_id", flat=True))
+    refs = [(cache.TREE, cid) for cid in course_ids]
+    if sender is Module:
+        refs += [(cache.COURSE, cid) for cid in course_ids]
+        refs += [(cache.MODULE, pk) for pk in pks]
+    elif sender is Lesson:
+        refs += [(cache.LESSON, pk) for pk in pks]
+    cache.invalidate(refs)
+
+
+def connect() -> None:
+    for signal in (post_save, post_delete):
+        signal.connect(course_changed, sender=Course, dispatch_uid="api.cache.course")
+        signal.connect(module_changed, sender=Module, dispatch_uid="api.cache.module")
+        signal.connect(lesson_changed, sender=Lesson, dispatch_uid="api.cache.lesson")
+        signal.connect(assessment_changed, sender=Quiz, dispatch_uid="api.cache.quiz")
+        signal.connect(
+            assessment_changed, sender=Question, dispatch_uid="api.cache.question"
+        )
+    orders_changed.connect(reordered, dispatch_uid="api.cache.reordered")
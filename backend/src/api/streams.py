@@ -0,0 +1,108 @@
+"""
+Server-Sent Events for AIJob progress.
+
+These are plain async Django views (DRF has no async views) so that on the
+ASGI deployment an open stream costs a coroutine, not a worker thread. Events
+come from the ``jobs.events`` pub/sub channel; the database is read once for
+the initial snapshot.
+
+* ``GET /api/v1/jobs/<id>/events/``: one job; closes once it finishes.
+* ``GET /api/v1/jobs/events/``: every active job of the caller.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from core import jsonlib
+from core.exceptions import problem_response
+from jobs import events
+from jobs.models import AIJob
+
+from .async_views import authenticate
+
+TERMINAL = {AIJob.Status.COMPLETED, AIJob.Status.FAILED, AIJob.Status.CANCELLED}
+ACTIVE = [AIJob.Status.PENDING, AIJob.Status.RUNNING]
+
+
+def _frame(event: dict[str, Any]) -> bytes:
+    return b"event: job\ndata: " + jsonlib.dumps(event) + b"\n\n"
+
+
+async def _stream(
+    subscription: events.Subscription,
+    snapshot: list[dict[str, Any]],
+    job_id: str | None = None,
+) -> AsyncIterator[bytes]:
+    loop = asyncio.get_running_loop()
+    heartbeat = getattr(settings, "JOB_EVENTS_HEARTBEAT_SECONDS", 15)
+    deadline = loop.time() + getattr(settings, "JOB_EVENTS_MAX_STREAM_SECONDS", 300)
+    try:
+        # Ask EventSource to reconnect quickly after the stream is recycled
+        yield b"retry: 3000\n\n"
+        for initial in snapshot:
+            yield _frame(initial)
+            if job_id is not None and initial["status"] in TERMINAL:
+                return
+        while (remaining := deadline - loop.time()) > 0:
+            event = await subscription.get(timeout=min(heartbeat, remaining))
+            if event is None:
+                yield b": keepalive\n\n"
+                continue
+            if job_id is not None and event["id"] != job_id:
+                continue
+            yield _frame(event)
+            if job_id is not None and event["status"] in TERMINAL:
+                return
+    finally:
+        await subscription.close()
+
+
+def _response(stream: AsyncIterator[bytes]) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(stream, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Disable proxy buffering (nginx) so events are flushed as they happen
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+async def job_events(request: Any, pk: Any) -> Any:
+    user = await sync_to_async(authenticate)(request)
+    if user is None:
+        return problem_response(401, "Authentication credentials were not provided.")
+
+    # Subscribe before reading the snapshot so no update falls in between
+    subscription = await events.subscribe_owner(user.pk)
+    try:
+        job = await AIJob.objects.filter(pk=pk, owner_id=user.pk).afirst()
+    except BaseException:
+        await subscription.close()
+        raise
+    if job is None:
+        await subscription.close()
+        return problem_response(404, "Job not found.")
+    return _response(_stream(subscription, [events.job_event(job)], job_id=str(job.pk)))
+
+
+async def active_job_events(request: Any) -> Any:
+    user = await sync_to_async(authenticate)(request)
+    if user is None:
+        return problem_response(401, "Authentication credentials were not provided.")
+
+    subscription = await events.subscribe_owner(user.pk)
+    jobs = AIJob.objects.filter(owner_id=user.pk, status__in=ACTIVE).order_by(
+        "created_at"
+    )
+    try:
+        snapshot = [events.job_event(job) async for job in jobs]
+    except BaseException:
+        # The stream that would close it never starts
+        await subscription.close()
+        raise
+    return _response(_stream(subscription, snapshot))
@@ -2,18 +2,25 @@
 API URL configuration.
 """
 
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from . import async_views
+from .streams import active_job_events, job_events
 from .views import (
     AIJobViewSet,
+    AutocompleteView,
     CourseViewSet,
     ExportArtifactViewSet,
     LessonViewSet,
     ModuleViewSet,
     QuestionViewSet,
     QuizViewSet,
+    RepresentationCacheStatsView,
+    SchedulerStatsView,
+    SearchView,
     healthz,
     livez,
     readinessz,
@@ -29,11 +36,45 @@ router.register(r"questions", QuestionViewSet)
 router.register(r"jobs", AIJobViewSet)
 router.register(r"artifacts", ExportArtifactViewSet)
 
+# Async probes and course tree for ASGI workers (see api.async_views)
+ASYNC_READS = getattr(settings, "API_ASYNC_READS", False)
+
 urlpatterns = [
-    path("healthz", healthz, name="healthz"),
-    path("livez", livez, name="livez"),
-    path("readinessz", readinessz, name="readinessz"),
+    path("healthz", async_views.healthz if ASYNC_READS else healthz, name="healthz"),
+    path("livez", async_views.livez if ASYNC_READS else livez, name="livez"),
+    path(
+        "readinessz",
+        async_views.readinessz if ASYNC_READS else readinessz,
+        name="readinessz",
+    ),
     path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("search/", SearchView.as_view(), name="search"),
+    path(
+        "search/autocomplete/", AutocompleteView.as_view(), name="search-autocomplete"
+    ),
+    # Registered ahead of the router so "events" is not taken for a job id
+    path("jobs/events/", active_job_events, name="job-events"),
+    path(
+        "jobs/scheduler/stats/",
+        SchedulerStatsView.as_view(),
+        name="job-scheduler-stats",
+    ),
+    path("jobs/<uuid:pk>/events/", job_events, name="job-detail-events"),
+    path("jobs/<uuid:pk>/status/", async_views.job_status, name="job-status"),
+    path(
+        "artifacts/<uuid:pk>/metadata/",
+        async_views.artifact_metadata,
+        name="artifact-metadata",
+    ),
+    path("cache/stats/", RepresentationCacheStatsView.as_view(), name="cache-stats"),
     path("", include(router.urls)),
 ]
+
+if ASYNC_READS:
+    urlpatterns.insert(
+        0,
+        path(
+            "courses/<uuid:pk>/tree/", async_views.course_tree, name="course-tree-async"
+        ),
+    )
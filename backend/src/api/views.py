@@ -1,23 +1,38 @@
 from django.conf import settings
-from django.contrib.contenttypes.models import ContentType
-from django.db.models import Q
-from django.http import JsonResponse
-from rest_framework import viewsets
+from django.http import Http404, JsonResponse
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotAuthenticated, ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from assessment.models import Question, Quiz
 from core.health import health_payload
+from courses import ordering
+from courses import search as content_search
 from courses.models import Course, Lesson, Module
+from jobs import batches, engine, scheduler
 from jobs.models import AIJob, ExportArtifact
 
+from . import cache as representation_cache
+from .cache import CachedRetrieveMixin
+from .fastpath import FastListMixin
+from .fieldsets import SparseFieldsetsViewMixin
 from .permissions import OwnerOrReadOnly
 from .serializers import (
+    AIJobBatchSerializer,
     AIJobSerializer,
     CourseSerializer,
+    CourseTreeSerializer,
     ExportArtifactSerializer,
     LessonSerializer,
+    LessonSummarySerializer,
     ModuleSerializer,
     QuestionSerializer,
     QuizSerializer,
+    QuizSummarySerializer,
 )
 
 
@@ -36,13 +51,42 @@ def readinessz(_request):
     return JsonResponse(health_payload())
 
 
-class CourseViewSet(viewsets.ModelViewSet):
+class MoveActionMixin:
+    """
+    ``POST {id}/move/`` with ``{"before": <id>}``, ``{"after": <id>}`` or
+    ``{"position": "first"|"last"}``; rewrites only the moved row's order.
+    """
+
+    ordering_parent_field: str
+
+    @action(detail=True, methods=["post"])
+    def move(self, request, pk=None):
+        obj = self.get_object()  # type: ignore[attr-defined]
+        siblings = ordering.Siblings(type(obj), self.ordering_parent_field)
+        try:
+            siblings.move(
+                obj,
+                before=request.data.get("before"),
+                after=request.data.get("after"),
+                position=request.data.get("position"),
+            )
+        except ordering.OrderingError as exc:
+            raise ValidationError({"detail": str(exc)}) from exc
+        return Response(self.get_serializer(obj).data)  # type: ignore[attr-defined]
+
+
+class CourseViewSet(
+    FastListMixin, CachedRetrieveMixin, SparseFieldsetsViewMixin, viewsets.ModelViewSet
+):
     queryset = Course.objects.all().order_by("-id")
     serializer_class = CourseSerializer
     permission_classes = [OwnerOrReadOnly]
+    cache_kind = representation_cache.COURSE
 
-    def get_queryset(self):  # type: ignore[override]
+    def get_queryset(self):
         qs = super().get_queryset()
+        if self.action == "tree":
+            qs = qs.prefetch_related("modules__lessons")
         # Keep broad reads in tests to satisfy legacy fixtures
         if getattr(settings, "ALLOW_ANON_WRITE_FOR_TESTS", False):
             return qs
@@ -51,7 +95,7 @@ class CourseViewSet(viewsets.ModelViewSet):
             return qs.filter(owner=user)
         return qs.none()
 
-    def perform_create(self, serializer):  # type: ignore[override]
+    def perform_create(self, serializer):
         # Assign owner on create when authenticated; in tests we allow anon
         user = getattr(self.request, "user", None)
         if user and user.is_authenticated:
@@ -59,28 +103,50 @@ class CourseViewSet(viewsets.ModelViewSet):
         else:
             serializer.save()
 
+    @action(detail=True, methods=["get"])
+    def tree(self, request, pk=None):
+        """Course with modules, lessons and attached quizzes in one payload."""
+        pk = representation_cache.normalize_pk(Course, pk)
+        if pk is None:
+            raise Http404
+
+        def build():
+            course = self.get_object()
+            data = CourseTreeSerializer(
+                course, context=self.get_serializer_context()
+            ).data
+            return course.owner_id, data
+
+        return representation_cache.cached_response(
+            request, representation_cache.TREE, pk, build
+        )
 
-class ModuleViewSet(viewsets.ModelViewSet):
+
+class ModuleViewSet(
+    CachedRetrieveMixin, MoveActionMixin, SparseFieldsetsViewMixin, viewsets.ModelViewSet
+):
     queryset = Module.objects.all().order_by("course_id", "order")
     serializer_class = ModuleSerializer
+    cache_kind = representation_cache.MODULE
+    ordering_parent_field = "course"
     permission_classes = [OwnerOrReadOnly]
 
-    def get_queryset(self):  # type: ignore[override]
+    def get_queryset(self):
         qs = super().get_queryset()
         if getattr(settings, "ALLOW_ANON_WRITE_FOR_TESTS", False):
             return qs
         user = getattr(self.request, "user", None)
         if user and user.is_authenticated:
-            return qs.filter(course__owner=user)
+            return qs.filter(owner=user)
         return qs.none()
 
-    def perform_create(self, serializer):  # type: ignore[override]
+    def perform_create(self, serializer):
         if getattr(settings, "ALLOW_ANON_WRITE_FOR_TESTS", False):
             serializer.save()
             return
         course = serializer.validated_data.get("course")
         user = getattr(self.request, "user", None)
-        if not (user and user.is_authenticated and course and course.owner == user):
+        if not (user and user.is_authenticated and course and course.owner_id == user.pk):
             # Let permission system surface 403 appropriately
             from rest_framework.exceptions import PermissionDenied
 
@@ -88,88 +154,82 @@ class ModuleViewSet(viewsets.ModelViewSet):
         serializer.save()
 
 
-class LessonViewSet(viewsets.ModelViewSet):
+class LessonViewSet(
+    FastListMixin,
+    CachedRetrieveMixin,
+    MoveActionMixin,
+    SparseFieldsetsViewMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Lesson.objects.all()
     serializer_class = LessonSerializer
+    list_serializer_class = LessonSummarySerializer
+    ordering_parent_field = "module"
+    cache_kind = representation_cache.LESSON
     permission_classes = [OwnerOrReadOnly]
 
-    def get_queryset(self):  # type: ignore[override]
+    def get_queryset(self):
         qs = super().get_queryset()
         if getattr(settings, "ALLOW_ANON_WRITE_FOR_TESTS", False):
             return qs
         user = getattr(self.request, "user", None)
         if user and user.is_authenticated:
-            return qs.filter(module__course__owner=user)
+            return qs.filter(owner=user)
         return qs.none()
 
-    def perform_create(self, serializer):  # type: ignore[override]
+    def perform_create(self, serializer):
         if getattr(settings, "ALLOW_ANON_WRITE_FOR_TESTS", False):
             serializer.save()
             return
         module = serializer.validated_data.get("module")
         user = getattr(self.request, "user", None)
-        if not (user and user.is_authenticated and module and module.course.owner == user):
+        if not (user and user.is_authenticated and module and module.owner_id == user.pk):
             from rest_framework.exceptions import PermissionDenied
 
             raise PermissionDenied("You do not own the parent module/course.")
         serializer.save()
 
 
-class QuizViewSet(viewsets.ModelViewSet):
+class QuizViewSet(SparseFieldsetsViewMixin, viewsets.ModelViewSet):
     queryset = Quiz.objects.all()
     serializer_class = QuizSerializer
+    list_serializer_class = QuizSummarySerializer
     permission_classes = [OwnerOrReadOnly]
 
-    def get_queryset(self):  # type: ignore[override]
+    def get_queryset(self):
         qs = super().get_queryset()
         if getattr(settings, "ALLOW_ANON_WRITE_FOR_TESTS", False):
             return qs
         user = getattr(self.request, "user", None)
         if user and user.is_authenticated:
-            # Quizzes can attach to Module or Lesson; filter to those owned by user
-            ct_module = ContentType.objects.get_for_model(Module)
-            ct_lesson = ContentType.objects.get_for_model(Lesson)
-            module_ids = Module.objects.filter(course__owner=user).values_list("id", flat=True)
-            lesson_ids = Lesson.objects.filter(module__course__owner=user).values_list("id", flat=True)
-            return qs.filter(
-                Q(content_type=ct_module, object_id__in=module_ids)
-                | Q(content_type=ct_lesson, object_id__in=lesson_ids)
-            )
+            # owner_id is denormalized from the attached Module/Lesson
+            return qs.filter(owner=user)
         return qs.none()
 
 
-class QuestionViewSet(viewsets.ModelViewSet):
+class QuestionViewSet(MoveActionMixin, SparseFieldsetsViewMixin, viewsets.ModelViewSet):
     queryset = Question.objects.all()
     serializer_class = QuestionSerializer
+    ordering_parent_field = "quiz"
     permission_classes = [OwnerOrReadOnly]
 
-    def get_queryset(self):  # type: ignore[override]
+    def get_queryset(self):
         qs = super().get_queryset()
         if getattr(settings, "ALLOW_ANON_WRITE_FOR_TESTS", False):
             return qs
         user = getattr(self.request, "user", None)
         if user and user.is_authenticated:
-            # Limit to questions whose quiz is attached to user's content
-            quiz_qs = QuizViewSet.queryset  # base queryset
-            # Build same filter as QuizViewSet
-            ct_module = ContentType.objects.get_for_model(Module)
-            ct_lesson = ContentType.objects.get_for_model(Lesson)
-            module_ids = Module.objects.filter(course__owner=user).values_list("id", flat=True)
-            lesson_ids = Lesson.objects.filter(module__course__owner=user).values_list("id", flat=True)
-            allowed_quizzes = quiz_qs.filter(
-                Q(content_type=ct_module, object_id__in=module_ids)
-                | Q(content_type=ct_lesson, object_id__in=lesson_ids)
-            ).values_list("id", flat=True)
-            return qs.filter(quiz_id__in=allowed_quizzes)
+            # owner_id is denormalized from the quiz's attached content
+            return qs.filter(owner=user)
         return qs.none()
 
 
-class AIJobViewSet(viewsets.ModelViewSet):
+class AIJobViewSet(FastListMixin, SparseFieldsetsViewMixin, viewsets.ModelViewSet):
     queryset = AIJob.objects.all().order_by("-created_at")
     serializer_class = AIJobSerializer
     permission_classes = [OwnerOrReadOnly]
 
-    def get_queryset(self):  # type: ignore[override]
+    def get_queryset(self):
         qs = super().get_queryset()
         if getattr(settings, "ALLOW_ANON_WRITE_FOR_TESTS", False):
             return qs
@@ -178,25 +238,61 @@ class AIJobViewSet(viewsets.ModelViewSet):
             return qs.filter(owner=user)
         return qs.none()
 
-    def perform_create(self, serializer):  # type: ignore[override]
+    def perform_create(self, serializer):
         user = getattr(self.request, "user", None)
         if user and user.is_authenticated:
-            serializer.save(owner=user)
+            engine.enqueue(serializer.save(owner=user))
         else:
             # In tests this path is not exercised; disallow to avoid owner spoofing
-            from rest_framework.exceptions import NotAuthenticated
-
             if getattr(settings, "ALLOW_ANON_WRITE_FOR_TESTS", False):
                 raise NotAuthenticated("Authentication required to create AI jobs.")
             raise NotAuthenticated()
 
-
-class ExportArtifactViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=["post"])
+    def batch(self, request):
+        """
+        Create many jobs in one request: ``{"jobs": [{"kind", "input_data"}, ...]}``.
+
+        Returns the parent job (aggregate progress) and the child ids. With an
+        ``Idempotency-Key`` a repeat returns the original batch with 200.
+        """
+        user = getattr(request, "user", None)
+        if not (user and user.is_authenticated):
+            raise NotAuthenticated("Authentication required to create AI jobs.")
+        serializer = AIJobBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        parent, created = batches.submit(
+            user, serializer.validated_data["jobs"], request.headers.get("Idempotency-Key", "")
+        )
+        children = parent.children.order_by("created_at").values_list("pk", flat=True)
+        return Response(
+            {
+                "parent": AIJobSerializer(parent, context=self.get_serializer_context()).data,
+                "jobs": [str(pk) for pk in children],
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    @action(detail=True, methods=["post"])
+    def retry(self, request, pk=None):
+        """Re-run a batch's failed jobs; the others keep their results."""
+        job = self.get_object()
+        if job.kind != AIJob.JobKind.BATCH:
+            raise ValidationError({"kind": "Only batches can be retried."})
+        retried = batches.retry_failed(job.pk)
+        job.refresh_from_db()
+        return Response(
+            {"parent": AIJobSerializer(job, context=self.get_serializer_context()).data, "retried": retried},
+            status=status.HTTP_202_ACCEPTED if retried else status.HTTP_200_OK,
+        )
+
+
+class ExportArtifactViewSet(FastListMixin, SparseFieldsetsViewMixin, viewsets.ModelViewSet):
     queryset = ExportArtifact.objects.all().order_by("-created_at")
     serializer_class = ExportArtifactSerializer
     permission_classes = [OwnerOrReadOnly]
 
-    def get_queryset(self):  # type: ignore[override]
+    def get_queryset(self):
         qs = super().get_queryset()
         if getattr(settings, "ALLOW_ANON_WRITE_FOR_TESTS", False):
             return qs
@@ -205,14 +301,68 @@ class ExportArtifactViewSet(viewsets.ModelViewSet):
             return qs.filter(course__owner=user)
         return qs.none()
 
-    def perform_create(self, serializer):  # type: ignore[override]
+    def perform_create(self, serializer):
         if getattr(settings, "ALLOW_ANON_WRITE_FOR_TESTS", False):
             serializer.save()
             return
         course = serializer.validated_data.get("course")
         user = getattr(self.request, "user", None)
-        if not (user and user.is_authenticated and course and course.owner == user):
+        if not (user and user.is_authenticated and course and course.owner_id == user.pk):
             from rest_framework.exceptions import PermissionDenied
 
             raise PermissionDenied("You do not own the target course.")
         serializer.save()
+
+
+def _int_param(request: Request, name: str, default: int, maximum: int) -> int:
+    try:
+        return max(1, min(int(request.query_params.get(name, default)), maximum))
+    except (TypeError, ValueError):
+        return default
+
+
+class SearchView(APIView):
+    """
+    Ranked full-text search over the caller's lessons, quizzes and questions.
+
+    ``?q=`` is a web-search style query; ``?types=lesson,quiz`` narrows the
+    content types and ``?limit=`` caps the merged result list.
+    """
+
+    permission_classes = [OwnerOrReadOnly]
+
+    def get(self, request):
+        query = request.query_params.get("q", "")
+        types = [t for t in request.query_params.get("types", "").split(",") if t]
+        limit = _int_param(request, "limit", 20, 100)
+        results = content_search.search(query, request.user, types=types or None, limit=limit)
+        return Response({"query": query, "count": len(results), "results": results})
+
+
+class AutocompleteView(APIView):
+    """Typo-tolerant lesson/quiz title suggestions for ``?q=``."""
+
+    permission_classes = [OwnerOrReadOnly]
+
+    def get(self, request):
+        prefix = request.query_params.get("q", "")
+        limit = _int_param(request, "limit", 10, 50)
+        return Response({"results": content_search.autocomplete(prefix, request.user, limit=limit)})
+
+
+class RepresentationCacheStatsView(APIView):
+    """Hit/miss counters of the representation cache in this process."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(representation_cache.stats())
+
+
+class SchedulerStatsView(APIView):
+    """Waiting/in-flight AIJobs and wait times per owner and kind."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(scheduler.owner_stats())
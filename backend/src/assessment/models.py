@@ -4,13 +4,17 @@ Assessment models for OmniCourse project.
 
 import uuid
 
+from django.contrib.auth.models import User
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 
+from courses import ordering, ownership
 
-class Quiz(models.Model):
+
+class Quiz(ownership.OwnershipKeysMixin, models.Model):
     """
     Quiz/assessment entity that can be attached to lessons or modules.
     """
@@ -56,6 +60,28 @@ class Quiz(models.Model):
         default=list, help_text="Learning objectives this quiz assesses"
     )
 
+    # Maintained by a database trigger on PostgreSQL (see courses.search)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Denormalized from the attached module/lesson for ownership filters
+    course = models.ForeignKey(
+        "courses.Course",
+        on_delete=models.CASCADE,
+        related_name="+",
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=False,
+    )
+
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -64,11 +90,24 @@ class Quiz(models.Model):
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["content_type", "object_id"]),
+            models.Index(fields=["owner", "course"]),
         ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        self.course_id, self.owner_id = ownership.keys_for_object(
+            self.content_type_id, self.object_id
+        )
+        ownership.with_update_fields(kwargs, "course", "owner")
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if self.ownership_changed(adding):
+                ownership.propagate_from_quiz(self)
+        self.remember_ownership()
+
     @property
     def question_count(self):
         """Get actual number of questions."""
@@ -93,7 +132,8 @@ class Question(models.Model):
     # Question content
     question_type = models.CharField(max_length=20, choices=QuestionType.choices)
     prompt = models.TextField(help_text="The question text")
-    order = models.PositiveIntegerField(default=0)
+    # Sparse: siblings are spaced ORDER_GAP apart (see courses.ordering)
+    order = models.PositiveBigIntegerField(default=0)
 
     # Scoring
     points = models.PositiveIntegerField(
@@ -118,6 +158,28 @@ class Question(models.Model):
         help_text="Learning objective this question assesses",
     )
 
+    # Maintained by a database trigger on PostgreSQL (see courses.search)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Denormalized from quiz for ownership filters
+    course = models.ForeignKey(
+        "courses.Course",
+        on_delete=models.CASCADE,
+        related_name="+",
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=False,
+    )
+
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -128,11 +190,20 @@ class Question(models.Model):
         indexes = [
             models.Index(fields=["quiz", "order"]),
             models.Index(fields=["question_type"]),
+            models.Index(fields=["owner", "course"]),
         ]
 
     def __str__(self):
         return f"{self.quiz.title} - Q{self.order + 1}"
 
+    def save(self, *args, **kwargs):
+        self.course_id = self.quiz.course_id
+        self.owner_id = self.quiz.owner_id
+        ownership.with_update_fields(kwargs, "course", "owner")
+        with transaction.atomic():
+            ordering.assign_order(self, ordering.Siblings(Question, "quiz"))
+            super().save(*args, **kwargs)
+
     def clean(self):
         """Validate question data based on type."""
         from django.core.exceptions import ValidationError
@@ -1 +1,4 @@
-__all__: list[str] = []
+# Load the Celery app (if installed) whenever Django starts so tasks register
+from .celery import app as celery_app
+
+__all__: list[str] = ["celery_app"]
@@ -7,5 +7,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings.prod")
+# Serve hot reads from the async views (api.async_views) under ASGI
+os.environ.setdefault("API_ASYNC_READS", "true")
 
 application = get_asgi_application()
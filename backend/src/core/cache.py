@@ -0,0 +1,447 @@
+"""
+Shared Redis cache tier.
+
+``ResilientRedisCache`` is a Django cache backend that keeps entries in Redis,
+so gunicorn workers and pods share the idempotency and representation caches
+instead of each holding a private LocMem copy. Clients come from a pluggable
+factory (``OPTIONS["CLIENT_FACTORY"]``). The default builds one
+``redis.ConnectionPool`` per URL per process, shared by every thread's backend
+instance. ``fake_redis_client`` is an in-process stand-in for tests.
+
+When Redis fails ``FAILURE_THRESHOLD`` times in a row, a circuit breaker opens
+and the backend serves from a local-memory cache for ``RECOVERY_SECONDS``
+before trying Redis again. Keys written while degraded are deleted from Redis
+once it recovers, so stale entries written before the outage are not served.
+``KEY_PREFIX`` and ``VERSION`` work as for any Django cache.
+"""
+
+from __future__ import annotations
+
+import logging
+import pickle
+import threading
+import time
+from functools import cache
+from typing import Any
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.module_loading import import_string
+
+try:  # Optional dependency
+    import redis
+except Exception:  # pragma: no cover
+    redis = None
+
+logger = logging.getLogger("omnicourse.cache")
+
+TRANSIENT_ERRORS: tuple[type[BaseException], ...] = (OSError,) + (
+    (redis.RedisError,) if redis is not None else ()
+)
+
+# Keys remembered while degraded; beyond this, recovery cannot clean up fully
+MAX_DIRTY_KEYS = 10_000
+
+
+@cache
+def redis_client(
+    url: str,
+    max_connections: int = 50,
+    socket_timeout: float = 0.25,
+    socket_connect_timeout: float = 0.25,
+) -> Any:
+    """Default client factory: one pooled client per URL and options, per process."""
+    if redis is None:
+        raise RuntimeError("The redis package is required for ResilientRedisCache")
+    pool = redis.ConnectionPool.from_url(
+        url,
+        max_connections=max_connections,
+        socket_timeout=socket_timeout,
+        socket_connect_timeout=socket_connect_timeout,
+    )
+    return redis.Redis(connection_pool=pool)
+
+
+class CircuitBreaker:
+    """
+    Closed until ``threshold`` consecutive failures, then open for ``recovery``
+    seconds; after that a single trial call is let through (half-open).
+    """
+
+    def __init__(self, threshold: int = 5, recovery: float = 30.0) -> None:
+        self.threshold = threshold
+        self.recovery = recovery
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.recovery:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self._opened_at < self.recovery:
+                return False
+            self._trial = True
+            return True
+
+    def success(self) -> bool:
+        """Record a success; returns ``True`` if it closed an open breaker."""
+        with self._lock:
+            recovered = self._opened_at is not None
+            self._failures, self._opened_at, self._trial = 0, None, False
+            return recovered
+
+    def failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.threshold:
+                if self._opened_at is None:
+                    logger.warning("Redis cache unavailable; serving from local memory")
+                self._opened_at, self._trial = time.monotonic(), False
+
+
+@cache
+def _shared_state(
+    location: str, threshold: int, recovery: float
+) -> tuple[CircuitBreaker, set[str]]:
+    # Django builds a backend instance per thread; breaker and dirty keys are per process
+    return CircuitBreaker(threshold, recovery), set()
+
+
+def _dumps(value: Any) -> Any:
+    # Plain ints stay raw so INCRBY works on them
+    return value if type(value) is int else pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+def _loads(raw: Any) -> Any:
+    if raw is None:
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        return pickle.loads(raw)
+
+
+class ResilientRedisCache(BaseCache):
+    def __init__(self, server: str, params: dict[str, Any]) -> None:
+        super().__init__(params)
+        self._url = server if isinstance(server, str) else server[0]
+        options = params.get("OPTIONS", {})
+        factory = options.get("CLIENT_FACTORY", redis_client)
+        self._factory = import_string(factory) if isinstance(factory, str) else factory
+        self._client_options = {
+            name.lower(): options[name]
+            for name in ("MAX_CONNECTIONS", "SOCKET_TIMEOUT", "SOCKET_CONNECT_TIMEOUT")
+            if name in options
+        }
+        self._breaker, self._dirty = _shared_state(
+            self._url,
+            int(options.get("FAILURE_THRESHOLD", 5)),
+            float(options.get("RECOVERY_SECONDS", 30)),
+        )
+        fallback_params = {
+            **params,
+            "OPTIONS": {"MAX_ENTRIES": options.get("FALLBACK_MAX_ENTRIES", 1000)},
+        }
+        self._fallback = LocMemCache(f"redis-fallback:{self._url}", fallback_params)
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    # --- plumbing -------------------------------------------------------
+
+    def _run(self, op: Any, fallback: Any) -> Any:
+        if not self._breaker.allow():
+            return fallback()
+        try:
+            result = op(self._factory(self._url, **self._client_options))
+        except TRANSIENT_ERRORS as exc:
+            logger.debug("Redis cache call failed: %s", exc)
+            self._breaker.failure()
+            return fallback()
+        if self._breaker.success() or self._dirty:
+            self._forget_dirty()
+        return result
+
+    def _mark_dirty(self, *keys: str) -> None:
+        if len(self._dirty) < MAX_DIRTY_KEYS:
+            self._dirty.update(keys)
+
+    def _forget_dirty(self) -> None:
+        keys = list(self._dirty)
+        self._dirty.clear()
+        if not keys:
+            return
+        try:
+            self._factory(self._url, **self._client_options).delete(*keys)
+        except TRANSIENT_ERRORS:
+            self._mark_dirty(*keys)
+
+    def get_backend_timeout(self, timeout=DEFAULT_TIMEOUT):
+        # Relative seconds, as Redis expects (BaseCache returns an absolute time)
+        if timeout == DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        return None if timeout is None else max(0, timeout)
+
+    def _px(self, timeout: Any) -> int | None:
+        seconds = self.get_backend_timeout(timeout)
+        return None if seconds is None else int(seconds * 1000)
+
+    def _degraded_write(self, keys: list[str], write: Any) -> Any:
+        self._mark_dirty(*keys)
+        return write()
+
+    # --- cache API ------------------------------------------------------
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        k = self.make_and_validate_key(key, version=version)
+        px = self._px(timeout)
+
+        def op(client):
+            if px is not None and px <= 0:
+                return not client.exists(k)
+            return bool(client.set(k, _dumps(value), px=px, nx=True))
+
+        return self._run(
+            op,
+            lambda: self._degraded_write(
+                [k], lambda: self._fallback.add(key, value, timeout, version)
+            ),
+        )
+
+    def get(self, key, default=None, version=None):
+        k = self.make_and_validate_key(key, version=version)
+
+        def op(client):
+            raw = client.get(k)
+            return default if raw is None else _loads(raw)
+
+        return self._run(op, lambda: self._fallback.get(key, default, version))
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        k = self.make_and_validate_key(key, version=version)
+        px = self._px(timeout)
+
+        def op(client):
+            if px is not None and px <= 0:
+                client.delete(k)
+            else:
+                client.set(k, _dumps(value), px=px)
+
+        self._run(
+            op,
+            lambda: self._degraded_write(
+                [k], lambda: self._fallback.set(key, value, timeout, version)
+            ),
+        )
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        k = self.make_and_validate_key(key, version=version)
+        px = self._px(timeout)
+
+        def op(client):
+            if px is None:
+                return bool(client.persist(k)) or bool(client.exists(k))
+            return bool(client.pexpire(k, px))
+
+        return self._run(
+            op,
+            lambda: self._degraded_write(
+                [k], lambda: self._fallback.touch(key, timeout, version)
+            ),
+        )
+
+    def delete(self, key, version=None):
+        k = self.make_and_validate_key(key, version=version)
+        return self._run(
+            lambda client: bool(client.delete(k)),
+            lambda: self._degraded_write(
+                [k], lambda: self._fallback.delete(key, version)
+            ),
+        )
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        made = {self.make_and_validate_key(key, version=version): key for key in keys}
+
+        def op(client):
+            values = client.mget(list(made))
+            return {
+                made[k]: _loads(raw)
+                for k, raw in zip(made, values, strict=True)
+                if raw is not None
+            }
+
+        return self._run(op, lambda: self._fallback.get_many(keys, version))
+
+    def has_key(self, key, version=None):
+        k = self.make_and_validate_key(key, version=version)
+        return self._run(
+            lambda client: bool(client.exists(k)),
+            lambda: self._fallback.has_key(key, version),
+        )
+
+    def incr(self, key, delta=1, version=None):
+        k = self.make_and_validate_key(key, version=version)
+
+        def op(client):
+            if not client.exists(k):
+                raise ValueError(f"Key '{key}' not found.")
+            return client.incrby(k, delta)
+
+        return self._run(
+            op,
+            lambda: self._degraded_write(
+                [k], lambda: self._fallback.incr(key, delta, version)
+            ),
+        )
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        made = [self.make_and_validate_key(key, version=version) for key in keys]
+        if not made:
+            return
+        self._run(
+            lambda client: client.delete(*made),
+            lambda: self._degraded_write(
+                made, lambda: self._fallback.delete_many(keys, version)
+            ),
+        )
+
+    def clear(self):
+        self._fallback.clear()
+        self._dirty.clear()
+        self._run(lambda client: client.flushdb(), lambda: None)
+
+    def close(self, **kwargs):
+        # The connection pool is shared by the process; nothing to release per request
+        pass
+
+
+class _FakeServer:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.data: dict[str, tuple[bytes, float | None]] = {}
+        # Tests flip this to simulate an outage
+        self.down = False
+
+
+@cache
+def _fake_server(url: str) -> _FakeServer:
+    return _FakeServer()
+
+
+class FakeRedis:
+    """
+    In-process Redis stand-in covering the commands ``ResilientRedisCache``
+    uses. Clients for the same URL share one store across threads.
+    """
+
+    def __init__(self, url: str) -> None:
+        self.server = _fake_server(url)
+
+    def _check(self) -> None:
+        if self.server.down:
+            raise ConnectionError("fake redis is down")
+
+    def _live(self, key: str) -> bytes | None:
+        entry = self.server.data.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires is not None and expires <= time.monotonic():
+            del self.server.data[key]
+            return None
+        return value
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        return value if isinstance(value, bytes) else str(value).encode()
+
+    def ping(self) -> bool:
+        self._check()
+        return True
+
+    def get(self, key: str) -> bytes | None:
+        self._check()
+        with self.server.lock:
+            return self._live(key)
+
+    def mget(self, keys: list[str]) -> list[bytes | None]:
+        self._check()
+        with self.server.lock:
+            return [self._live(key) for key in keys]
+
+    def set(
+        self, key: str, value: Any, px: int | None = None, nx: bool = False
+    ) -> bool | None:
+        self._check()
+        with self.server.lock:
+            if nx and self._live(key) is not None:
+                return None
+            expires = time.monotonic() + px / 1000 if px is not None else None
+            self.server.data[key] = (self._encode(value), expires)
+            return True
+
+    def delete(self, *keys: str) -> int:
+        self._check()
+        with self.server.lock:
+            return sum(
+                1
+                for key in keys
+                if self._live(key) is not None
+                and self.server.data.pop(key, None) is not None
+            )
+
+    def exists(self, *keys: str) -> int:
+        self._check()
+        with self.server.lock:
+            return sum(1 for key in keys if self._live(key) is not None)
+
+    def incrby(self, key: str, amount: int) -> int:
+        self._check()
+        with self.server.lock:
+            current = self._live(key)
+            value = int(current or 0) + amount
+            expires = self.server.data[key][1] if current is not None else None
+            self.server.data[key] = (str(value).encode(), expires)
+            return value
+
+    def pexpire(self, key: str, px: int) -> bool:
+        self._check()
+        with self.server.lock:
+            value = self._live(key)
+            if value is None:
+                return False
+            self.server.data[key] = (value, time.monotonic() + px / 1000)
+            return True
+
+    def persist(self, key: str) -> bool:
+        self._check()
+        with self.server.lock:
+            value = self._live(key)
+            if value is None or self.server.data[key][1] is None:
+                return False
+            self.server.data[key] = (value, None)
+            return True
+
+    def flushdb(self) -> bool:
+        self._check()
+        with self.server.lock:
+            self.server.data.clear()
+            return True
+
+
+def fake_redis_client(url: str, **kwargs: Any) -> FakeRedis:
+    """Client factory for tests: ``OPTIONS["CLIENT_FACTORY"] = "core.cache.fake_redis_client"``."""
+    return FakeRedis(url)
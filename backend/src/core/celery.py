@@ -0,0 +1,24 @@
+"""
+Celery application for OmniCourse.
+
+Workers: ``celery -A core worker -Q <queue> -c <concurrency>``, one worker pool
+per AIJob lane (``python manage.py aijob_lanes`` prints the commands). Celery
+is optional here: without it ``app`` is ``None`` and ``jobs.engine`` runs
+jobs inline when ``CELERY_TASK_ALWAYS_EAGER`` is set (tests) or leaves them
+pending otherwise.
+"""
+
+import os
+
+try:  # Optional dependency
+    from celery import Celery
+except Exception:  # pragma: no cover
+    Celery = None
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings.prod")
+
+app = None
+if Celery is not None:
+    app = Celery("omnicourse")
+    app.config_from_object("django.conf:settings", namespace="CELERY")
+    app.autodiscover_tasks()
@@ -51,6 +51,15 @@ def problem_exception_handler(exc: Exception, context: dict[str, Any]) -> JsonRe
     )
 
 
+def problem_response(status_code: int, detail: str | None = None) -> JsonResponse:
+    """Problem+JSON response for plain Django views outside DRF's handler."""
+    return _problem(
+        status_code=status_code,
+        title=_default_title_for_status(status_code),
+        detail=detail,
+    )
+
+
 def _problem(
     *,
     status_code: int,
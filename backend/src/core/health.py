@@ -3,16 +3,45 @@ Health check utilities for OmniCourse.
 
 Provides lightweight checks for database, broker, and storage backends
 that degrade gracefully when optional dependencies are unavailable.
+
+Probes hit these every few seconds on every pod, so ``health_payload()`` does
+not run the checks itself. A per-process ``HealthMonitor`` runs them
+concurrently on a small thread pool with a shared deadline
+(``HEALTH_CHECK_TIMEOUT_SECONDS``), and keeps the result for
+``HEALTH_CHECK_TTL_SECONDS``. After that a probe gets the last result at once
+while a background refresh runs. The Redis and S3 clients are built once and
+reused. Liveness (``livez``) touches none of this.
 """
 
 from __future__ import annotations
 
 import socket
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, wait
 from dataclasses import dataclass
+from datetime import timedelta
+from functools import lru_cache
 from typing import Any
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.core.signals import setting_changed
 from django.db import connections
+from django.utils import timezone
+
+try:  # Optional dependency
+    import redis
+except Exception:  # pragma: no cover
+    redis = None
+
+try:  # Optional dependency
+    import boto3
+    from botocore.config import Config as BotoConfig
+    from botocore.exceptions import BotoCoreError, ClientError
+except Exception:  # pragma: no cover
+    boto3 = None
 
 
 @dataclass
@@ -30,10 +59,17 @@ class CheckResult:
         return data
 
 
+def _timeout() -> float:
+    return float(getattr(settings, "HEALTH_CHECK_TIMEOUT_SECONDS", 1.0))
+
+
 def check_database() -> CheckResult:
+    connection = connections["default"]
+    # Checks run on pool threads, which keep their own connection between runs
+    connection.close_if_unusable_or_obsolete()
     try:
-        with connections["default"].cursor() as cursor:
-            cursor.execute("SELECT version()")
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_version()" if connection.vendor == "sqlite" else "SELECT version()")
             row = cursor.fetchone()
             version = row[0] if row else "unknown"
         return CheckResult(ok=True, extra={"engine": connections["default"].settings_dict.get("ENGINE", "unknown"), "version": version})
@@ -59,6 +95,13 @@ def _parse_redis_url(url: str) -> tuple[str, int, int]:
         return default_host, default_port, default_db
 
 
+@lru_cache(maxsize=4)
+def _redis_client(url: str) -> Any:
+    # redis.Redis owns a connection pool; building one per probe reconnected every time
+    timeout = min(_timeout(), 0.5)
+    return redis.Redis.from_url(url, socket_connect_timeout=timeout, socket_timeout=timeout)
+
+
 def check_broker() -> CheckResult:
     broker_url = getattr(settings, "CELERY_BROKER_URL", "")
     if not broker_url:
@@ -67,26 +110,31 @@ def check_broker() -> CheckResult:
     # Prefer using redis library if available, otherwise do a simple TCP check
     if broker_url.startswith("redis://"):
         host, port, db = _parse_redis_url(broker_url)
+        extra = {"type": "redis", "host": host, "port": port, "db": db}
         try:
-            try:
-                import redis  # type: ignore
-
-                client = redis.Redis(host=host, port=port, db=db, socket_connect_timeout=0.5, socket_timeout=0.5)
-                pong = client.ping()
-                return CheckResult(ok=bool(pong), extra={"type": "redis", "host": host, "port": port, "db": db})
-            except Exception:
-                # Fallback to raw socket if redis not usable
-                with socket.create_connection((host, port), timeout=0.5) as s:
-                    s.sendall(b"PING\r\n")
-                    _ = s.recv(16)
-                return CheckResult(ok=True, extra={"type": "redis", "host": host, "port": port, "db": db})
+            if redis is not None:
+                return CheckResult(ok=bool(_redis_client(broker_url).ping()), extra=extra)
+            # Fallback to raw socket if redis not installed
+            with socket.create_connection((host, port), timeout=min(_timeout(), 0.5)) as s:
+                s.sendall(b"PING\r\n")
+                _ = s.recv(16)
+            return CheckResult(ok=True, extra=extra)
         except Exception as exc:  # noqa: BLE001
-            return CheckResult(ok=False, detail=str(exc), extra={"type": "redis", "host": host, "port": port, "db": db})
+            return CheckResult(ok=False, detail=str(exc), extra=extra)
 
     # Unknown broker type; just report configured
     return CheckResult(ok=True, detail="Broker configured", extra={"type": "unknown", "url": broker_url})
 
 
+@lru_cache(maxsize=4)
+def _s3_client(region: str) -> Any:
+    # boto3 clients are thread-safe and pool connections; creating one costs
+    # tens of milliseconds of credential and endpoint resolution
+    timeout = _timeout()
+    config = BotoConfig(connect_timeout=timeout, read_timeout=timeout, retries={"max_attempts": 1})
+    return boto3.client("s3", region_name=region or None, config=config)
+
+
 def check_storage() -> CheckResult:
     bucket = getattr(settings, "AWS_STORAGE_BUCKET_NAME", "")
     region = getattr(settings, "AWS_S3_REGION_NAME", "")
@@ -94,32 +142,129 @@ def check_storage() -> CheckResult:
     if not bucket:
         return CheckResult(ok=False, detail="No bucket configured")
 
-    # If boto3 is available, attempt a lightweight head-bucket
+    extra = {"bucket": bucket, "region": region or "auto"}
+    if boto3 is None:
+        # Degrade gracefully if boto3 not present; report configuration only
+        return CheckResult(ok=True, detail="SDK not available; configuration only", extra=extra)
     try:
-        import boto3  # type: ignore
-        from botocore.exceptions import ClientError  # type: ignore
+        _s3_client(region).head_bucket(Bucket=bucket)
+        return CheckResult(ok=True, extra=extra)
+    except (BotoCoreError, ClientError) as exc:
+        return CheckResult(ok=False, detail=str(exc), extra=extra)
+
+
+CHECKS: dict[str, Callable[[], CheckResult]] = {
+    "db": check_database,
+    "broker": check_broker,
+    "storage": check_storage,
+}
+
+
+class HealthMonitor:
+    """
+    Run ``checks`` concurrently and serve the result from memory for ``ttl`` seconds.
+
+    A check still running at the deadline is reported as failed; its thread
+    finishes in the background. Once the result is older than ``ttl`` the next
+    caller starts a single background refresh and gets the previous result
+    meanwhile. Only the very first call waits for the checks.
+    """
+
+    def __init__(
+        self,
+        checks: dict[str, Callable[[], CheckResult]],
+        ttl: float = 5.0,
+        timeout: float = 1.0,
+    ) -> None:
+        self.checks = checks
+        self.ttl = ttl
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=len(checks) + 1, thread_name_prefix="health")
+        self._lock = threading.Lock()
+        self._results: dict[str, CheckResult] | None = None
+        self._checked_at = 0.0
+        self._refreshing = False
 
-        s3 = boto3.client("s3", region_name=region or None)
+    def run_checks(self) -> dict[str, CheckResult]:
+        futures = {name: self._executor.submit(check) for name, check in self.checks.items()}
+        wait(futures.values(), timeout=self.timeout)
+        results = {}
+        for name, future in futures.items():
+            if not future.done():
+                results[name] = CheckResult(ok=False, detail=f"Timed out after {self.timeout:g}s")
+            elif future.exception() is not None:
+                results[name] = CheckResult(ok=False, detail=str(future.exception()))
+            else:
+                results[name] = future.result()
+        return results
+
+    def refresh(self) -> dict[str, CheckResult]:
         try:
-            s3.head_bucket(Bucket=bucket)
-            return CheckResult(ok=True, extra={"bucket": bucket, "region": region or "auto"})
-        except ClientError as exc:  # type: ignore
-            return CheckResult(ok=False, detail=str(exc), extra={"bucket": bucket, "region": region or "auto"})
-    except Exception:
-        # Degrade gracefully if boto3 not present; report configuration only
-        return CheckResult(ok=True, detail="SDK not available; configuration only", extra={"bucket": bucket, "region": region or "auto"})
+            results = self.run_checks()
+            with self._lock:
+                self._results, self._checked_at = results, time.monotonic()
+            return results
+        finally:
+            self._refreshing = False
+
+    def results(self) -> tuple[dict[str, CheckResult], float]:
+        """Return ``(results, age_seconds)``."""
+        with self._lock:
+            results, checked_at = self._results, self._checked_at
+            stale = results is not None and time.monotonic() - checked_at >= self.ttl
+            if stale and not self._refreshing:
+                self._refreshing = True
+                self._executor.submit(self.refresh)
+        if results is None:
+            return self.refresh(), 0.0
+        return results, time.monotonic() - checked_at
+
+
+@lru_cache(maxsize=1)
+def get_monitor() -> HealthMonitor:
+    return HealthMonitor(
+        CHECKS,
+        ttl=float(getattr(settings, "HEALTH_CHECK_TTL_SECONDS", 5.0)),
+        timeout=_timeout(),
+    )
+
+
+def _reset_clients(*, setting: str, **kwargs: Any) -> None:
+    if setting.startswith("HEALTH_CHECK_"):
+        get_monitor.cache_clear()
+    if setting.startswith(("HEALTH_CHECK_", "CELERY_BROKER", "AWS_")):
+        _redis_client.cache_clear()
+        _s3_client.cache_clear()
+
+
+setting_changed.connect(_reset_clients)
 
 
 def health_payload() -> dict[str, Any]:
-    db = check_database().to_dict()
-    broker = check_broker().to_dict()
-    storage = check_storage().to_dict()
+    results, age = get_monitor().results()
+    return _payload(results, age)
+
+
+async def ahealth_payload() -> dict[str, Any]:
+    """
+    Async variant for ASGI views.
+
+    Normally a memory read; off the event loop in case this call has to wait
+    for the first round of checks.
+    """
+    return await sync_to_async(health_payload, thread_sensitive=False)()
+
+
+def _payload(results: dict[str, CheckResult], age: float = 0.0) -> dict[str, Any]:
+    dependencies = {name: result.to_dict() for name, result in results.items()}
 
     return {
-        "ok": bool(db.get("ok") and broker.get("ok") and storage.get("ok")),
+        "ok": all(result.ok for result in results.values()),
         "app": {
             "debug": bool(getattr(settings, "DEBUG", False)),
             "environment": getattr(settings, "ENVIRONMENT", "dev"),
         },
-        "dependencies": {"db": db, "broker": broker, "storage": storage},
+        "dependencies": dependencies,
+        "checked_at": (timezone.now() - timedelta(seconds=age)).isoformat(),
+        "age_seconds": round(age, 3),
     }
@@ -0,0 +1,115 @@
+"""
+Pluggable JSON encoding for OmniCourse.
+
+``dumps``/``loads`` dispatch to the backend named by ``settings.JSON_BACKEND``:
+``"auto"`` (default) uses orjson when it is installed and the standard library
+otherwise; ``"orjson"`` and ``"stdlib"`` force one; anything else is a dotted
+path to a backend class. All backends emit the same shapes as DRF's
+``JSONEncoder`` (UUIDs and datetimes as strings, Decimals as numbers).
+"""
+
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from typing import Any
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.utils.module_loading import import_string
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional accelerator
+    orjson = None  # type: ignore
+
+
+def _escape_js_separators(out: bytes) -> bytes:
+    # Same escaping DRF applies so output stays a strict JavaScript subset
+    if b"\xe2\x80\xa8" in out or b"\xe2\x80\xa9" in out:
+        out = out.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+    return out
+
+
+class StdlibBackend:
+    """Standard library ``json`` with DRF's encoder; always available."""
+
+    name = "stdlib"
+
+    def dumps(self, obj: Any) -> bytes:
+        out = json.dumps(
+            obj,
+            cls=JSONEncoder,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        )
+        return _escape_js_separators(out.encode("utf-8"))
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data, parse_constant=_reject_constant)
+
+
+def _reject_constant(value: str) -> Any:
+    raise ValueError(f"Out of range float values are not JSON compliant: {value!r}")
+
+
+# orjson handles str/int/float/dict/list, UUID and date/time types natively;
+# everything else (Decimal, lazy strings, timedelta, ...) goes through DRF's
+# encoder so the emitted shapes stay identical.
+_orjson_default = JSONEncoder().default
+
+
+class OrjsonBackend(StdlibBackend):
+    """orjson, falling back to the stdlib path for values it rejects."""
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        if orjson is None:
+            raise ImportError("orjson is not installed")
+        self._options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            out = orjson.dumps(obj, default=_orjson_default, option=self._options)
+        except TypeError:
+            # e.g. integers wider than 64 bits; the stdlib encoder copes
+            return super().dumps(obj)
+        return _escape_js_separators(out)
+
+    def loads(self, data: bytes | str) -> Any:
+        return orjson.loads(data)
+
+
+@lru_cache(maxsize=1)
+def get_backend() -> StdlibBackend:
+    choice = getattr(settings, "JSON_BACKEND", "auto")
+    if choice == "stdlib":
+        return StdlibBackend()
+    if choice == "orjson":
+        return OrjsonBackend()
+    if choice == "auto":
+        return OrjsonBackend() if orjson is not None else StdlibBackend()
+    return import_string(choice)()
+
+
+def _reset_backend(*, setting: str, **kwargs: Any) -> None:
+    if setting == "JSON_BACKEND":
+        get_backend.cache_clear()
+
+
+setting_changed.connect(_reset_backend)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode ``obj`` as compact UTF-8 JSON bytes."""
+    return get_backend().dumps(obj)
+
+
+def loads(data: bytes | str) -> Any:
+    """Decode JSON text; raises ``ValueError`` on malformed input."""
+    return get_backend().loads(data)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from core import jsonlib
+from core.middleware import IdempotencyKeyMiddleware
+from jobs.models import IdempotencyKey
+
+
+def _per_request(fn: Callable[[int], Any], total: int) -> float:
+    start = time.perf_counter()
+    for i in range(total):
+        fn(i)
+    return (time.perf_counter() - start) / total
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure IdempotencyKeyMiddleware overhead per keyed POST: first "
+        "execution, replay from cache and replay from the database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--body-bytes", type=int, default=16 * 1024)
+
+    def handle(self, *args, **options):
+        total = options["requests"]
+        body = jsonlib.dumps({"content": "x" * options["body_bytes"]})
+        response_body = jsonlib.dumps(
+            {"id": str(uuid.uuid4()), "echo": "y" * options["body_bytes"]}
+        )
+        middleware = IdempotencyKeyMiddleware(
+            lambda request: HttpResponse(
+                response_body, status=201, content_type="application/json"
+            )
+        )
+        factory = RequestFactory()
+        prefix = f"bench-{uuid.uuid4().hex[:12]}"
+
+        def post(i: int, keyed: bool = True) -> Any:
+            headers = {"HTTP_IDEMPOTENCY_KEY": f"{prefix}-{i}"} if keyed else {}
+            request = factory.post(
+                "/api/v1/bench/", data=body, content_type="application/json", **headers
+            )
+            return middleware(request)
+
+        try:
+            rows = [
+                ("no key", _per_request(lambda i: post(i, keyed=False), total)),
+                ("first execution", _per_request(post, total)),
+                # One hot key, so cache culling cannot turn hits into DB reads
+                ("replay (cache)", _per_request(lambda i: post(0), total)),
+            ]
+            cache.delete_many([middleware._result_key(h) for h in self._hashes(prefix)])
+            rows.append(("replay (database)", _per_request(post, total)))
+        finally:
+            IdempotencyKey.objects.filter(key__startswith=prefix).delete()
+
+        self.stdout.write(f"{total} requests, {len(body) / 1024:.1f} KiB body")
+        self.stdout.write(f"{'path':<20}{'us/request':>12}")
+        for label, seconds in rows:
+            self.stdout.write(f"{label:<20}{seconds * 1e6:>12.1f}")
+
+    @staticmethod
+    def _hashes(prefix: str) -> list[str]:
+        return list(
+            IdempotencyKey.objects.filter(key__startswith=prefix).values_list(
+                "request_hash", flat=True
+            )
+        )
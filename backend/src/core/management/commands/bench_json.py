@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import io
+import time
+import uuid
+from collections.abc import Callable
+from datetime import UTC, datetime
+from decimal import Decimal
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.jsonlib import orjson
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+
+def sample_output_data(modules: int, lessons: int) -> dict[str, Any]:
+    """Build an ``AIJob.output_data``-shaped outline payload."""
+    now = datetime(2024, 1, 1, tzinfo=UTC)
+    return {
+        "course_id": uuid.UUID(int=1),
+        "generated_at": now,
+        "cost": Decimal("12.34"),
+        "modules": [
+            {
+                "id": uuid.UUID(int=m + 2),
+                "title": f"Module {m}",
+                "lessons": [
+                    {
+                        "id": uuid.UUID(int=(m + 2) * 10_000 + lesson),
+                        "title": f"Lesson {m}.{lesson}",
+                        "content": "Lorem ipsum dolor sit amet, ünïcödé. " * 40,
+                        "objectives": [f"Objective {i}" for i in range(4)],
+                        "estimated_minutes": 15,
+                    }
+                    for lesson in range(lessons)
+                ],
+            }
+            for m in range(modules)
+        ],
+        "token_usage": {"input": 123_456, "output": 654_321},
+    }
+
+
+def _best_of(fn: Callable[[], Any], iterations: int) -> float:
+    best = float("inf")
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class Command(BaseCommand):
+    help = "Benchmark JSON render/parse time for large AIJob.output_data payloads"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modules", type=int, default=20)
+        parser.add_argument("--lessons", type=int, default=25)
+        parser.add_argument("--iterations", type=int, default=20)
+
+    def handle(self, *args, **options):
+        data = sample_output_data(options["modules"], options["lessons"])
+        iterations = options["iterations"]
+        body = JSONRenderer().render(data)
+        self.stdout.write(f"payload: {len(body) / 1024:.1f} KiB, best of {iterations}")
+
+        self.stdout.write(f"{'implementation':<18}{'encode ms':>12}{'decode ms':>12}")
+        self._row(
+            "drf JSONRenderer", JSONRenderer(), JSONParser(), data, body, iterations
+        )
+        for choice in ("stdlib", "orjson"):
+            if choice == "orjson" and orjson is None:
+                self.stdout.write("orjson not installed; skipping fast backend")
+                continue
+            with override_settings(JSON_BACKEND=choice):
+                self._row(
+                    f"fast ({choice})",
+                    FastJSONRenderer(),
+                    FastJSONParser(),
+                    data,
+                    body,
+                    iterations,
+                )
+
+    def _row(self, label, renderer, parser, data, body, iterations):
+        encode = _best_of(lambda: renderer.render(data), iterations)
+        decode = _best_of(lambda: parser.parse(io.BytesIO(body)), iterations)
+        self.stdout.write(f"{label:<18}{encode * 1000:>12.2f}{decode * 1000:>12.2f}")
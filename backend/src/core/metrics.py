@@ -0,0 +1,346 @@
+"""
+In-process metrics exposed in the Prometheus text format at ``/metrics``.
+
+Counters and histograms live in process memory behind a per-metric lock; the
+hot path is a dict lookup, a bisect and an addition. Gauges that describe
+shared state (e.g. AIJob queue depth) are computed by a collector when the
+endpoint is scraped.
+
+Multi-process servers (gunicorn workers): set ``METRICS_MULTIPROC_DIR`` to a
+directory shared by the workers and emptied on deploy. Each process writes a
+snapshot of its counters to ``<pid>.json`` there at most every
+``METRICS_FLUSH_SECONDS`` (and at exit); whichever worker serves ``/metrics``
+sums every snapshot with its own live values.
+"""
+
+from __future__ import annotations
+
+import atexit
+import bisect
+import math
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterable, Sequence
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+
+from . import jsonlib
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1e4, 1e5, 1e6, 1e7, 1e8, 1e9)
+
+Labels = tuple[str, ...]
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def snapshot(self) -> list[Any]:
+        with self._lock:
+            return [[list(labels), value] for labels, value in self._values.items()]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self._values: dict[Labels, list[Any]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def snapshot(self) -> list[Any]:
+        with self._lock:
+            return [
+                [list(labels), list(counts), total]
+                for labels, (counts, total) in self._values.items()
+            ]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge:
+    """A gauge whose samples come from ``collector`` at scrape time."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.collector: Callable[[], Iterable[tuple[Labels, float]]] | None = None
+
+    def set_collector(
+        self, collector: Callable[[], Iterable[tuple[Labels, float]]]
+    ) -> None:
+        self.collector = collector
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: dict[str, Any] = {}
+        self._last_flush = 0.0
+
+    def register(self, metric: Any) -> Any:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self) -> dict[str, list[Any]]:
+        return {
+            name: metric.snapshot()
+            for name, metric in self.metrics.items()
+            if not isinstance(metric, Gauge)
+        }
+
+    def reset(self) -> None:
+        for metric in self.metrics.values():
+            if not isinstance(metric, Gauge):
+                metric.reset()
+
+    # --- multi-process --------------------------------------------------
+
+    @staticmethod
+    def _directory() -> Path | None:
+        directory = getattr(settings, "METRICS_MULTIPROC_DIR", "")
+        return Path(directory) if directory else None
+
+    def flush(self, force: bool = False) -> None:
+        """Write this process's snapshot to the shared directory (rate limited)."""
+        directory = self._directory()
+        now = time.monotonic()
+        if directory is None or (
+            not force and now - self._last_flush < _flush_interval()
+        ):
+            return
+        self._last_flush = now
+        directory.mkdir(parents=True, exist_ok=True)
+        # Write then rename so a scrape never reads a half-written file
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(jsonlib.dumps(self.snapshot()))
+        os.replace(tmp, directory / f"{os.getpid()}.json")
+
+    def _snapshots(self) -> list[dict[str, list[Any]]]:
+        snapshots = [self.snapshot()]
+        directory = self._directory()
+        if directory is None or not directory.is_dir():
+            return snapshots
+        own = f"{os.getpid()}.json"
+        for path in directory.glob("*.json"):
+            if path.name == own:
+                continue
+            try:
+                snapshots.append(jsonlib.loads(path.read_bytes()))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    # --- exposition -----------------------------------------------------
+
+    def render(self) -> str:
+        merged: dict[str, dict[Labels, Any]] = {name: {} for name in self.metrics}
+        for snapshot in self._snapshots():
+            for name, samples in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                target = merged[name]
+                for sample in samples:
+                    labels = tuple(sample[0])
+                    if isinstance(metric, Histogram):
+                        counts, total = target.get(
+                            labels, ([0] * (len(metric.buckets) + 1), 0.0)
+                        )
+                        if len(sample[1]) != len(counts):
+                            # Written by a process running with other buckets
+                            continue
+                        target[labels] = (
+                            [a + b for a, b in zip(counts, sample[1], strict=True)],
+                            total + sample[2],
+                        )
+                    else:
+                        target[labels] = target.get(labels, 0.0) + sample[1]
+
+        lines: list[str] = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            if isinstance(metric, Gauge):
+                for labels, value in metric.collector() if metric.collector else ():
+                    lines.append(
+                        f"{name}{_labels(metric.labelnames, labels)} {_number(value)}"
+                    )
+            elif isinstance(metric, Histogram):
+                for labels, (counts, total) in sorted(merged[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(
+                        (*metric.buckets, math.inf), counts, strict=True
+                    ):
+                        cumulative += count
+                        le = _labels(
+                            (*metric.labelnames, "le"), (*labels, _number(bound))
+                        )
+                        lines.append(f"{name}_bucket{le} {cumulative}")
+                    label_text = _labels(metric.labelnames, labels)
+                    lines.append(f"{name}_sum{label_text} {_number(total)}")
+                    lines.append(f"{name}_count{label_text} {cumulative}")
+            else:
+                for labels, value in sorted(merged[name].items()):
+                    lines.append(
+                        f"{name}{_labels(metric.labelnames, labels)} {_number(value)}"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+def _flush_interval() -> float:
+    return float(getattr(settings, "METRICS_FLUSH_SECONDS", 1.0))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return (
+        "{"
+        + ",".join(
+            f'{n}="{_escape(str(v))}"' for n, v in zip(names, values, strict=True)
+        )
+        + "}"
+    )
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "METRICS_ENABLED", True))
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time to produce a response, by route pattern and status.",
+        ("method", "route", "status"),
+    )
+)
+DB_QUERIES = REGISTRY.register(
+    Counter(
+        "db_queries_total",
+        "Database queries executed while serving requests.",
+        ("route",),
+    )
+)
+CACHE_REQUESTS = REGISTRY.register(
+    Counter(
+        "cache_requests_total",
+        "Cache lookups by cache and result (hit/miss).",
+        ("cache", "result"),
+    )
+)
+EXPORT_DURATION = REGISTRY.register(
+    Histogram(
+        "export_duration_seconds", "Time to build and store an export.", ("kind",)
+    )
+)
+EXPORT_SIZE = REGISTRY.register(
+    Histogram(
+        "export_size_bytes",
+        "Size of produced export archives.",
+        ("kind",),
+        buckets=SIZE_BUCKETS,
+    )
+)
+AIJOB_WAIT = REGISTRY.register(
+    Histogram(
+        "aijob_wait_seconds",
+        "Time from AIJob creation to start, by kind.",
+        ("kind",),
+        buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600),
+    )
+)
+AI_REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "ai_request_duration_seconds",
+        "Model calls from start to last token, by model and outcome (ok/throttled/error).",
+        ("model", "outcome"),
+        buckets=(0.5, 1, 2.5, 5, 10, 20, 40, 80, 160),
+    )
+)
+AI_TOKENS = REGISTRY.register(
+    Counter(
+        "ai_tokens_total",
+        "Model tokens consumed, by model and direction (input/output).",
+        ("model", "direction"),
+    )
+)
+AI_THROTTLES = REGISTRY.register(
+    Counter(
+        "ai_throttled_total",
+        "Model calls refused for capacity, including retried ones.",
+        ("model",),
+    )
+)
+AIJOB_QUEUE_DEPTH = REGISTRY.register(
+    Gauge(
+        "aijob_queue_depth",
+        "AIJobs waiting or running, by kind and status.",
+        ("kind", "status"),
+    )
+)
+
+
+def _flush_at_exit() -> None:
+    try:
+        REGISTRY.flush(force=True)
+    except Exception:  # Settings or the directory may be gone at shutdown
+        pass
+
+
+atexit.register(_flush_at_exit)
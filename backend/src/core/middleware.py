@@ -3,24 +3,78 @@ Custom middleware for OmniCourse project.
 """
 
 import hashlib
-import json
+import time
 from datetime import timedelta
 
+from django.conf import settings
 from django.core.cache import cache
-from django.http import JsonResponse
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.http import HttpResponse
 from django.utils import timezone
 
+from . import metrics
+from .exceptions import problem_response
+
 try:
     from jobs.models import IdempotencyKey  # Local import to avoid early model import
 except Exception:  # pragma: no cover - safe fallback if migrations not ready
     IdempotencyKey = None  # type: ignore
 
+# Reservation outcomes
+RESERVED = "reserved"
+IN_FLIGHT = "in_flight"
+MISMATCH = "mismatch"
+
+# Columns rewritten when a reservation completes
+STORED_FIELDS = ["state", "response_status", "response_content_type", "response_body", "expires_at"]
+
+
+class MetricsMiddleware:
+    """
+    Record request latency by route pattern and status, and the number of
+    database queries each route runs (see ``core.metrics``).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not metrics.enabled():
+            return self.get_response(request)
+
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(count_queries):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        # The URL pattern, not the path, keeps label cardinality bounded
+        match = getattr(request, "resolver_match", None)
+        route = match.route if match is not None else "unmatched"
+        metrics.HTTP_REQUEST_DURATION.observe(elapsed, request.method, route, str(response.status_code))
+        if queries:
+            metrics.DB_QUERIES.inc(route, amount=queries)
+        metrics.REGISTRY.flush()
+        return response
+
 
 class IdempotencyKeyMiddleware:
     """
     Middleware to handle idempotency keys for POST requests.
 
     Stores request hash and response for a period to prevent duplicate processing.
+    Responses are kept as raw bytes plus content type and replayed verbatim.
+    Before the view runs the key is reserved (an atomic cache ``add`` plus a
+    ``processing`` row whose unique key is the cross-process lock), so
+    concurrent duplicates wait briefly for the first result and otherwise get
+    ``409`` instead of running the view a second time. Failed requests release
+    the reservation so the client can retry.
     """
 
     def __init__(self, get_response):
@@ -28,79 +82,209 @@ class IdempotencyKeyMiddleware:
 
     def __call__(self, request):
         # Only apply to POST requests with idempotency key
-        if (
+        if not (
             request.method == "POST"
             and "Idempotency-Key" in request.headers
             and request.path.startswith("/api/")
         ):
+            return self.get_response(request)
+
+        idempotency_key = request.headers["Idempotency-Key"]
+        request_hash = self._get_request_hash(request, idempotency_key)
+
+        replay = self._lookup(idempotency_key, request_hash)
+        metrics.CACHE_REQUESTS.inc("idempotency", "miss" if replay is None else "hit")
+        if replay is not None:
+            return replay
 
-            idempotency_key = request.headers["Idempotency-Key"]
-            request_hash = self._get_request_hash(request, idempotency_key)
+        outcome = self._reserve(idempotency_key, request_hash)
+        if outcome == MISMATCH:
+            return problem_response(
+                422, "Idempotency-Key was already used with a different request."
+            )
+        if outcome == IN_FLIGHT:
+            return self._wait_for_result(idempotency_key, request_hash)
+
+        try:
+            response = self.get_response(request)
+        except Exception:
+            self._release(idempotency_key, request_hash)
+            raise
+        if not (200 <= response.status_code < 300 and self._store(request, response)):
+            self._release(idempotency_key, request_hash)
+        cache.delete(self._lock_key(request_hash))
+        return response
 
-            # Check if we've seen this request before (cache first)
-            cached_response = cache.get(f"idempotent:{request_hash}")
-            if cached_response:
-                resp = JsonResponse(
-                    cached_response["data"], status=cached_response["status"]
+    # --- keys -----------------------------------------------------------
+
+    @staticmethod
+    def _result_key(request_hash):
+        return f"idempotent:{request_hash}"
+
+    @staticmethod
+    def _lock_key(request_hash):
+        return f"idempotent:lock:{request_hash}"
+
+    @staticmethod
+    def _ttl():
+        return getattr(settings, "IDEMPOTENCY_TTL_SECONDS", 3600)
+
+    @staticmethod
+    def _lock_timeout():
+        return getattr(settings, "IDEMPOTENCY_LOCK_TIMEOUT_SECONDS", 60)
+
+    # --- replay ---------------------------------------------------------
+
+    def _replay(self, status, content_type, body):
+        resp = HttpResponse(body, status=status, content_type=content_type)
+        resp["Idempotent-Replayed"] = "true"
+        return resp
+
+    def _lookup(self, idempotency_key, request_hash):
+        # Check if we've seen this request before (cache first)
+        cached_response = cache.get(self._result_key(request_hash))
+        if cached_response:
+            return self._replay(*cached_response)
+
+        # Check persistent storage as fallback
+        if IdempotencyKey is None:
+            return None
+        try:
+            record = (
+                IdempotencyKey.objects.filter(
+                    key=idempotency_key,
+                    request_hash=request_hash,
+                    state=IdempotencyKey.State.COMPLETED,
+                    expires_at__gt=timezone.now(),
                 )
-                return resp
-
-            # Check persistent storage as fallback
-            if IdempotencyKey is not None:
-                try:
-                    record = IdempotencyKey.objects.filter(
-                        key=idempotency_key, request_hash=request_hash, expires_at__gt=timezone.now()
-                    ).order_by("-created_at").first()
-                    if record is not None:
-                        resp = JsonResponse(record.response_data, status=record.response_status)
-                        cache.set(
-                            f"idempotent:{request_hash}",
-                            {"data": record.response_data, "status": record.response_status},
-                            timeout=3600,
-                        )
-                        return resp
-                except Exception:
-                    # Fail open: proceed with the request if DB not ready
-                    pass
+                .values_list("response_status", "response_content_type", "response_body")
+                .first()
+            )
+        except DatabaseError:
+            # Fail open: proceed with the request if DB not ready
+            return None
+        if record is None:
+            return None
+        # BinaryField comes back as memoryview on some backends
+        result = (record[0], record[1], bytes(record[2]))
+        cache.set(self._result_key(request_hash), result, timeout=self._ttl())
+        return self._replay(*result)
 
-        response = self.get_response(request)
+    # --- reservation ----------------------------------------------------
 
-        # Cache and persist successful responses for idempotency
-        if hasattr(request, "idempotency_key") and 200 <= response.status_code < 300:
-            try:
-                response_data = json.loads(response.content)
+    def _reserve(self, idempotency_key, request_hash):
+        lock_timeout = self._lock_timeout()
+        if not cache.add(self._lock_key(request_hash), 1, timeout=lock_timeout):
+            return IN_FLIGHT
+        if IdempotencyKey is None:
+            return RESERVED
 
-                # Cache
-                cache.set(
-                    f"idempotent:{request.idempotency_hash}",
-                    {"data": response_data, "status": response.status_code},
-                    timeout=3600,  # 1 hour
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                # Reclaim expired results and reservations abandoned by a crash
+                IdempotencyKey.objects.filter(key=idempotency_key, expires_at__lte=now).delete()
+                IdempotencyKey.objects.create(
+                    key=idempotency_key,
+                    request_hash=request_hash,
+                    state=IdempotencyKey.State.PROCESSING,
+                    expires_at=now + timedelta(seconds=lock_timeout),
                 )
+        except IntegrityError:
+            # Another process holds (or has completed) this key
+            cache.delete(self._lock_key(request_hash))
+            existing = (
+                IdempotencyKey.objects.filter(key=idempotency_key)
+                .values_list("request_hash", flat=True)
+                .first()
+            )
+            if existing is not None and existing != request_hash:
+                return MISMATCH
+            return IN_FLIGHT
+        except DatabaseError:
+            # Fail open on the DB; the cache lock still guards this process
+            pass
+        return RESERVED
 
-                # Persist to DB for replay across workers/restarts
-                if IdempotencyKey is not None:
-                    try:
-                        IdempotencyKey.objects.update_or_create(
+    def _release(self, idempotency_key, request_hash):
+        cache.delete(self._lock_key(request_hash))
+        if IdempotencyKey is None:
+            return
+        try:
+            IdempotencyKey.objects.filter(
+                key=idempotency_key,
+                request_hash=request_hash,
+                state=IdempotencyKey.State.PROCESSING,
+            ).delete()
+        except DatabaseError:
+            # The reservation expires on its own after the lock timeout
+            pass
+
+    def _wait_for_result(self, idempotency_key, request_hash):
+        deadline = time.monotonic() + getattr(settings, "IDEMPOTENCY_WAIT_SECONDS", 2.0)
+        interval = 0.02
+        while time.monotonic() < deadline:
+            time.sleep(interval)
+            interval = min(interval * 2, 0.25)
+            replay = self._lookup(idempotency_key, request_hash)
+            if replay is not None:
+                return replay
+        resp = problem_response(
+            409, "A request with this Idempotency-Key is still being processed."
+        )
+        resp["Retry-After"] = "1"
+        return resp
+
+    # --- storage --------------------------------------------------------
+
+    def _store(self, request, response):
+        """Record a successful response; returns ``False`` if it cannot be replayed."""
+        if response.streaming:
+            return False
+        result = (response.status_code, response.get("Content-Type", ""), response.content)
+
+        # Cache
+        cache.set(self._result_key(request.idempotency_hash), result, timeout=self._ttl())
+
+        # Persist to DB for replay across workers/restarts. One upsert: it
+        # completes our reservation, or inserts if the reservation failed open.
+        if IdempotencyKey is not None:
+            try:
+                IdempotencyKey.objects.bulk_create(
+                    [
+                        IdempotencyKey(
                             key=request.idempotency_key,
                             request_hash=request.idempotency_hash,
-                            defaults={
-                                "response_data": response_data,
-                                "response_status": response.status_code,
-                                "expires_at": timezone.now() + timedelta(hours=1),
-                            },
+                            state=IdempotencyKey.State.COMPLETED,
+                            response_status=result[0],
+                            response_content_type=result[1],
+                            response_body=result[2],
+                            expires_at=timezone.now() + timedelta(seconds=self._ttl()),
                         )
-                    except Exception:
-                        # Ignore persistence failure; cache still holds it
-                        pass
-            except (json.JSONDecodeError, AttributeError):
+                    ],
+                    update_conflicts=True,
+                    unique_fields=["key"],
+                    update_fields=STORED_FIELDS,
+                )
+            except DatabaseError:
+                # Ignore persistence failure; cache still holds it
                 pass
-
-        return response
+        return True
 
     def _get_request_hash(self, request, idempotency_key):
-        """Create hash of request for idempotency checking."""
-        hash_input = f"{request.path}:{idempotency_key}:{request.body.decode()}"
-        request_hash = hashlib.sha256(hash_input.encode()).hexdigest()
+        """
+        Create hash of request for idempotency checking.
+
+        The raw body bytes are fed to the digest as-is: no decoding (so any
+        payload hashes) and no concatenated copy of large bodies.
+        """
+        digest = hashlib.sha256()
+        digest.update(request.path.encode())
+        digest.update(b"\0")
+        digest.update(idempotency_key.encode())
+        digest.update(b"\0")
+        digest.update(request.body)
+        request_hash = digest.hexdigest()
 
         # Store on request for later use
         request.idempotency_key = idempotency_key
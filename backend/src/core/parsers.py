@@ -0,0 +1,32 @@
+"""
+DRF parsers backed by ``core.jsonlib``.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from . import jsonlib
+
+
+class FastJSONParser(JSONParser):
+    """Drop-in replacement for DRF's ``JSONParser``."""
+
+    def parse(
+        self,
+        stream: Any,
+        media_type: str | None = None,
+        parser_context: dict[str, Any] | None = None,
+    ) -> Any:
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding") or "utf-8"
+        raw = stream.read() if stream is not None else b""
+        try:
+            if encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+                raw = raw.decode(encoding)
+            return jsonlib.loads(raw)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError(f"JSON parse error - {exc}") from exc
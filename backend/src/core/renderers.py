@@ -0,0 +1,33 @@
+"""
+DRF renderers backed by ``core.jsonlib``.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from rest_framework.renderers import JSONRenderer
+
+from . import jsonlib
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for DRF's ``JSONRenderer``.
+
+    Compact output goes through the configured fast backend; indented output
+    (``; indent=N`` or the browsable API) keeps DRF's stdlib implementation.
+    """
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: str | None = None,
+        renderer_context: dict[str, Any] | None = None,
+    ) -> bytes:
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        return jsonlib.dumps(data)
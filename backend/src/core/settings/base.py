@@ -53,6 +53,7 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    "core.middleware.MetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -141,11 +142,172 @@ REST_FRAMEWORK = {
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     # Use a global handler that formats errors as RFC 7807 Problem+JSON
     "EXCEPTION_HANDLER": "core.exceptions.problem_exception_handler",
 }
 
+# JSON encoder backend for API rendering/parsing: auto | orjson | stdlib | dotted path
+JSON_BACKEND = config("JSON_BACKEND", default="auto")
+
+# Serve hot list endpoints from .values_list() rows instead of ModelSerializer
+API_FAST_LIST_ENABLED = config("API_FAST_LIST_ENABLED", default=True, cast=bool)
+
+# Route health probes and the course tree to the async views in api.async_views.
+# core.asgi turns this on by default; WSGI workers keep the sync DRF views.
+API_ASYNC_READS = config("API_ASYNC_READS", default=False, cast=bool)
+
+# Full-text search (PostgreSQL text search configuration and trigram cutoff)
+SEARCH_CONFIG = config("SEARCH_CONFIG", default="english")
+SEARCH_TRIGRAM_THRESHOLD = config("SEARCH_TRIGRAM_THRESHOLD", default=0.3, cast=float)
+
+# Cache of serialized course/module/lesson/tree representations (api.cache).
+# Eviction is governed by the alias's TIMEOUT and MAX_ENTRIES. Invalidation
+# only reaches every process through a shared cache, so the cache stays off
+# on a per-process backend unless DEBUG or REPRESENTATION_CACHE_ALLOW_LOCAL.
+REPRESENTATION_CACHE_ENABLED = config(
+    "REPRESENTATION_CACHE_ENABLED", default=True, cast=bool
+)
+REPRESENTATION_CACHE_ALIAS = config(
+    "REPRESENTATION_CACHE_ALIAS", default="representations"
+)
+REPRESENTATION_CACHE_ALLOW_LOCAL = config(
+    "REPRESENTATION_CACHE_ALLOW_LOCAL", default=False, cast=bool
+)
+
+# Shared cache tier (core.cache). With CACHE_REDIS_URL set (docker-compose:
+# redis://redis:6379/1) the caches live in Redis behind a circuit breaker
+# that degrades to local memory; otherwise they are per-process LocMem.
+CACHE_REDIS_URL = config("CACHE_REDIS_URL", default="")
+CACHE_REDIS_OPTIONS = {
+    "MAX_CONNECTIONS": config("CACHE_REDIS_MAX_CONNECTIONS", default=50, cast=int),
+    "SOCKET_TIMEOUT": config("CACHE_REDIS_SOCKET_TIMEOUT", default=0.25, cast=float),
+    "SOCKET_CONNECT_TIMEOUT": config(
+        "CACHE_REDIS_SOCKET_CONNECT_TIMEOUT", default=0.25, cast=float
+    ),
+    "FAILURE_THRESHOLD": config("CACHE_REDIS_FAILURE_THRESHOLD", default=5, cast=int),
+    "RECOVERY_SECONDS": config("CACHE_REDIS_RECOVERY_SECONDS", default=30, cast=float),
+}
+
+
+def _redis_cache(url, key_prefix, timeout):
+    """A ``CACHES`` entry on the shared Redis tier."""
+    return {
+        "BACKEND": "core.cache.ResilientRedisCache",
+        "LOCATION": url,
+        "KEY_PREFIX": key_prefix,
+        "VERSION": config("CACHE_VERSION", default=1, cast=int),
+        "TIMEOUT": timeout,
+        "OPTIONS": dict(CACHE_REDIS_OPTIONS),
+    }
+
+
+REPRESENTATION_CACHE_REDIS_URL = config(
+    "REPRESENTATION_CACHE_REDIS_URL", default=CACHE_REDIS_URL
+)
+AI_RESULT_CACHE_REDIS_URL = config("AI_RESULT_CACHE_REDIS_URL", default=CACHE_REDIS_URL)
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+    if not CACHE_REDIS_URL
+    else _redis_cache(
+        CACHE_REDIS_URL,
+        config("CACHE_KEY_PREFIX", default="omnicourse"),
+        config("CACHE_TIMEOUT", default=300, cast=int),
+    ),
+    # clear() flushes the Redis database: give each alias its own if you call it
+    "representations": _redis_cache(
+        REPRESENTATION_CACHE_REDIS_URL,
+        config("REPRESENTATION_CACHE_KEY_PREFIX", default="omnicourse:repr"),
+        config("REPRESENTATION_CACHE_TIMEOUT", default=300, cast=int),
+    )
+    if REPRESENTATION_CACHE_REDIS_URL
+    else {
+        "BACKEND": config(
+            "REPRESENTATION_CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": config("REPRESENTATION_CACHE_LOCATION", default="representations"),
+        "TIMEOUT": config("REPRESENTATION_CACHE_TIMEOUT", default=300, cast=int),
+        "OPTIONS": {
+            "MAX_ENTRIES": config(
+                "REPRESENTATION_CACHE_MAX_ENTRIES", default=5000, cast=int
+            ),
+        },
+    },
+    # Exact-match AI job results (ai.result_cache), shared by every worker so a
+    # retry on another worker still hits. Use an allkeys-lru Redis: MAX_ENTRIES
+    # only bounds the LocMem fallback.
+    "ai_results": _redis_cache(
+        AI_RESULT_CACHE_REDIS_URL,
+        config("AI_RESULT_CACHE_KEY_PREFIX", default="omnicourse:ai"),
+        config("AI_RESULT_CACHE_TIMEOUT", default=7 * 24 * 3600, cast=int),
+    )
+    if AI_RESULT_CACHE_REDIS_URL
+    else {
+        "BACKEND": config(
+            "AI_RESULT_CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": config("AI_RESULT_CACHE_LOCATION", default="ai-results"),
+        "TIMEOUT": config("AI_RESULT_CACHE_TIMEOUT", default=7 * 24 * 3600, cast=int),
+        "OPTIONS": {
+            "MAX_ENTRIES": config(
+                "AI_RESULT_CACHE_MAX_ENTRIES", default=10000, cast=int
+            ),
+        },
+    },
+}
+AI_RESULT_CACHE_ENABLED = config("AI_RESULT_CACHE_ENABLED", default=True, cast=bool)
+AI_RESULT_CACHE_ALIAS = config("AI_RESULT_CACHE_ALIAS", default="ai_results")
+
+# Health probes (core.health): results are reused for TTL seconds and refreshed
+# in the background; each round of checks is cut off after TIMEOUT seconds.
+HEALTH_CHECK_TTL_SECONDS = config("HEALTH_CHECK_TTL_SECONDS", default=5.0, cast=float)
+HEALTH_CHECK_TIMEOUT_SECONDS = config(
+    "HEALTH_CHECK_TIMEOUT_SECONDS", default=1.0, cast=float
+)
+
+# Metrics (core.metrics) served at /metrics. Under gunicorn, point
+# METRICS_MULTIPROC_DIR at a directory shared by the workers and emptied on
+# deploy. With METRICS_TOKEN set, scrapes must send it as a bearer token.
+METRICS_ENABLED = config("METRICS_ENABLED", default=True, cast=bool)
+METRICS_MULTIPROC_DIR = config("METRICS_MULTIPROC_DIR", default="")
+METRICS_FLUSH_SECONDS = config("METRICS_FLUSH_SECONDS", default=1.0, cast=float)
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
+# AIJob progress events for the SSE endpoints: redis | local | dotted path.
+# Workers publish from other processes, so only redis reaches SSE clients
+# outside tests. JOB_EVENTS_REDIS_URL defaults to CELERY_BROKER_URL.
+JOB_EVENTS_BACKEND = config("JOB_EVENTS_BACKEND", default="redis")
+JOB_EVENTS_REDIS_URL = config("JOB_EVENTS_REDIS_URL", default="")
+JOB_EVENTS_HEARTBEAT_SECONDS = config(
+    "JOB_EVENTS_HEARTBEAT_SECONDS", default=15, cast=float
+)
+JOB_EVENTS_MAX_STREAM_SECONDS = config(
+    "JOB_EVENTS_MAX_STREAM_SECONDS", default=300, cast=float
+)
+
+# Idempotency-Key handling (core.middleware): how long results are replayed,
+# when an in-flight reservation is considered abandoned, and how long a
+# concurrent duplicate waits for the first result before getting 409.
+IDEMPOTENCY_TTL_SECONDS = config("IDEMPOTENCY_TTL_SECONDS", default=3600, cast=int)
+IDEMPOTENCY_LOCK_TIMEOUT_SECONDS = config(
+    "IDEMPOTENCY_LOCK_TIMEOUT_SECONDS", default=60, cast=int
+)
+IDEMPOTENCY_WAIT_SECONDS = config("IDEMPOTENCY_WAIT_SECONDS", default=2.0, cast=float)
+
 # JWT Settings
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
@@ -171,6 +333,58 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
+# Long AI calls: ack after the task finishes and do not prefetch extra tasks,
+# so a worker busy with a lecture does not hold outline jobs hostage.
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+# Honour message priority on the Redis transport (0 = lowest, 9 = highest)
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "queue_order_strategy": "priority",
+    "priority_steps": list(range(10)),
+}
+
+# AIJob lanes (jobs.engine): each JobKind gets its own queue, worker
+# concurrency and message priority so cheap outline jobs never wait behind
+# long lecture/export jobs.
+AIJOB_LANES = {
+    "outline": {"queue": "aijobs.outline", "concurrency": 8, "priority": 9},
+    "quiz": {"queue": "aijobs.quiz", "concurrency": 4, "priority": 7},
+    "lesson": {"queue": "aijobs.lesson", "concurrency": 4, "priority": 5},
+    "lecture": {"queue": "aijobs.lecture", "concurrency": 2, "priority": 3},
+    "export": {"queue": "aijobs.export", "concurrency": 2, "priority": 3},
+}
+AIJOB_MAX_RETRIES = config("AIJOB_MAX_RETRIES", default=3, cast=int)
+AIJOB_RETRY_BACKOFF_SECONDS = config(
+    "AIJOB_RETRY_BACKOFF_SECONDS", default=5.0, cast=float
+)
+AIJOB_RETRY_BACKOFF_MAX_SECONDS = config(
+    "AIJOB_RETRY_BACKOFF_MAX_SECONDS", default=300.0, cast=float
+)
+# Running jobs renew their lease every third of this; the reaper recovers
+# jobs whose lease lapsed (worker died).
+AIJOB_LEASE_SECONDS = config("AIJOB_LEASE_SECONDS", default=60.0, cast=float)
+# Coalesced progress (jobs.progress): write the row at most every FLUSH_MS,
+# or sooner when the percentage moves by FLUSH_STEP points
+AIJOB_PROGRESS_FLUSH_MS = config("AIJOB_PROGRESS_FLUSH_MS", default=1000, cast=int)
+AIJOB_PROGRESS_FLUSH_STEP = config("AIJOB_PROGRESS_FLUSH_STEP", default=10, cast=int)
+# Largest jobs/batch/ submission
+AIJOB_BATCH_MAX_SIZE = config("AIJOB_BATCH_MAX_SIZE", default=500, cast=int)
+# Fair-share dispatch across owners (jobs.scheduler). A lane's in-flight
+# limit is its "capacity" key, defaulting to its concurrency. Weights map
+# owner id -> share (default 1); MAX_INFLIGHT caps one owner per lane (0 = off).
+AIJOB_FAIR_SCHEDULING = config("AIJOB_FAIR_SCHEDULING", default=True, cast=bool)
+AIJOB_OWNER_WEIGHTS = {}
+AIJOB_OWNER_MAX_INFLIGHT = config("AIJOB_OWNER_MAX_INFLIGHT", default=0, cast=int)
+# Safety nets: release waiting jobs if an on-commit pump was lost, recover
+# jobs whose worker died, and purge expired idempotency keys
+CELERY_BEAT_SCHEDULE = {
+    "dispatch-aijobs": {"task": "jobs.dispatch_aijobs", "schedule": 10.0},
+    "reap-aijob-leases": {"task": "jobs.reap_aijob_leases", "schedule": 30.0},
+    "purge-idempotency-keys": {
+        "task": "jobs.purge_idempotency_keys",
+        "schedule": 300.0,
+    },
+}
 
 # AWS Configuration
 AWS_ACCESS_KEY_ID = config("AWS_ACCESS_KEY_ID", default="")
@@ -189,6 +403,29 @@ BEDROCK_MODEL_ID = config(
     "BEDROCK_MODEL_ID", default="anthropic.claude-3-sonnet-20240229-v1:0"
 )
 
+# Model client (ai.client): one per process. Size the limits to the account's
+# Bedrock quotas divided by the number of worker processes (0 = no bucket).
+AI_BACKEND = config("AI_BACKEND", default="ai.bedrock.BedrockBackend")
+AI_MAX_CONCURRENCY = config("AI_MAX_CONCURRENCY", default=8, cast=int)
+AI_REQUESTS_PER_MINUTE = config("AI_REQUESTS_PER_MINUTE", default=0, cast=float)
+AI_TOKENS_PER_MINUTE = config("AI_TOKENS_PER_MINUTE", default=0, cast=float)
+AI_MAX_RETRIES = config("AI_MAX_RETRIES", default=4, cast=int)
+AI_RETRY_BASE_SECONDS = config("AI_RETRY_BASE_SECONDS", default=0.5, cast=float)
+AI_RETRY_MAX_SECONDS = config("AI_RETRY_MAX_SECONDS", default=20.0, cast=float)
+AI_ACQUIRE_TIMEOUT_SECONDS = config(
+    "AI_ACQUIRE_TIMEOUT_SECONDS", default=60.0, cast=float
+)
+AI_READ_TIMEOUT_SECONDS = config("AI_READ_TIMEOUT_SECONDS", default=120.0, cast=float)
+# Job cost accounting (cost_cents), per 1,000 tokens of BEDROCK_MODEL_ID
+AI_INPUT_CENTS_PER_1K_TOKENS = config(
+    "AI_INPUT_CENTS_PER_1K_TOKENS", default=0.3, cast=float
+)
+AI_OUTPUT_CENTS_PER_1K_TOKENS = config(
+    "AI_OUTPUT_CENTS_PER_1K_TOKENS", default=1.5, cast=float
+)
+# Rows per INSERT when the pipeline (ai.pipeline) writes a generated outline
+AI_BULK_CREATE_BATCH_SIZE = config("AI_BULK_CREATE_BATCH_SIZE", default=500, cast=int)
+
 # Logging
 LOGGING = {
     "version": 1,
@@ -33,6 +33,24 @@ MIGRATION_MODULES = DisableMigrations()
 # Disable CORS for tests
 CORS_ALLOW_ALL_ORIGINS = True
 
+# Run the shared caches through the Redis backend against the in-process fake
+CACHES = {
+    **CACHES,
+    "default": {
+        "BACKEND": "core.cache.ResilientRedisCache",
+        "LOCATION": "redis://fake/0",
+        "KEY_PREFIX": "test",
+        "OPTIONS": {"CLIENT_FACTORY": "core.cache.fake_redis_client"},
+    },
+    "representations": {
+        "BACKEND": "core.cache.ResilientRedisCache",
+        "LOCATION": "redis://fake/2",
+        "KEY_PREFIX": "test:repr",
+        "TIMEOUT": 300,
+        "OPTIONS": {"CLIENT_FACTORY": "core.cache.fake_redis_client"},
+    },
+}
+
 # Use in-memory email backend
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 
@@ -70,6 +88,13 @@ AWS_STORAGE_BUCKET_NAME = "test-bucket"
 # Bedrock settings for tests (mock)
 BEDROCK_REGION = "us-east-1"
 BEDROCK_MODEL_ID = "test-model"
+AI_BACKEND = "ai.fake.FakeBackend"
+AI_RETRY_BASE_SECONDS = 0.0
+# Tests reuse the same job inputs; results must not leak between them
+AI_RESULT_CACHE_ENABLED = False
+
+# Publisher and SSE subscribers share the test process
+JOB_EVENTS_BACKEND = "local"
 
 # Permissions flags for tests
 ALLOW_ANON_WRITE_FOR_TESTS = True
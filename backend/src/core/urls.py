@@ -16,15 +16,17 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
 )
 
-from .views import HealthCheckView
+from .views import HealthCheckView, LivenessView, MetricsView
 
 urlpatterns = [
     # Admin
     path("admin/", admin.site.urls),
     # Health checks
     path("healthz/", HealthCheckView.as_view(), name="health-check"),
-    path("livez/", HealthCheckView.as_view(), name="liveness-check"),
+    path("livez/", LivenessView.as_view(), name="liveness-check"),
     path("readinessz/", HealthCheckView.as_view(), name="readiness-check"),
+    # Prometheus scrape target
+    path("metrics", MetricsView.as_view(), name="metrics"),
     # Authentication
     path("api/auth/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
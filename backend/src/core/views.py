@@ -1,9 +1,38 @@
-from django.http import JsonResponse
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
 from django.views import View
 
+from . import metrics
+from .exceptions import problem_response
 from .health import health_payload
 
 
 class HealthCheckView(View):
     def get(self, request, *args, **kwargs):  # noqa: ARG002
         return JsonResponse(health_payload())
+
+
+class LivenessView(View):
+    """Process is up and serving; deliberately touches no dependency."""
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({"ok": True, "status": "alive"})
+
+
+class MetricsView(View):
+    """Prometheus text exposition of ``core.metrics``."""
+
+    def get(self, request, *args, **kwargs):
+        if not metrics.enabled():
+            return problem_response(404, "Metrics are disabled.")
+        token = getattr(settings, "METRICS_TOKEN", "")
+        if token and not hmac.compare_digest(
+            request.headers.get("Authorization", ""), f"Bearer {token}"
+        ):
+            return problem_response(401, "Metrics token required.")
+        return HttpResponse(
+            metrics.REGISTRY.render(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
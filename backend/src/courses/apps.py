@@ -9,3 +9,10 @@ class CoursesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "courses"
     verbose_name = "Courses"
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+
+        from .search import install_search_ddl
+
+        post_migrate.connect(install_search_ddl, sender=self)
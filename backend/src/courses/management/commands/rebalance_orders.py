@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from courses.ordering import MIN_GAP, registry
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-space module/lesson/question orders whose gaps have run low. "
+        "Run periodically; use --all once to convert dense legacy orders."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-space every parent, not just crowded ones",
+        )
+        parser.add_argument("--min-gap", type=int, default=MIN_GAP)
+
+    def handle(self, *args, **options):
+        for label, siblings in registry().items():
+            if options["all"]:
+                parents = siblings.parent_ids()
+            else:
+                parents = siblings.find_crowded_parents(options["min_gap"])
+            rows = sum(siblings.rebalance(parent_id) for parent_id in parents)
+            self.stdout.write(
+                f"{label}: rebalanced {len(parents)} parents ({rows} rows)"
+            )
+        self.stdout.write(self.style.SUCCESS("Done"))
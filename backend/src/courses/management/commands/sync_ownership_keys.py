@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from courses.ownership import resync_all
+
+
+class Command(BaseCommand):
+    help = "Recompute denormalized course_id/owner_id keys across the content tree"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            counts = resync_all()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Synced ownership keys: courses={counts['courses']} modules={counts['modules']}"
+            )
+        )
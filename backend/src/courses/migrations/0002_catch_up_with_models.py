@@ -0,0 +1,229 @@
+import uuid
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+# 0001 predates the UUID models; this brings the history up to them
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("courses", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="question",
+            name="quiz",
+        ),
+        migrations.AlterModelOptions(
+            name="course",
+            options={"ordering": ["-created_at"]},
+        ),
+        migrations.AlterModelOptions(
+            name="lesson",
+            options={"ordering": ["order", "created_at"]},
+        ),
+        migrations.AlterModelOptions(
+            name="module",
+            options={"ordering": ["order", "created_at"]},
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="description",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="estimated_hours",
+            field=models.PositiveIntegerField(
+                default=0,
+                validators=[
+                    django.core.validators.MinValueValidator(0),
+                    django.core.validators.MaxValueValidator(1000),
+                ],
+            ),
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="owner",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="courses",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="lesson",
+            name="content",
+            field=models.TextField(
+                default="", help_text="Lesson content in Markdown format"
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="lesson",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="lesson",
+            name="estimated_minutes",
+            field=models.PositiveIntegerField(
+                default=10,
+                validators=[
+                    django.core.validators.MinValueValidator(1),
+                    django.core.validators.MaxValueValidator(180),
+                ],
+            ),
+        ),
+        migrations.AddField(
+            model_name="lesson",
+            name="learning_objectives",
+            field=models.JSONField(
+                default=list, help_text="List of learning objectives"
+            ),
+        ),
+        migrations.AddField(
+            model_name="lesson",
+            name="order",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="lesson",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="module",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="module",
+            name="description",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="module",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name="course",
+            name="audience",
+            field=models.CharField(
+                help_text="Target audience description", max_length=255
+            ),
+        ),
+        migrations.AlterField(
+            model_name="course",
+            name="goals",
+            field=models.JSONField(default=list, help_text="Learning goals/outcomes"),
+        ),
+        migrations.AlterField(
+            model_name="course",
+            name="id",
+            field=models.UUIDField(
+                default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+            ),
+        ),
+        migrations.AlterField(
+            model_name="course",
+            name="platform_targets",
+            field=models.JSONField(default=list, help_text="Target export platforms"),
+        ),
+        migrations.AlterField(
+            model_name="course",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("draft", "Draft"),
+                    ("active", "Active"),
+                    ("archived", "Archived"),
+                ],
+                default="draft",
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="lesson",
+            name="assets",
+            field=models.JSONField(
+                default=list,
+                help_text="List of asset references (images, videos, files)",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="lesson",
+            name="id",
+            field=models.UUIDField(
+                default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+            ),
+        ),
+        migrations.AlterField(
+            model_name="module",
+            name="id",
+            field=models.UUIDField(
+                default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="lesson",
+            unique_together={("module", "order")},
+        ),
+        migrations.AlterUniqueTogether(
+            name="module",
+            unique_together={("course", "order")},
+        ),
+        migrations.AddIndex(
+            model_name="course",
+            index=models.Index(
+                fields=["owner", "status"], name="courses_cou_owner_i_d9dd44_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="course",
+            index=models.Index(
+                fields=["created_at"], name="courses_cou_created_51cadc_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lesson",
+            index=models.Index(
+                fields=["module", "order"], name="courses_les_module__4accd4_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="module",
+            index=models.Index(
+                fields=["course", "order"], name="courses_mod_course__20183c_idx"
+            ),
+        ),
+        migrations.DeleteModel(
+            name="Question",
+        ),
+        migrations.DeleteModel(
+            name="Quiz",
+        ),
+        migrations.RemoveField(
+            model_name="lesson",
+            name="est_minutes",
+        ),
+        migrations.RemoveField(
+            model_name="lesson",
+            name="markdown",
+        ),
+    ]
@@ -0,0 +1,92 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_keys(apps, schema_editor):
+    """Copy ``course_id``/``owner_id`` down from each row's ancestors."""
+    Course = apps.get_model("courses", "Course")
+    Module = apps.get_model("courses", "Module")
+    Lesson = apps.get_model("courses", "Lesson")
+    Module.objects.update(
+        owner_id=Subquery(
+            Course.objects.filter(pk=OuterRef("course_id")).values("owner_id")[:1]
+        )
+    )
+    modules = Module.objects.filter(pk=OuterRef("module_id"))
+    Lesson.objects.update(
+        course_id=Subquery(modules.values("course_id")[:1]),
+        owner_id=Subquery(modules.values("owner_id")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("courses", "0002_catch_up_with_models"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Nullable first so existing rows can be backfilled before the constraint
+        migrations.AddField(
+            model_name="lesson",
+            name="course",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="courses.course",
+            ),
+        ),
+        migrations.AddField(
+            model_name="lesson",
+            name="owner",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="module",
+            name="owner",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RunPython(backfill_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="lesson",
+            name="course",
+            field=models.ForeignKey(
+                editable=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="courses.course",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lesson",
+            index=models.Index(
+                fields=["owner", "course"], name="courses_les_owner_i_e94200_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="module",
+            index=models.Index(
+                fields=["owner", "course"], name="courses_mod_owner_i_36e188_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,74 @@
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class PostgresRunSQL(migrations.RunSQL):
+    """``RunSQL`` that is skipped on other backends, like ``CreateExtension``."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("courses", "0003_denormalize_ownership_keys"),
+    ]
+
+    # Mirrors courses.search.ddl_statements() for the lesson target with the
+    # default SEARCH_CONFIG ("english")
+    operations = [
+        migrations.AddField(
+            model_name="lesson",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        PostgresRunSQL(
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            # Other tables' trigram indexes may depend on it
+            migrations.RunSQL.noop,
+        ),
+        PostgresRunSQL(
+            """
+            CREATE OR REPLACE FUNCTION courses_lesson_search_vector_update()
+            RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector :=
+                    setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A')
+                    || setweight(to_tsvector('english', coalesce(NEW.content, '')), 'B');
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+            """,
+            "DROP FUNCTION IF EXISTS courses_lesson_search_vector_update()",
+        ),
+        PostgresRunSQL(
+            """
+            CREATE TRIGGER courses_lesson_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF title, content ON courses_lesson
+            FOR EACH ROW EXECUTE FUNCTION courses_lesson_search_vector_update()
+            """,
+            "DROP TRIGGER IF EXISTS courses_lesson_search_vector_trigger ON courses_lesson",
+        ),
+        PostgresRunSQL(
+            "CREATE INDEX courses_lesson_search_gin "
+            "ON courses_lesson USING gin (search_vector)",
+            "DROP INDEX IF EXISTS courses_lesson_search_gin",
+        ),
+        PostgresRunSQL(
+            "CREATE INDEX courses_lesson_title_trgm "
+            "ON courses_lesson USING gin (title gin_trgm_ops)",
+            "DROP INDEX IF EXISTS courses_lesson_title_trgm",
+        ),
+        # Fire the trigger for rows written before it existed
+        PostgresRunSQL(
+            "UPDATE courses_lesson SET title = title WHERE search_vector IS NULL",
+            migrations.RunSQL.noop,
+        ),
+    ]
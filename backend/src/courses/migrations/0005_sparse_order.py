@@ -0,0 +1,55 @@
+from django.db import migrations, models
+from django.db.models import Case, F, Value, When
+
+# courses.ordering.ORDER_GAP when sparse ordering was introduced
+ORDER_GAP = 1 << 16
+
+
+def respace(apps, schema_editor):
+    """Space existing siblings ``ORDER_GAP`` apart, keeping their order."""
+    for model_name, parent in (("Module", "course_id"), ("Lesson", "module_id")):
+        model = apps.get_model("courses", model_name)
+        manager = model._default_manager
+        rows = manager.order_by(parent, "order", "created_at").values_list(
+            "pk", parent, "order"
+        )
+        siblings: dict = {}
+        for pk, parent_id, _ in rows:
+            siblings.setdefault(parent_id, []).append(pk)
+        if not siblings:
+            continue
+        # Lift every row clear of the new range first so the unique
+        # (parent, order) constraint never sees a transient clash
+        top = max(order for _, _, order in rows)
+        longest = max(len(pks) for pks in siblings.values())
+        manager.update(order=F("order") + max(top, longest * ORDER_GAP) + 1)
+        for parent_id, pks in siblings.items():
+            manager.filter(**{parent: parent_id}).update(
+                order=Case(
+                    *(
+                        When(pk=pk, then=Value((i + 1) * ORDER_GAP))
+                        for i, pk in enumerate(pks)
+                    ),
+                    output_field=models.PositiveBigIntegerField(),
+                )
+            )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("courses", "0004_lesson_search_vector"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="lesson",
+            name="order",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="module",
+            name="order",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(respace, migrations.RunPython.noop),
+    ]
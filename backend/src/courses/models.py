@@ -5,11 +5,14 @@ Course models for OmniCourse project.
 import uuid
 
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 
+from . import ordering, ownership
 
-class Course(models.Model):
+
+class Course(ownership.OwnershipKeysMixin, models.Model):
     """
     Main course entity containing modules, lessons, and assessments.
     """
@@ -61,11 +64,26 @@ class Course(models.Model):
             models.Index(fields=["created_at"]),
         ]
 
+    ownership_fields = ("owner_id",)
+
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if self.ownership_changed(adding):
+                ownership.propagate_from_course(self)
+        self.remember_ownership()
+
+    def transfer_ownership(self, new_owner):
+        """Hand the course and its whole content tree over to ``new_owner``."""
+        self.owner = new_owner
+        self.save(update_fields=["owner", "updated_at"])
 
-class Module(models.Model):
+
+class Module(ownership.OwnershipKeysMixin, models.Model):
     """
     Course module containing related lessons.
     """
@@ -74,7 +92,19 @@ class Module(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="modules")
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
-    order = models.PositiveIntegerField(default=0)
+    # Sparse: siblings are spaced ordering.ORDER_GAP apart (see courses.ordering)
+    order = models.PositiveBigIntegerField(default=0)
+
+    # Denormalized from course.owner for single-predicate ownership filters
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=False,
+    )
 
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
@@ -85,13 +115,25 @@ class Module(models.Model):
         unique_together = ["course", "order"]
         indexes = [
             models.Index(fields=["course", "order"]),
+            models.Index(fields=["owner", "course"]),
         ]
 
     def __str__(self):
         return f"{self.course.title} - {self.title}"
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        self.owner_id = self.course.owner_id
+        ownership.with_update_fields(kwargs, "owner")
+        with transaction.atomic():
+            ordering.assign_order(self, ordering.Siblings(Module, "course"))
+            super().save(*args, **kwargs)
+            if self.ownership_changed(adding):
+                ownership.propagate_from_module(self)
+        self.remember_ownership()
 
-class Lesson(models.Model):
+
+class Lesson(ownership.OwnershipKeysMixin, models.Model):
     """
     Individual lesson with content and learning objectives.
     """
@@ -108,13 +150,31 @@ class Lesson(models.Model):
     estimated_minutes = models.PositiveIntegerField(
         default=10, validators=[MinValueValidator(1), MaxValueValidator(180)]
     )
-    order = models.PositiveIntegerField(default=0)
+    # Sparse: siblings are spaced ordering.ORDER_GAP apart (see courses.ordering)
+    order = models.PositiveBigIntegerField(default=0)
 
     # Assets and resources
     assets = models.JSONField(
         default=list, help_text="List of asset references (images, videos, files)"
     )
 
+    # Maintained by a database trigger on PostgreSQL (see courses.search)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Denormalized from module for single-predicate ownership filters
+    course = models.ForeignKey(
+        Course, on_delete=models.CASCADE, related_name="+", editable=False
+    )
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=False,
+    )
+
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -124,12 +184,20 @@ class Lesson(models.Model):
         unique_together = ["module", "order"]
         indexes = [
             models.Index(fields=["module", "order"]),
+            models.Index(fields=["owner", "course"]),
         ]
 
     def __str__(self):
         return f"{self.module.title} - {self.title}"
 
-    @property
-    def course(self):
-        """Get the parent course."""
-        return self.module.course
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        self.course_id = self.module.course_id
+        self.owner_id = self.module.owner_id
+        ownership.with_update_fields(kwargs, "course", "owner")
+        with transaction.atomic():
+            ordering.assign_order(self, ordering.Siblings(Lesson, "module"))
+            super().save(*args, **kwargs)
+            if self.ownership_changed(adding):
+                ownership.propagate_from_lesson(self)
+        self.remember_ownership()
@@ -0,0 +1,224 @@
+"""
+Gap-based ordering for siblings (modules in a course, lessons in a module,
+questions in a quiz).
+
+Siblings are spaced ``ORDER_GAP`` apart. Appending takes ``max + ORDER_GAP``
+and a move writes only the moved row, at the midpoint between its new
+neighbours. When two neighbours end up adjacent the parent is re-spaced
+inline; ``find_crowded_parents()`` lets a periodic job (``manage.py
+rebalance_orders``) re-space parents before moves ever hit that path.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Case, F, Max, Value, When
+from django.db.models.functions import Lag
+from django.dispatch import Signal
+
+ORDER_GAP = 1 << 16
+# Parents with any adjacent pair closer than this are picked up by rebalancing
+MIN_GAP = 16
+
+FIRST = "first"
+LAST = "last"
+
+# Sent after orders are written in bulk (``QuerySet.update()``,
+# ``bulk_create()``), which bypasses ``post_save``; receivers get
+# ``sender=<model>`` and the touched ``pks``.
+orders_changed = Signal()
+
+
+class OrderingError(ValueError):
+    """Raised for move requests that cannot be satisfied."""
+
+
+@dataclass(frozen=True)
+class Siblings:
+    """Ordering operations for ``model`` rows grouped by ``parent_field``."""
+
+    model: type[models.Model]
+    parent_field: str
+
+    @property
+    def parent_attname(self) -> str:
+        return self.model._meta.get_field(self.parent_field).attname
+
+    @property
+    def parent_model(self) -> type[models.Model]:
+        return self.model._meta.get_field(self.parent_field).related_model
+
+    def of(self, parent_id: Any) -> models.QuerySet:
+        return self.model._default_manager.filter(**{self.parent_attname: parent_id})
+
+    def next_order(self, parent_id: Any, exclude_pk: Any = None) -> int:
+        qs = self.of(parent_id)
+        if exclude_pk is not None:
+            qs = qs.exclude(pk=exclude_pk)
+        current = qs.aggregate(m=Max("order"))["m"]
+        return (current or 0) + ORDER_GAP
+
+    def _closest(
+        self,
+        parent_id: Any,
+        exclude_pk: Any,
+        *,
+        above: int | None = None,
+        below: int | None = None,
+    ) -> int | None:
+        qs = self.of(parent_id).exclude(pk=exclude_pk)
+        if above is not None:
+            qs = qs.filter(order__gt=above).order_by("order")
+        else:
+            qs = qs.filter(order__lt=below).order_by("-order")
+        return qs.values_list("order", flat=True).first()
+
+    def _slot(
+        self, obj: Any, parent_id: Any, before: Any, after: Any, position: str | None
+    ) -> int | None:
+        """Return the order value for the target slot, or ``None`` if there is no room."""
+        if before is None and after is None:
+            if position == LAST:
+                return self.next_order(parent_id, exclude_pk=obj.pk)
+            lo, hi = 0, self._closest(parent_id, obj.pk, above=-1)
+            if hi is None:
+                return ORDER_GAP
+        else:
+            anchor_pk = after if after is not None else before
+            if str(anchor_pk) == str(obj.pk):
+                raise OrderingError("Cannot move an item relative to itself.")
+            try:
+                anchor = (
+                    self.of(parent_id)
+                    .filter(pk=anchor_pk)
+                    .values_list("order", flat=True)
+                    .first()
+                )
+            except (ValueError, ValidationError):
+                anchor = None
+            if anchor is None:
+                raise OrderingError("Anchor must be a sibling under the same parent.")
+            if after is not None:
+                lo, hi = anchor, self._closest(parent_id, obj.pk, above=anchor)
+                if hi is None:
+                    return anchor + ORDER_GAP
+            else:
+                below = self._closest(parent_id, obj.pk, below=anchor)
+                lo, hi = 0 if below is None else below, anchor
+        mid = (lo + hi) // 2
+        return mid if lo < mid < hi else None
+
+    def move(
+        self,
+        obj: Any,
+        *,
+        before: Any = None,
+        after: Any = None,
+        position: str | None = None,
+    ) -> Any:
+        """
+        Move ``obj`` directly before/after a sibling, or to the first/last slot.
+
+        The parent row is locked so concurrent moves under one parent are
+        serialized; different parents never contend.
+        """
+        if before is not None and after is not None:
+            raise OrderingError("Pass either 'before' or 'after', not both.")
+        if before is None and after is None and position not in (FIRST, LAST):
+            raise OrderingError("One of 'before', 'after' or 'position' is required.")
+
+        parent_id = getattr(obj, self.parent_attname)
+        with transaction.atomic():
+            self.parent_model._default_manager.select_for_update().filter(
+                pk=parent_id
+            ).exists()
+            new_order = self._slot(obj, parent_id, before, after, position)
+            if new_order is None:
+                self.rebalance(parent_id)
+                new_order = self._slot(obj, parent_id, before, after, position)
+            self.model._default_manager.filter(pk=obj.pk).update(order=new_order)
+        obj.order = new_order
+        orders_changed.send(sender=self.model, pks=[obj.pk])
+        return obj
+
+    def rebalance(self, parent_id: Any) -> int:
+        """Re-space the siblings of ``parent_id`` ``ORDER_GAP`` apart; returns the row count."""
+        with transaction.atomic():
+            rows = list(
+                self.of(parent_id)
+                .select_for_update()
+                .order_by("order", "created_at")
+                .values_list("pk", "order")
+            )
+            if not rows:
+                return 0
+            # Lift every row above both the old and the new range first so the
+            # unique (parent, order) constraint never sees a transient clash.
+            offset = max(rows[-1][1], len(rows) * ORDER_GAP) + 1
+            self.of(parent_id).update(order=F("order") + offset)
+            self.of(parent_id).update(
+                order=Case(
+                    *(
+                        When(pk=pk, then=Value((i + 1) * ORDER_GAP))
+                        for i, (pk, _) in enumerate(rows)
+                    ),
+                    output_field=models.PositiveBigIntegerField(),
+                )
+            )
+        orders_changed.send(sender=self.model, pks=[pk for pk, _ in rows])
+        return len(rows)
+
+    def find_crowded_parents(self, min_gap: int = MIN_GAP) -> list[Any]:
+        """Parents where some adjacent pair of siblings is closer than ``min_gap``."""
+        attname = self.parent_attname
+        gaps = (
+            self.model._default_manager.annotate(
+                prev=models.Window(
+                    Lag("order"), partition_by=[F(attname)], order_by=F("order").asc()
+                )
+            )
+            .annotate(gap=F("order") - F("prev"))
+            .filter(gap__lt=min_gap)
+            .values_list(attname, flat=True)
+        )
+        return list(dict.fromkeys(gaps))
+
+    def parent_ids(self) -> list[Any]:
+        return list(
+            self.model._default_manager.order_by()
+            .values_list(self.parent_attname, flat=True)
+            .distinct()
+        )
+
+
+def assign_order(obj: Any, siblings: Siblings) -> None:
+    """
+    Append new rows that were created without an explicit ``order``.
+
+    Locks the parent row like ``move()``, so concurrent appends under one
+    parent cannot read the same ``Max(order)``; call it inside the
+    transaction that inserts ``obj``.
+    """
+    if obj._state.adding and not obj.order:
+        parent_id = getattr(obj, siblings.parent_attname)
+        siblings.parent_model._default_manager.select_for_update().filter(
+            pk=parent_id
+        ).exists()
+        obj.order = siblings.next_order(parent_id)
+
+
+def registry() -> dict[str, Siblings]:
+    """Every ordered sibling set, keyed by model label."""
+    from django.apps import apps
+
+    return {
+        "courses.Module": Siblings(apps.get_model("courses", "Module"), "course"),
+        "courses.Lesson": Siblings(apps.get_model("courses", "Lesson"), "module"),
+        "assessment.Question": Siblings(
+            apps.get_model("assessment", "Question"), "quiz"
+        ),
+    }
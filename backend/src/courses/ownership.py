@@ -0,0 +1,156 @@
+"""
+Denormalized ownership keys for the content tree.
+
+``Module``, ``Lesson``, ``Quiz`` and ``Question`` carry ``course_id`` and
+``owner_id`` copied from their ancestors so that ownership filtering is a
+single indexed predicate instead of a join chain. Keys are filled in on save
+and pushed down to descendants when an ancestor's keys change (course
+ownership transfer, moving a module or lesson, re-attaching a quiz).
+
+``QuerySet.update()`` and ``bulk_create()`` bypass ``save()``; callers using
+them must set the keys themselves or run ``resync_all()`` afterwards.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class OwnershipKeysMixin:
+    """Remember the ownership keys an instance was loaded with."""
+
+    ownership_fields: tuple[str, ...] = ("course_id", "owner_id")
+
+    @classmethod
+    def from_db(cls, db: Any, field_names: Any, values: Any) -> Any:
+        instance = super().from_db(db, field_names, values)  # type: ignore[misc]
+        instance.remember_ownership()
+        return instance
+
+    def current_ownership(self) -> tuple[Any, ...] | None:
+        # Deferred columns are absent from __dict__; treat keys as unknown then
+        if not all(name in self.__dict__ for name in self.ownership_fields):
+            return None
+        return tuple(self.__dict__[name] for name in self.ownership_fields)
+
+    def remember_ownership(self) -> None:
+        self._loaded_ownership = self.current_ownership()
+
+    def ownership_changed(self, adding: bool) -> bool:
+        if adding:
+            return False
+        loaded = getattr(self, "_loaded_ownership", None)
+        return loaded is None or loaded != self.current_ownership()
+
+
+def with_update_fields(kwargs: dict[str, Any], *names: str) -> dict[str, Any]:
+    """Make sure refreshed key columns are written by ``save(update_fields=...)``."""
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None:
+        kwargs["update_fields"] = {*update_fields, *names}
+    return kwargs
+
+
+def keys_for_object(
+    content_type_id: int | None, object_id: str | None
+) -> tuple[Any, Any]:
+    """Return ``(course_id, owner_id)`` for a Module/Lesson generic target."""
+    if not content_type_id or not object_id:
+        return None, None
+    model = ContentType.objects.get_for_id(content_type_id).model_class()
+    if model not in (
+        apps.get_model("courses", "Module"),
+        apps.get_model("courses", "Lesson"),
+    ):
+        return None, None
+    try:
+        row = (
+            model._default_manager.filter(pk=object_id)
+            .values_list("course_id", "owner_id")
+            .first()
+        )
+    except (ValueError, ValidationError):
+        row = None
+    return row if row is not None else (None, None)
+
+
+def _quiz_filter(module_ids: list[Any], lesson_ids: list[Any]) -> Q:
+    Module = apps.get_model("courses", "Module")
+    Lesson = apps.get_model("courses", "Lesson")
+    cond = Q(pk__in=[])
+    if module_ids:
+        cond |= Q(
+            content_type=ContentType.objects.get_for_model(Module),
+            object_id__in=[str(pk) for pk in module_ids],
+        )
+    if lesson_ids:
+        cond |= Q(
+            content_type=ContentType.objects.get_for_model(Lesson),
+            object_id__in=[str(pk) for pk in lesson_ids],
+        )
+    return cond
+
+
+def _push_to_quizzes(cond: Q, course_id: Any, owner_id: Any) -> None:
+    Quiz = apps.get_model("assessment", "Quiz")
+    Question = apps.get_model("assessment", "Question")
+    quiz_ids = list(Quiz.objects.filter(cond).values_list("pk", flat=True))
+    if not quiz_ids:
+        return
+    Quiz.objects.filter(pk__in=quiz_ids).update(course_id=course_id, owner_id=owner_id)
+    Question.objects.filter(quiz_id__in=quiz_ids).update(
+        course_id=course_id, owner_id=owner_id
+    )
+
+
+def propagate_from_course(course: Any) -> None:
+    """Push a course's owner down to every row of its tree."""
+    for label in (
+        "courses.Module",
+        "courses.Lesson",
+        "assessment.Quiz",
+        "assessment.Question",
+    ):
+        apps.get_model(label)._default_manager.filter(course_id=course.pk).update(
+            owner_id=course.owner_id
+        )
+
+
+def propagate_from_module(module: Any) -> None:
+    Lesson = apps.get_model("courses", "Lesson")
+    lessons = Lesson.objects.filter(module_id=module.pk)
+    lesson_ids = list(lessons.values_list("pk", flat=True))
+    lessons.update(course_id=module.course_id, owner_id=module.owner_id)
+    _push_to_quizzes(
+        _quiz_filter([module.pk], lesson_ids), module.course_id, module.owner_id
+    )
+
+
+def propagate_from_lesson(lesson: Any) -> None:
+    _push_to_quizzes(_quiz_filter([], [lesson.pk]), lesson.course_id, lesson.owner_id)
+
+
+def propagate_from_quiz(quiz: Any) -> None:
+    Question = apps.get_model("assessment", "Question")
+    Question.objects.filter(quiz_id=quiz.pk).update(
+        course_id=quiz.course_id, owner_id=quiz.owner_id
+    )
+
+
+def resync_all() -> dict[str, int]:
+    """Recompute every denormalized key from the source relations."""
+    Course = apps.get_model("courses", "Course")
+    Module = apps.get_model("courses", "Module")
+    counts = {"courses": 0, "modules": 0}
+    for course in Course.objects.only("id", "owner_id").iterator():
+        propagate_from_course(course)
+        counts["courses"] += 1
+    for module in Module.objects.only("id", "course_id", "owner_id").iterator():
+        propagate_from_module(module)
+        counts["modules"] += 1
+    return counts
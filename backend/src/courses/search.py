@@ -0,0 +1,309 @@
+"""
+Full-text search over lessons, quizzes and questions.
+
+On PostgreSQL each searchable table has a ``search_vector`` tsvector column
+kept current by a ``BEFORE INSERT OR UPDATE`` trigger (so bulk writes are
+covered too), a GIN index on that column, and a trigram GIN index on titles
+for typo-tolerant autocomplete. Lessons get theirs from migration
+``courses.0004`` (written for the default ``SEARCH_CONFIG``); the assessment
+tables have no migrations, so their DDL is installed idempotently after
+``migrate``. Other backends (SQLite in tests) use a ``icontains`` fallback
+with the same result shape.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, FloatField, Q, QuerySet, Value
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+# ts_headline does not escape HTML; mark matches with control characters and
+# swap them for tags after escaping the snippet ourselves.
+_PG_START = "\x02"
+_PG_STOP = "\x03"
+
+
+@dataclass(frozen=True)
+class SearchTarget:
+    type: str
+    model_label: str
+    # (field, weight) pairs feeding the tsvector; A ranks highest
+    weighted_fields: tuple[tuple[str, str], ...]
+    title_field: str
+    body_field: str
+    trigram: bool = False
+    # Whether a migration installs the trigger and indexes
+    migrated: bool = False
+
+    @property
+    def model(self) -> Any:
+        return apps.get_model(self.model_label)
+
+
+TARGETS: tuple[SearchTarget, ...] = (
+    SearchTarget(
+        type="lesson",
+        model_label="courses.Lesson",
+        weighted_fields=(("title", "A"), ("content", "B")),
+        title_field="title",
+        body_field="content",
+        trigram=True,
+        migrated=True,
+    ),
+    SearchTarget(
+        type="quiz",
+        model_label="assessment.Quiz",
+        weighted_fields=(("title", "A"), ("description", "B")),
+        title_field="title",
+        body_field="description",
+        trigram=True,
+    ),
+    SearchTarget(
+        type="question",
+        model_label="assessment.Question",
+        weighted_fields=(("prompt", "A"), ("rationale", "B")),
+        title_field="prompt",
+        body_field="rationale",
+    ),
+)
+
+
+def search_config() -> str:
+    return getattr(settings, "SEARCH_CONFIG", "english")
+
+
+def is_postgres() -> bool:
+    return connection.vendor == "postgresql"
+
+
+# --- DDL --------------------------------------------------------------------
+
+
+def ddl_statements(
+    config: str | None = None, targets: tuple[SearchTarget, ...] = TARGETS
+) -> list[str]:
+    """Statements that install triggers and indexes for ``targets``; safe to re-run."""
+    config = config or search_config()
+    statements = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]
+    for target in targets:
+        table = target.model._meta.db_table
+        vector = " || ".join(
+            f"setweight(to_tsvector('{config}', coalesce(NEW.{field}, '')), '{weight}')"
+            for field, weight in target.weighted_fields
+        )
+        columns = ", ".join(field for field, _ in target.weighted_fields)
+        func = f"{table}_search_vector_update"
+        statements += [
+            f"""
+            CREATE OR REPLACE FUNCTION {func}() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {vector};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+            """,
+            f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}",
+            f"""
+            CREATE TRIGGER {table}_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF {columns} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {func}()
+            """,
+            f"CREATE INDEX IF NOT EXISTS {table}_search_gin ON {table} USING gin (search_vector)",
+            # Backfill rows written before the trigger existed
+            f"UPDATE {table} SET {target.weighted_fields[0][0]} = {target.weighted_fields[0][0]} "
+            f"WHERE search_vector IS NULL",
+        ]
+        if target.trigram:
+            statements.append(
+                f"CREATE INDEX IF NOT EXISTS {table}_{target.title_field}_trgm "
+                f"ON {table} USING gin ({target.title_field} gin_trgm_ops)"
+            )
+    return statements
+
+
+def install_search_ddl(using: str = "default", **kwargs: Any) -> None:
+    """``post_migrate`` receiver for the unmigrated targets; no-op outside PostgreSQL."""
+    from django.db import connections
+
+    conn = connections[using]
+    if conn.vendor != "postgresql":
+        return
+    tables = set(conn.introspection.table_names())
+    targets = tuple(
+        t for t in TARGETS if not t.migrated and t.model._meta.db_table in tables
+    )
+    if not targets:
+        return
+    with conn.cursor() as cursor:
+        for sql in ddl_statements(targets=targets):
+            cursor.execute(sql)
+
+
+# --- Queries ----------------------------------------------------------------
+
+
+def scope_to_owner(qs: QuerySet, user: Any) -> QuerySet:
+    if getattr(settings, "ALLOW_ANON_WRITE_FOR_TESTS", False):
+        return qs
+    if user is not None and user.is_authenticated:
+        return qs.filter(owner=user)
+    return qs.none()
+
+
+def _terms(query: str) -> list[str]:
+    return [t for t in re.findall(r"\w+", query.lower()) if t]
+
+
+def _highlight(text: str, terms: list[str], max_chars: int = 200) -> str:
+    if not text:
+        return ""
+    lowered = text.lower()
+    first = min((i for i in (lowered.find(t) for t in terms) if i >= 0), default=0)
+    start = max(0, first - max_chars // 4)
+    snippet = html.escape(text[start : start + max_chars])
+    for term in sorted(set(terms), key=len, reverse=True):
+        snippet = re.sub(
+            f"({re.escape(html.escape(term))})",
+            f"{HIGHLIGHT_START}\\1{HIGHLIGHT_STOP}",
+            snippet,
+            flags=re.IGNORECASE,
+        )
+    return snippet
+
+
+def _result(
+    target: SearchTarget, obj: Any, rank: float, highlight: str
+) -> dict[str, Any]:
+    return {
+        "type": target.type,
+        "id": str(obj.pk),
+        "course": str(obj.course_id) if obj.course_id else None,
+        "title": getattr(obj, target.title_field),
+        "rank": round(float(rank), 6),
+        "highlight": highlight,
+    }
+
+
+def _postgres_search(
+    target: SearchTarget, qs: QuerySet, query: str, limit: int
+) -> list[dict[str, Any]]:
+    from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+
+    config = search_config()
+    search_query = SearchQuery(query, search_type="websearch", config=config)
+    rows = (
+        qs.filter(search_vector=search_query)
+        .annotate(
+            rank=SearchRank(F("search_vector"), search_query),
+            highlight=SearchHeadline(
+                target.body_field,
+                search_query,
+                config=config,
+                start_sel=_PG_START,
+                stop_sel=_PG_STOP,
+                max_words=35,
+                min_words=15,
+            ),
+        )
+        .defer(target.body_field, "search_vector")
+        .order_by("-rank")[:limit]
+    )
+    return [
+        _result(target, obj, obj.rank, _pg_highlight(obj.highlight)) for obj in rows
+    ]
+
+
+def _pg_highlight(text: str | None) -> str:
+    escaped = html.escape(text or "")
+    return escaped.replace(_PG_START, HIGHLIGHT_START).replace(_PG_STOP, HIGHLIGHT_STOP)
+
+
+def _fallback_search(
+    target: SearchTarget, qs: QuerySet, query: str, limit: int
+) -> list[dict[str, Any]]:
+    terms = _terms(query)
+    if not terms:
+        return []
+    fields = [field for field, _ in target.weighted_fields]
+    cond = Q()
+    for term in terms:
+        term_cond = Q()
+        for field in fields:
+            term_cond |= Q(**{f"{field}__icontains": term})
+        cond &= term_cond
+    weights = {"A": 1.0, "B": 0.4, "C": 0.2, "D": 0.1}
+    results = []
+    for obj in qs.filter(cond).defer("search_vector")[: limit * 5]:
+        rank = 0.0
+        for field, weight in target.weighted_fields:
+            text = (getattr(obj, field) or "").lower()
+            rank += weights[weight] * sum(text.count(t) for t in terms)
+        body = getattr(obj, target.body_field) or getattr(obj, target.title_field)
+        results.append(_result(target, obj, rank, _highlight(body, terms)))
+    results.sort(key=lambda r: r["rank"], reverse=True)
+    return results[:limit]
+
+
+def search(
+    query: str, user: Any, types: list[str] | None = None, limit: int = 20
+) -> list[dict[str, Any]]:
+    """Ranked, owner-scoped results across the requested content types."""
+    query = query.strip()
+    if not query:
+        return []
+    run = _postgres_search if is_postgres() else _fallback_search
+    results: list[dict[str, Any]] = []
+    for target in TARGETS:
+        if types and target.type not in types:
+            continue
+        qs = scope_to_owner(target.model._default_manager.all(), user)
+        results.extend(run(target, qs, query, limit))
+    results.sort(key=lambda r: r["rank"], reverse=True)
+    return results[:limit]
+
+
+def autocomplete(prefix: str, user: Any, limit: int = 10) -> list[dict[str, Any]]:
+    """Typo-tolerant title suggestions for lessons and quizzes."""
+    prefix = prefix.strip()
+    if not prefix:
+        return []
+    threshold = getattr(settings, "SEARCH_TRIGRAM_THRESHOLD", 0.3)
+    out: list[dict[str, Any]] = []
+    for target in TARGETS:
+        if not target.trigram:
+            continue
+        qs = scope_to_owner(target.model._default_manager.all(), user)
+        if is_postgres():
+            from django.contrib.postgres.search import TrigramWordSimilarity
+
+            qs = (
+                qs.annotate(score=TrigramWordSimilarity(prefix, target.title_field))
+                .filter(
+                    Q(score__gte=threshold)
+                    | Q(**{f"{target.title_field}__istartswith": prefix})
+                )
+                .order_by("-score")
+            )
+        else:
+            qs = qs.filter(**{f"{target.title_field}__icontains": prefix}).annotate(
+                score=Value(1.0, output_field=FloatField())
+            )
+        for obj in qs.only("id", target.title_field)[:limit]:
+            out.append(
+                {
+                    "type": target.type,
+                    "id": str(obj.pk),
+                    "title": getattr(obj, target.title_field),
+                    "score": round(float(obj.score), 6),
+                }
+            )
+    out.sort(key=lambda r: r["score"], reverse=True)
+    return out[:limit]
@@ -9,3 +9,11 @@ class ExportConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "export"
     verbose_name = "Export"
+
+    def ready(self):
+        from jobs import engine
+        from jobs.models import AIJob
+
+        from .jobs import run_export
+
+        engine.register(AIJob.JobKind.EXPORT)(run_export)
@@ -0,0 +1,27 @@
+"""
+AIJob handler for ``export`` jobs (registered in ``ExportConfig.ready``).
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from courses.models import Course
+from jobs.models import AIJob, ExportArtifact
+from jobs.progress import ProgressReporter
+
+from .scorm.service import export_course_to_scorm
+
+
+def run_export(job: AIJob) -> dict[str, Any]:
+    with ProgressReporter(job) as progress:
+        course = Course.objects.get(pk=job.input_data["course_id"], owner=job.owner)
+        progress.update(10, "Building SCORM package")
+        artifact = export_course_to_scorm(course, owner=job.owner)
+        progress.update(90, "Storing artifact")
+        ExportArtifact.objects.filter(pk=artifact.pk).update(job=job)
+    return {
+        "artifact_id": str(artifact.pk),
+        "file_size_bytes": artifact.file_size_bytes,
+        "checksum": artifact.checksum,
+    }
@@ -8,11 +8,13 @@ writes it to MEDIA_ROOT, and records an ExportArtifact with checksums.
 from __future__ import annotations
 
 import hashlib
+import time
 from pathlib import Path
 
 from django.conf import settings
 from django.contrib.auth.models import User
 
+from core import metrics
 from courses.models import Course, Lesson, Module
 from jobs.models import ExportArtifact
 from .writer import CourseData, LessonData, build_scorm_zip
@@ -28,6 +30,7 @@ def _lesson_html_from_model(lesson: Lesson) -> str:
 
 
 def export_course_to_scorm(course: Course, *, owner: User | None = None) -> ExportArtifact:
+    started = time.perf_counter()
     # Collect lessons ordered by module.order then lesson.order
     modules = (
         Module.objects.filter(course=course).order_by("order", "created_at").all()
@@ -71,6 +74,10 @@ def export_course_to_scorm(course: Course, *, owner: User | None = None) -> Expo
         },
         job=None,
     )
+    metrics.EXPORT_DURATION.observe(time.perf_counter() - started, ExportArtifact.ExportKind.SCORM)
+    metrics.EXPORT_SIZE.observe(size_bytes, ExportArtifact.ExportKind.SCORM)
+    # Exports also run outside web requests (management command, workers)
+    metrics.REGISTRY.flush()
     return artifact
 
 
@@ -9,3 +9,15 @@ class JobsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "jobs"
     verbose_name = "Jobs"
+
+    def ready(self):
+        from django.db.models.signals import post_save
+
+        from core import metrics
+
+        from .events import job_saved
+        from .maintenance import aijob_queue_depth
+        from .models import AIJob
+
+        post_save.connect(job_saved, sender=AIJob, dispatch_uid="jobs.events.job_saved")
+        metrics.AIJOB_QUEUE_DEPTH.set_collector(aijob_queue_depth)
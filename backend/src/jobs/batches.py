@@ -0,0 +1,246 @@
+"""
+Batch submission of AIJobs.
+
+Generating a course means one ``lesson`` job per outline entry and one
+``quiz`` job per lesson. ``submit`` inserts them with a single
+``bulk_create`` in one transaction, under a ``batch`` parent job, and hands
+them to the engine together (``engine.enqueue_many``). The parent never runs;
+it is ``running`` while its children are, carries their aggregate progress
+(``refresh``, called as each child finishes), and completes, or fails if any
+child failed, with the last of them. Its ``cost_cents`` is the children's
+total. ``retry_failed`` re-runs only the children that failed, so one bad
+lesson does not mean regenerating a whole course.
+
+A job that fans out a batch (an ``outline`` submitting its lessons) is
+parked by the engine once its own work is done: still ``running``, but
+without a lease or a lane slot. ``roll_up`` carries the batch's progress
+onto it and finishes it with the batch, adding the batch's cost to its own,
+so the job the client started reports the whole generation.
+
+A batch submitted with an ``Idempotency-Key`` records the key, so a retry
+after the middleware's stored response expired still returns the original
+batch instead of creating a second one.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from functools import partial
+from typing import Any
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import AIJob
+
+
+def submit(
+    owner: Any,
+    items: Iterable[dict[str, Any]],
+    idempotency_key: str = "",
+    parent: AIJob | None = None,
+) -> tuple[AIJob, bool]:
+    """
+    Create a batch of ``{"kind", "input_data"[, "use_result_cache"]}`` jobs for
+    ``owner``, optionally under the ``parent`` job that fanned it out.
+
+    Returns ``(parent, created)``; ``created`` is ``False`` when the
+    idempotency key already produced a batch.
+    """
+    from .engine import enqueue_many
+
+    batches = AIJob.objects.filter(owner=owner, kind=AIJob.JobKind.BATCH)
+    if idempotency_key:
+        existing = batches.filter(input_data__idempotency_key=idempotency_key).first()
+        if existing is not None:
+            return existing, False
+
+    items = list(items)
+    input_data: dict[str, Any] = {"size": len(items)}
+    if idempotency_key:
+        input_data["idempotency_key"] = idempotency_key
+    with transaction.atomic():
+        batch = AIJob.objects.create(
+            owner=owner,
+            parent=parent,
+            kind=AIJob.JobKind.BATCH,
+            status=AIJob.Status.RUNNING,
+            started_at=timezone.now(),
+            input_data=input_data,
+            progress_message=f"0/{len(items)} done",
+        )
+        children = AIJob.objects.bulk_create(
+            AIJob(
+                owner=owner,
+                parent=batch,
+                kind=item["kind"],
+                input_data=item.get("input_data") or {},
+                use_result_cache=item.get("use_result_cache", True),
+            )
+            for item in items
+        )
+        enqueue_many(children)
+    return batch, True
+
+
+def refresh(parent_id: Any) -> None:
+    """Recompute a batch's aggregate progress; finish it once every child has."""
+    from .engine import transition
+
+    # Keyed by status; Status members are (value, label) tuples to mypy
+    counts: dict[Any, int] = {}
+    progress = cost = 0
+    for row in (
+        AIJob.objects.filter(parent_id=parent_id)
+        .values("status")
+        .annotate(
+            n=Count("id"), progress=Sum("progress_percentage"), cost=Sum("cost_cents")
+        )
+        .order_by()
+    ):
+        counts[row["status"]] = row["n"]
+        cost += row["cost"]
+        # A finished child counts as done wherever its progress stopped
+        progress += (
+            100 * row["n"]
+            if row["status"] in AIJob.TERMINAL_STATUSES
+            else row["progress"]
+        )
+    total = sum(counts.values())
+    if not total:
+        return
+    done = sum(counts.get(status, 0) for status in AIJob.TERMINAL_STATUSES)
+    fields: dict[str, Any] = {
+        "progress_percentage": progress // total,
+        "progress_message": f"{done}/{total} done",
+        "output_data": {"children": counts},
+        "cost_cents": cost,
+    }
+    if done < total:
+        transition(parent_id, [AIJob.Status.RUNNING], AIJob.Status.RUNNING, **fields)
+    else:
+        failed = counts.get(AIJob.Status.FAILED, 0)
+        transition(
+            parent_id,
+            [AIJob.Status.RUNNING],
+            AIJob.Status.FAILED if failed else AIJob.Status.COMPLETED,
+            completed_at=timezone.now(),
+            error_message=f"{failed} of {total} jobs failed" if failed else "",
+            **fields,
+        )
+    owner_job_id = (
+        AIJob.objects.filter(pk=parent_id).values_list("parent_id", flat=True).first()
+    )
+    if owner_job_id is not None:
+        roll_up(owner_job_id)
+
+
+def fanned_out(job_id: Any) -> bool:
+    """Whether ``job_id`` submitted a batch it should finish with."""
+    return AIJob.objects.filter(parent_id=job_id, kind=AIJob.JobKind.BATCH).exists()
+
+
+def roll_up(job_id: Any) -> None:
+    """
+    Carry a parked job's batch progress onto it; once the batch has finished,
+    finish the job the same way and add the batch's cost to its own.
+
+    Only parked jobs (``running`` without a lease) are touched, so this is a
+    no-op while the job's own attempt is still running; the engine calls it
+    again after parking.
+    """
+    from .engine import transition
+
+    batch = (
+        AIJob.objects.filter(parent_id=job_id, kind=AIJob.JobKind.BATCH)
+        .values(
+            "status",
+            "progress_percentage",
+            "progress_message",
+            "error_message",
+            "cost_cents",
+        )
+        .first()
+    )
+    if batch is None:
+        return
+    if batch["status"] not in AIJob.TERMINAL_STATUSES:
+        transition(
+            job_id,
+            [AIJob.Status.RUNNING],
+            AIJob.Status.RUNNING,
+            lease="",
+            progress_percentage=batch["progress_percentage"],
+            progress_message=batch["progress_message"],
+        )
+        return
+    finished = transition(
+        job_id,
+        [AIJob.Status.RUNNING],
+        batch["status"],
+        lease="",
+        progress_percentage=100,
+        progress_message=batch["progress_message"],
+        error_message=batch["error_message"],
+        cost_cents=F("cost_cents") + batch["cost_cents"],
+        completed_at=timezone.now(),
+    )
+    if finished:
+        parent_id = (
+            AIJob.objects.filter(pk=job_id).values_list("parent_id", flat=True).first()
+        )
+        if parent_id is not None:
+            transaction.on_commit(partial(refresh, parent_id))
+
+
+def retry_failed(parent_id: Any) -> int:
+    """
+    Re-run a batch's failed children from scratch; the rest keep their
+    results. The batch is running again until they finish. Returns how many
+    were retried.
+    """
+    from .engine import RELEASED, enqueue_many, transition
+
+    with transaction.atomic():
+        failed = list(
+            AIJob.objects.select_for_update().filter(
+                parent_id=parent_id, status=AIJob.Status.FAILED
+            )
+        )
+        if not failed:
+            return 0
+        AIJob.objects.filter(pk__in=[job.pk for job in failed]).update(
+            status=AIJob.Status.PENDING,
+            retry_count=0,
+            error_message="",
+            progress_percentage=0,
+            progress_message="",
+            celery_task_id=None,
+            started_at=None,
+            completed_at=None,
+            updated_at=timezone.now(),
+            **RELEASED,
+        )
+        batch = AIJob.objects.select_for_update().get(pk=parent_id)
+        transition(
+            parent_id,
+            [AIJob.Status.FAILED],
+            AIJob.Status.RUNNING,
+            completed_at=None,
+            error_message="",
+        )
+        if batch.parent_id is not None:
+            # Reopen the job that fanned the batch out; roll_up adds the new total
+            transition(
+                batch.parent_id,
+                [AIJob.Status.FAILED],
+                AIJob.Status.RUNNING,
+                lease="",
+                completed_at=None,
+                error_message="",
+                cost_cents=F("cost_cents") - batch.cost_cents,
+            )
+        enqueue_many(failed)
+    refresh(parent_id)
+    return len(failed)
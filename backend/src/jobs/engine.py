@@ -0,0 +1,493 @@
+"""
+Execution engine for ``AIJob``.
+
+Creating a job calls ``enqueue``; once the transaction commits, the job is
+released by the fair-share dispatcher (``jobs.scheduler``), or sent directly
+when ``AIJOB_FAIR_SCHEDULING`` is off, to the Celery queue of its kind's lane
+(``AIJOB_LANES``) with that lane's message priority. Each lane is served by its own worker pool, so cheap
+``outline`` jobs are never stuck behind long ``lecture``/``export`` jobs.
+With ``CELERY_TASK_ALWAYS_EAGER`` (tests) jobs run inline on commit instead.
+
+Work for a kind is a handler registered with ``@register(kind)``. It receives
+the running job and returns its ``output_data``. Status changes are
+conditional ``UPDATE``s (``transition``), so a job is claimed once, and a
+result that arrives after a cancellation is dropped. Handlers raise
+``RetryableJobError`` for transient failures; the job goes back to
+``pending`` with ``retry_count`` incremented and is re-sent after an
+exponential, jittered backoff until ``AIJOB_MAX_RETRIES`` is reached.
+
+Stages registered with ``@register_stage(kind)`` run after the handler, or
+after a result cache hit, with the job and its output: they apply the output
+(write lessons, fan out follow-up jobs) and may return an amended output.
+Keeping side effects out of handlers lets a cached result be applied again.
+A job whose stage submitted a batch under it is parked rather than completed
+and finishes with that batch (``jobs.batches.roll_up``).
+
+A running job holds a lease (``lease_owner``/``lease_expires_at``) that a
+heartbeat thread renews every third of ``AIJOB_LEASE_SECONDS`` while the
+handler runs. Finishing requires still holding the lease, and a job whose
+worker died is picked up by ``jobs.maintenance.reap_expired_leases``.
+Workers may also pull jobs from the database (``claim_next``) instead of
+receiving them from Celery.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import random
+import socket
+import threading
+import uuid
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import partial
+from typing import Any
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from ai import result_cache
+from core import metrics
+from core.celery import app as celery_app
+
+from . import batches, events, scheduler
+from .models import AIJob
+
+logger = logging.getLogger("omnicourse.jobs")
+
+TASK_NAME = "jobs.run_aijob"
+
+# An ``AIJob.JobKind``/``AIJob.Status`` member or its value. Without the Django
+# mypy plugin the members look like their ``(value, label)`` tuples, hence ``Any``.
+Choice = Any
+
+Handler = Callable[[AIJob], "dict[str, Any] | None"]
+_handlers: dict[str, Handler] = {}
+Stage = Callable[[AIJob, "dict[str, Any]"], "dict[str, Any] | None"]
+_stages: dict[str, list[Stage]] = defaultdict(list)
+
+
+class RetryableJobError(Exception):
+    """A transient failure (throttling, timeout); the job is retried with backoff."""
+
+
+@dataclass(frozen=True)
+class Lane:
+    queue: str
+    concurrency: int
+    priority: int
+
+
+def lane_for(kind: str) -> Lane:
+    config = getattr(settings, "AIJOB_LANES", {}).get(kind, {})
+    return Lane(
+        queue=config.get("queue", f"aijobs.{kind}"),
+        concurrency=config.get("concurrency", 1),
+        priority=config.get("priority", 5),
+    )
+
+
+def register(kind: Choice) -> Callable[[Handler], Handler]:
+    def decorator(handler: Handler) -> Handler:
+        _handlers[kind] = handler
+        return handler
+
+    return decorator
+
+
+def register_stage(kind: Choice) -> Callable[[Stage], Stage]:
+    def decorator(stage: Stage) -> Stage:
+        if stage not in _stages[kind]:
+            _stages[kind].append(stage)
+        return stage
+
+    return decorator
+
+
+def transition(
+    job_id: Any,
+    from_statuses: Iterable[Choice],
+    to_status: Choice,
+    *,
+    lease: str | None = None,
+    **fields: Any,
+) -> bool:
+    """
+    Move the job to ``to_status`` only if it is currently in ``from_statuses``
+    (and, with ``lease``, still leased by that worker).
+
+    A single conditional ``UPDATE``; returns whether this caller won. The
+    progress event is published from the fresh row (``.update()`` does not
+    send ``post_save``).
+    """
+    jobs = AIJob.objects.filter(pk=job_id, status__in=list(from_statuses))
+    if lease is not None:
+        jobs = jobs.filter(lease_owner=lease)
+    updated = jobs.update(status=to_status, updated_at=timezone.now(), **fields)
+    if updated:
+        job = AIJob.objects.filter(pk=job_id).first()
+        if job is not None:
+            events.publish_job(job)
+    return bool(updated)
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Exponential backoff with jitter for the ``attempt``-th retry (1-based)."""
+    base = float(getattr(settings, "AIJOB_RETRY_BACKOFF_SECONDS", 5.0))
+    cap = float(getattr(settings, "AIJOB_RETRY_BACKOFF_MAX_SECONDS", 300.0))
+    delay = min(cap, base * 2 ** (attempt - 1))
+    return random.uniform(delay / 2, delay)
+
+
+def lease_seconds() -> float:
+    return float(getattr(settings, "AIJOB_LEASE_SECONDS", 60.0))
+
+
+def worker_id() -> str:
+    """A lease owner name unique to this attempt, readable in the admin."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _leased(worker: str) -> dict[str, Any]:
+    now = timezone.now()
+    return {
+        "lease_owner": worker,
+        "heartbeat_at": now,
+        "lease_expires_at": now + timedelta(seconds=lease_seconds()),
+    }
+
+
+RELEASED = {"lease_owner": "", "lease_expires_at": None}
+
+
+def heartbeat(job_id: Any, worker: str) -> bool:
+    """Renew ``worker``'s lease; ``False`` once it is lost (reaped, cancelled or finished)."""
+    return bool(
+        AIJob.objects.filter(
+            pk=job_id, status=AIJob.Status.RUNNING, lease_owner=worker
+        ).update(**_leased(worker))
+    )
+
+
+@contextmanager
+def _heartbeating(job_id: Any, worker: str) -> Iterator[None]:
+    interval = lease_seconds() / 3
+    stop = threading.Event()
+
+    def beat() -> None:
+        try:
+            while not stop.wait(interval):
+                if not heartbeat(job_id, worker):
+                    logger.warning("AIJob %s lost its lease (%s)", job_id, worker)
+                    return
+        except Exception:  # The reaper decides when a lease is dead
+            logger.warning("AIJob %s heartbeat failed", job_id, exc_info=True)
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(
+        target=beat, name=f"aijob-heartbeat-{job_id}", daemon=True
+    )
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def enqueue(job: AIJob) -> None:
+    """
+    Hand a new ``job`` to the fair-share dispatcher (``jobs.scheduler``) once
+    the current transaction commits, or straight to its lane when fair
+    scheduling is off.
+    """
+    job_id, kind = job.pk, job.kind
+    if scheduler.enabled():
+        transaction.on_commit(lambda: scheduler.dispatcher.pump(kind))
+    else:
+        transaction.on_commit(lambda: dispatch(job_id, kind))
+
+
+def dispatch(
+    job_id: Any,
+    kind: str,
+    countdown: float | None = None,
+    previous_task_id: str | None = None,
+) -> bool:
+    """
+    Send a pending job to its lane's queue.
+
+    The job is claimed by swapping ``celery_task_id`` from ``previous_task_id``
+    (``None`` for a job that was never sent) in one conditional UPDATE, so
+    concurrent dispatchers cannot send it twice. Returns whether it was sent.
+    """
+    eager = getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False)
+    if celery_app is None and not eager:
+        logger.warning("Celery is not installed; AIJob %s stays pending", job_id)
+        return False
+    task_id = str(uuid.uuid4())
+    claimed = AIJob.objects.filter(
+        pk=job_id, status=AIJob.Status.PENDING, celery_task_id=previous_task_id
+    ).update(celery_task_id=task_id)
+    if not claimed:
+        return False
+    if eager:
+        execute(job_id)
+    else:
+        _send(job_id, kind, task_id, countdown=countdown)
+    return True
+
+
+def enqueue_many(jobs: Iterable[AIJob]) -> None:
+    """``enqueue`` for jobs created together: one dispatcher pass per kind, or one batched send."""
+    by_kind: dict[str, list[Any]] = defaultdict(list)
+    for job in jobs:
+        by_kind[job.kind].append(job.pk)
+    if scheduler.enabled():
+        for kind in by_kind:
+            transaction.on_commit(partial(scheduler.dispatcher.pump, kind))
+    else:
+        transaction.on_commit(lambda: dispatch_many(by_kind))
+
+
+def dispatch_many(job_ids_by_kind: dict[str, list[Any]]) -> int:
+    """
+    ``dispatch`` never-sent jobs in bulk: one UPDATE claims them all and the
+    messages go out over a single broker connection. Returns how many were sent.
+    """
+    eager = getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False)
+    if celery_app is None and not eager:
+        logger.warning(
+            "Celery is not installed; %d AIJobs stay pending",
+            sum(map(len, job_ids_by_kind.values())),
+        )
+        return 0
+    task_ids = {pk: str(uuid.uuid4()) for ids in job_ids_by_kind.values() for pk in ids}
+    if not task_ids:
+        return 0
+    AIJob.objects.filter(
+        pk__in=list(task_ids), status=AIJob.Status.PENDING, celery_task_id__isnull=True
+    ).update(
+        celery_task_id=Case(
+            *(When(pk=pk, then=Value(task_id)) for pk, task_id in task_ids.items())
+        )
+    )
+    claimed = set(
+        AIJob.objects.filter(
+            pk__in=list(task_ids), celery_task_id__in=list(task_ids.values())
+        ).values_list("pk", flat=True)
+    )
+    if eager:
+        for pk in task_ids:
+            if pk in claimed:
+                execute(pk)
+        return len(claimed)
+    assert celery_app is not None
+    with celery_app.producer_or_acquire() as producer:
+        for kind, ids in job_ids_by_kind.items():
+            for pk in ids:
+                if pk in claimed:
+                    _send(pk, kind, task_ids[pk], producer=producer)
+    return len(claimed)
+
+
+def _send(job_id: Any, kind: str, task_id: str, **options: Any) -> None:
+    lane = lane_for(kind)
+    assert celery_app is not None
+    celery_app.send_task(
+        TASK_NAME,
+        args=[str(job_id)],
+        task_id=task_id,
+        queue=lane.queue,
+        priority=lane.priority,
+        **options,
+    )
+
+
+def _finished(job: AIJob) -> None:
+    """A slot in the job's lane freed up and its batch may have progressed."""
+    # Workers serve no /metrics; hand their samples (wait time, model calls)
+    # to the shared directory the web processes scrape
+    metrics.REGISTRY.flush()
+    if scheduler.enabled():
+        transaction.on_commit(partial(scheduler.dispatcher.pump, job.kind))
+    if job.parent_id:
+        transaction.on_commit(partial(batches.refresh, job.parent_id))
+
+
+def execute(job_id: Any, worker: str | None = None) -> str | None:
+    """
+    Claim the job and run one attempt of it.
+
+    Returns the status it was left in, or ``None`` if it was not pending
+    (already claimed, finished or cancelled).
+    """
+    worker = worker or worker_id()
+    if not transition(
+        job_id,
+        [AIJob.Status.PENDING],
+        AIJob.Status.RUNNING,
+        started_at=timezone.now(),
+        **_leased(worker),
+    ):
+        return None
+    return _run(job_id, worker)
+
+
+def claim_next(kinds: Iterable[str], worker: str) -> Any | None:
+    """
+    Claim the oldest pending job of ``kinds`` for a worker polling the
+    database; returns its id, or ``None`` when there is nothing to do.
+
+    ``SELECT ... FOR UPDATE SKIP LOCKED`` lets concurrent workers each take a
+    different row without queueing on one another's locks. The conditional
+    UPDATE in ``transition`` still guards backends without row locks (SQLite).
+    Retries are not claimable before their backoff ends.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        candidates = (
+            AIJob.objects.select_for_update(skip_locked=True)
+            .filter(status=AIJob.Status.PENDING, kind__in=list(kinds))
+            .filter(Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lte=now))
+            .order_by("created_at")
+            .values_list("pk", flat=True)[:1]
+        )
+        for job_id in candidates:
+            if transition(
+                job_id,
+                [AIJob.Status.PENDING],
+                AIJob.Status.RUNNING,
+                started_at=now,
+                **_leased(worker),
+            ):
+                return job_id
+    return None
+
+
+def run_next(
+    kinds: Iterable[str], worker: str | None = None
+) -> tuple[Any, str | None] | None:
+    """Claim and run the next job of ``kinds``; ``(job_id, status)`` or ``None`` if idle."""
+    worker = worker or worker_id()
+    job_id = claim_next(kinds, worker)
+    if job_id is None:
+        return None
+    return job_id, _run(job_id, worker)
+
+
+def _run(job_id: Any, worker: str) -> str | None:
+    job = AIJob.objects.get(pk=job_id)
+    metrics.AIJOB_WAIT.observe(
+        (job.started_at - job.created_at).total_seconds(), job.kind
+    )
+    handler = _handlers.get(job.kind)
+    completion: dict[str, Any] = {}
+    output: dict[str, Any] | None
+    try:
+        hit = result_cache.lookup(job)
+        if hit is not None:
+            output = hit.output
+            completion = {"token_usage": hit.usage_record(), "cost_cents": 0}
+        else:
+            if handler is None:
+                raise LookupError(f"No handler registered for {job.kind} jobs")
+            with _heartbeating(job_id, worker):
+                output = handler(job)
+            # Handlers record usage on the row as they go
+            usage = (
+                AIJob.objects.filter(pk=job_id)
+                .values("token_usage", "cost_cents")
+                .first()
+                or {}
+            )
+            result_cache.store(
+                job,
+                output,
+                usage.get("token_usage") or {},
+                usage.get("cost_cents") or 0,
+            )
+        if _stages[job.kind]:
+            with _heartbeating(job_id, worker):
+                for stage in _stages[job.kind]:
+                    output = stage(job, output or {}) or output
+    except RetryableJobError as exc:
+        if job.retry_count < getattr(settings, "AIJOB_MAX_RETRIES", 3):
+            logger.info("AIJob %s failed transiently, retrying: %s", job_id, exc)
+            countdown = backoff_seconds(job.retry_count + 1)
+            if transition(
+                job_id,
+                [AIJob.Status.RUNNING],
+                AIJob.Status.PENDING,
+                lease=worker,
+                retry_count=F("retry_count") + 1,
+                error_message=str(exc),
+                lease_owner="",
+                lease_expires_at=timezone.now() + timedelta(seconds=countdown),
+            ):
+                # Retries keep their slot and go straight back to the lane
+                transaction.on_commit(
+                    lambda: dispatch(
+                        job_id, job.kind, countdown, previous_task_id=job.celery_task_id
+                    )
+                )
+            metrics.REGISTRY.flush()
+            return _status(job_id)
+        return _fail(job, exc, worker)
+    except Exception as exc:
+        logger.exception("AIJob %s failed", job_id)
+        return _fail(job, exc, worker)
+
+    if batches.fanned_out(job_id):
+        # Park: give up the lease and the lane slot, and finish with the batch
+        if transition(
+            job_id,
+            [AIJob.Status.RUNNING],
+            AIJob.Status.RUNNING,
+            lease=worker,
+            output_data=output or {},
+            error_message="",
+            **completion,
+            **RELEASED,
+        ):
+            batches.roll_up(job_id)
+    else:
+        transition(
+            job_id,
+            [AIJob.Status.RUNNING],
+            AIJob.Status.COMPLETED,
+            lease=worker,
+            output_data=output or {},
+            error_message="",
+            progress_percentage=100,
+            completed_at=timezone.now(),
+            **completion,
+            **RELEASED,
+        )
+    _finished(job)
+    return _status(job_id)
+
+
+def _status(job_id: Any) -> str | None:
+    return AIJob.objects.filter(pk=job_id).values_list("status", flat=True).first()
+
+
+def _fail(job: AIJob, exc: Exception, worker: str) -> str | None:
+    transition(
+        job.pk,
+        [AIJob.Status.RUNNING],
+        AIJob.Status.FAILED,
+        lease=worker,
+        error_message=str(exc) or exc.__class__.__name__,
+        completed_at=timezone.now(),
+        **RELEASED,
+    )
+    _finished(job)
+    return _status(job.pk)
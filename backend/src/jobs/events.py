@@ -0,0 +1,212 @@
+"""
+Pub/sub channel for AIJob progress events.
+
+Every committed ``AIJob`` save publishes a small event (status and progress
+fields) on a per-owner channel; the SSE views in ``api.streams`` subscribe to
+it instead of polling the database.
+
+Backends (``JOB_EVENTS_BACKEND``):
+
+* ``redis`` (default): Redis pub/sub on ``JOB_EVENTS_REDIS_URL`` so web and
+  worker processes share channels. Requires the ``redis`` package.
+* ``local``: in-process fan-out, for tests. Events published in another
+  process (a Celery worker) are not seen.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from core import jsonlib
+
+try:  # Optional dependency
+    import redis
+    import redis.asyncio as redis_async
+except Exception:  # pragma: no cover
+    redis = None
+    redis_async = None
+
+logger = logging.getLogger("omnicourse.jobs")
+
+
+def job_event(job: Any) -> dict[str, Any]:
+    """Wire shape of a progress event; also used for initial snapshots."""
+    return {
+        "id": str(job.pk),
+        "kind": job.kind,
+        "status": job.status,
+        "progress_percentage": job.progress_percentage,
+        "progress_message": job.progress_message,
+        "updated_at": job.updated_at,
+    }
+
+
+def channel_for(owner_id: Any) -> str:
+    return f"jobs:events:{owner_id}"
+
+
+class Subscription(ABC):
+    """Async iterator side of a channel; call ``close()`` when done."""
+
+    @abstractmethod
+    async def get(self, timeout: float) -> dict[str, Any] | None:
+        """Next event, or ``None`` if nothing arrived within ``timeout``."""
+
+    @abstractmethod
+    async def close(self) -> None: ...
+
+
+class _LocalSubscription(Subscription):
+    def __init__(self, broker: LocalBroker, channel: str) -> None:
+        self._broker = broker
+        self._channel = channel
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(
+            maxsize=broker.queue_size
+        )
+
+    def deliver(self, event: dict[str, Any]) -> None:
+        # Called from whichever thread published; hop onto our loop
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:  # loop already closed
+            self._broker.unsubscribe(self._channel, self)
+
+    def _put(self, event: dict[str, Any]) -> None:
+        if self._queue.full():
+            # Slow consumer: drop the oldest event, progress is cumulative
+            self._queue.get_nowait()
+        self._queue.put_nowait(event)
+
+    async def get(self, timeout: float) -> dict[str, Any] | None:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+    async def close(self) -> None:
+        self._broker.unsubscribe(self._channel, self)
+
+
+class LocalBroker:
+    def __init__(self, queue_size: int = 100) -> None:
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: dict[str, set[_LocalSubscription]] = {}
+
+    def publish(self, channel: str, event: dict[str, Any]) -> None:
+        # Round-trip through JSON so subscribers see exactly what Redis would give them
+        event = jsonlib.loads(jsonlib.dumps(event))
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for sub in subscribers:
+            sub.deliver(event)
+
+    async def subscribe(self, channel: str) -> Subscription:
+        sub = _LocalSubscription(self, channel)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, channel: str, sub: _LocalSubscription) -> None:
+        with self._lock:
+            subs = self._subscribers.get(channel)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[channel]
+
+
+class _RedisSubscription(Subscription):
+    def __init__(self, client: Any, pubsub: Any) -> None:
+        self._client = client
+        self._pubsub = pubsub
+
+    async def get(self, timeout: float) -> dict[str, Any] | None:
+        message = await self._pubsub.get_message(
+            ignore_subscribe_messages=True, timeout=timeout
+        )
+        if message is None:
+            return None
+        return jsonlib.loads(message["data"])
+
+    async def close(self) -> None:
+        await self._pubsub.aclose()
+        await self._client.aclose()
+
+
+class RedisBroker:
+    def __init__(self, url: str) -> None:
+        if redis is None:
+            raise RuntimeError("JOB_EVENTS_BACKEND=redis requires the 'redis' package")
+        self.url = url
+        self._client = redis.Redis.from_url(url)
+
+    def publish(self, channel: str, event: dict[str, Any]) -> None:
+        self._client.publish(channel, jsonlib.dumps(event))
+
+    async def subscribe(self, channel: str) -> Subscription:
+        # One async client per subscription: connections are bound to the
+        # event loop that created them.
+        client = redis_async.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+        return _RedisSubscription(client, pubsub)
+
+
+@lru_cache(maxsize=1)
+def get_broker() -> Any:
+    choice = getattr(settings, "JOB_EVENTS_BACKEND", "redis")
+    if choice == "local":
+        return LocalBroker()
+    if choice == "redis":
+        url = (
+            getattr(settings, "JOB_EVENTS_REDIS_URL", "") or settings.CELERY_BROKER_URL
+        )
+        return RedisBroker(url)
+    return import_string(choice)()
+
+
+def _reset_broker(*, setting: str, **kwargs: Any) -> None:
+    if setting.startswith("JOB_EVENTS_"):
+        get_broker.cache_clear()
+
+
+setting_changed.connect(_reset_broker)
+
+
+def publish_job(job: Any) -> None:
+    """
+    Publish ``job``'s progress on its owner's channel once the save commits.
+
+    The event is captured now so later in-memory edits do not leak into it.
+    Publishing is best-effort: a broker outage must not fail the write.
+    """
+    channel, event = channel_for(job.owner_id), job_event(job)
+
+    def send() -> None:
+        try:
+            get_broker().publish(channel, event)
+        except Exception:
+            logger.warning("Could not publish job event on %s", channel, exc_info=True)
+
+    transaction.on_commit(send)
+
+
+def job_saved(sender: Any, instance: Any, **kwargs: Any) -> None:
+    """``post_save`` receiver for ``AIJob``."""
+    publish_job(instance)
+
+
+async def subscribe_owner(owner_id: Any) -> Subscription:
+    return await get_broker().subscribe(channel_for(owner_id))
@@ -0,0 +1,189 @@
+"""
+Housekeeping for job-related tables.
+
+``IdempotencyKey`` rows stop being useful once ``expires_at`` passes (replays
+are refused and the key can be reserved again), but nothing removed them, so
+the table and its unique ``key`` index grew with every keyed POST.
+``purge_expired_idempotency_keys`` (beat task ``jobs.purge_idempotency_keys``)
+deletes them in small batches walked along the ``expires_at`` index, each
+batch its own short transaction, so a large backlog never holds locks or
+bloats one giant DELETE.
+
+``reap_expired_leases`` recovers ``running`` jobs whose worker stopped
+heartbeating (crashed, OOM-killed, network split), walking the
+``(status, lease_expires_at)`` index the same way.
+
+``aijob_queue_depth`` feeds the ``aijob_queue_depth`` gauge in ``core.metrics``.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import Count, F
+from django.utils import timezone
+
+from . import batches, engine, events, scheduler
+from .models import AIJob, IdempotencyKey
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class TableStats:
+    rows: int
+    expired: int
+    # On-disk size including indexes; ``None`` where the backend cannot tell
+    size_bytes: int | None
+
+
+@dataclass(frozen=True)
+class PurgeResult:
+    deleted: int
+    batches: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.deleted / self.seconds if self.seconds else 0.0
+
+
+def _table_size(table: str) -> int | None:
+    if connection.vendor == "postgresql":
+        sql = "SELECT pg_total_relation_size(%s)"
+    elif connection.vendor == "sqlite":
+        # Needs SQLite built with the dbstat virtual table
+        sql = "SELECT SUM(pgsize) FROM dbstat WHERE tbl_name = %s"
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    return int(row[0]) if row and row[0] is not None else None
+
+
+def idempotency_key_stats() -> TableStats:
+    keys = IdempotencyKey.objects.all()
+    return TableStats(
+        rows=keys.count(),
+        expired=keys.filter(expires_at__lte=timezone.now()).count(),
+        size_bytes=_table_size(IdempotencyKey._meta.db_table),
+    )
+
+
+def purge_expired_idempotency_keys(
+    batch_size: int = DEFAULT_BATCH_SIZE, max_batches: int | None = None
+) -> PurgeResult:
+    """
+    Delete keys that expired before the purge started, oldest first.
+
+    Expired ``processing`` rows are abandoned reservations and go as well.
+    Rows expiring while the purge runs are left for the next run.
+    """
+    cutoff = timezone.now()
+    expired = IdempotencyKey.objects.filter(expires_at__lte=cutoff).order_by(
+        "expires_at"
+    )
+    deleted = n_batches = 0
+    start = time.perf_counter()
+    while max_batches is None or n_batches < max_batches:
+        pks = list(expired.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            break
+        count, _ = IdempotencyKey.objects.filter(pk__in=pks).delete()
+        deleted += count
+        n_batches += 1
+        if len(pks) < batch_size:
+            break
+    return PurgeResult(
+        deleted=deleted, batches=n_batches, seconds=time.perf_counter() - start
+    )
+
+
+@dataclass(frozen=True)
+class ReapResult:
+    requeued: int
+    failed: int
+    batches: int
+
+
+def reap_expired_leases(
+    batch_size: int = DEFAULT_BATCH_SIZE, max_batches: int | None = None
+) -> ReapResult:
+    """
+    Requeue running jobs whose lease lapsed before the reap started, or fail
+    them once ``AIJOB_MAX_RETRIES`` is used up.
+
+    Each batch is two conditional UPDATEs that re-check the lease, so a
+    heartbeat landing in between keeps its job. Requeued jobs wait for the
+    dispatcher again with ``retry_count`` incremented.
+    """
+    cutoff = timezone.now()
+    max_retries = getattr(settings, "AIJOB_MAX_RETRIES", 3)
+    expired = AIJob.objects.filter(
+        status=AIJob.Status.RUNNING, lease_expires_at__lt=cutoff
+    )
+    requeued = failed = n_batches = 0
+    retried: list[tuple[object, str]] = []
+    while max_batches is None or n_batches < max_batches:
+        rows = list(
+            expired.order_by("lease_expires_at").values_list(
+                "pk", "kind", "retry_count"
+            )[:batch_size]
+        )
+        if not rows:
+            break
+        now = timezone.now()
+        retry = [pk for pk, _, count in rows if count < max_retries]
+        requeued += expired.filter(pk__in=retry).update(
+            status=AIJob.Status.PENDING,
+            retry_count=F("retry_count") + 1,
+            celery_task_id=None,
+            error_message="Worker lease expired",
+            updated_at=now,
+            **engine.RELEASED,
+        )
+        failed += expired.filter(
+            pk__in=[pk for pk, _, count in rows if count >= max_retries]
+        ).update(
+            status=AIJob.Status.FAILED,
+            error_message="Worker lease expired; retries exhausted",
+            completed_at=now,
+            updated_at=now,
+            **engine.RELEASED,
+        )
+        for job in AIJob.objects.filter(pk__in=[pk for pk, _, _ in rows]).exclude(
+            status=AIJob.Status.RUNNING
+        ):
+            events.publish_job(job)
+            if job.parent_id and job.status == AIJob.Status.FAILED:
+                batches.refresh(job.parent_id)
+        retried += [(pk, kind) for pk, kind, count in rows if count < max_retries]
+        n_batches += 1
+        if len(rows) < batch_size:
+            break
+
+    if scheduler.enabled():
+        for kind in sorted({kind for _, kind in retried}):
+            scheduler.dispatcher.pump(kind)
+    else:
+        for pk, kind in retried:
+            engine.dispatch(pk, kind)
+    return ReapResult(requeued=requeued, failed=failed, batches=n_batches)
+
+
+def aijob_queue_depth() -> list[tuple[tuple[str, str], int]]:
+    """``((kind, status), count)`` for jobs that have not finished yet."""
+    rows = (
+        AIJob.objects.filter(status__in=[AIJob.Status.PENDING, AIJob.Status.RUNNING])
+        .values_list("kind", "status")
+        .annotate(n=Count("id"))
+        .order_by("kind", "status")
+    )
+    return [((kind, status), n) for kind, status, n in rows]
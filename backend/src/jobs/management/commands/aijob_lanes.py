@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from jobs.engine import lane_for
+from jobs.models import AIJob
+
+
+class Command(BaseCommand):
+    help = "Print the AIJob lanes and the Celery worker command that serves each one"
+
+    def handle(self, *args, **options):
+        for kind in AIJob.RUNNABLE_KINDS:
+            lane = lane_for(kind)
+            self.stdout.write(
+                f"{kind:<8} priority={lane.priority}  "
+                f"celery -A core worker -Q {lane.queue} -c {lane.concurrency} -n {kind}@%h"
+            )
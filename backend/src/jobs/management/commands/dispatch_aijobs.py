@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from jobs import scheduler
+
+
+class Command(BaseCommand):
+    help = "Release waiting AIJobs into free lane slots and print per-owner queue stats"
+
+    def handle(self, *args, **options):
+        dispatched = scheduler.pump_all()
+        self.stdout.write(f"dispatched {dispatched} job(s)")
+        for row in scheduler.owner_stats():
+            self.stdout.write(
+                f"{row['kind']:<8} owner={row['owner']}  waiting={row['waiting']}  "
+                f"in_flight={row['in_flight']}  oldest_wait={row['oldest_wait_seconds']}s  "
+                f"p95_wait={row['p95_wait_seconds']}s"
+            )
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from jobs.maintenance import (
+    DEFAULT_BATCH_SIZE,
+    TableStats,
+    idempotency_key_stats,
+    purge_expired_idempotency_keys,
+)
+
+
+def _describe(stats: TableStats) -> str:
+    size = (
+        f"{stats.size_bytes / 1024:.0f} KiB"
+        if stats.size_bytes is not None
+        else "size unknown"
+    )
+    return f"{stats.rows} rows ({stats.expired} expired), {size}"
+
+
+class Command(BaseCommand):
+    help = "Delete expired idempotency keys in batches. Run periodically (e.g. every few minutes)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=None,
+            help="Stop after this many batches; the rest is purged on the next run",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"before: {_describe(idempotency_key_stats())}")
+        result = purge_expired_idempotency_keys(
+            options["batch_size"], options["max_batches"]
+        )
+        self.stdout.write(
+            f"purged {result.deleted} rows in {result.batches} batches, "
+            f"{result.seconds:.2f}s ({result.rows_per_second:.0f} rows/s)"
+        )
+        self.stdout.write(f"after: {_describe(idempotency_key_stats())}")
+        self.stdout.write(self.style.SUCCESS("Done"))
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from jobs.maintenance import DEFAULT_BATCH_SIZE, reap_expired_leases
+
+
+class Command(BaseCommand):
+    help = "Requeue or fail running AIJobs whose worker lease expired"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--max-batches", type=int, default=None)
+
+    def handle(self, *args, **options):
+        result = reap_expired_leases(options["batch_size"], options["max_batches"])
+        self.stdout.write(
+            f"requeued {result.requeued}, failed {result.failed} in {result.batches} batches"
+        )
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs import engine
+from jobs.models import AIJob
+
+
+class Command(BaseCommand):
+    help = "Pull AIJobs straight from the database and run them (an alternative to Celery workers)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kinds",
+            default=",".join(AIJob.RUNNABLE_KINDS),
+            help="Comma-separated job kinds to serve",
+        )
+        parser.add_argument("--poll-seconds", type=float, default=1.0)
+        parser.add_argument(
+            "--once", action="store_true", help="Exit when no job is claimable"
+        )
+
+    def handle(self, *args, **options):
+        kinds = [kind.strip() for kind in options["kinds"].split(",") if kind.strip()]
+        while True:
+            ran = engine.run_next(kinds)
+            if ran is not None:
+                job_id, status = ran
+                self.stdout.write(f"{job_id} {status}")
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["poll_seconds"])
@@ -0,0 +1,416 @@
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def drop_legacy_rows(apps, schema_editor):
+    """
+    0001 rows have integer ids and no owner or course, so they cannot be
+    carried over to the UUID schema below; nothing reads them any more.
+    """
+    apps.get_model("jobs", "ExportArtifact")._default_manager.all().delete()
+    apps.get_model("jobs", "AIJob")._default_manager.all().delete()
+
+
+# 0001 predates the UUID models; this brings the history up to them
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("courses", "0002_catch_up_with_models"),
+        ("jobs", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_legacy_rows, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name="IdempotencyKey",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("key", models.CharField(max_length=255, unique=True)),
+                ("request_hash", models.CharField(max_length=64)),
+                (
+                    "state",
+                    models.CharField(
+                        choices=[
+                            ("processing", "Processing"),
+                            ("completed", "Completed"),
+                        ],
+                        default="completed",
+                        max_length=20,
+                    ),
+                ),
+                ("response_data", models.JSONField(default=dict)),
+                ("response_status", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "expires_at",
+                    models.DateTimeField(
+                        help_text="When this key expires; for processing rows, when the reservation goes stale"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AlterModelOptions(
+            name="aijob",
+            options={"ordering": ["-created_at"]},
+        ),
+        migrations.AlterModelOptions(
+            name="exportartifact",
+            options={"ordering": ["-created_at"]},
+        ),
+        migrations.RemoveField(
+            model_name="aijob",
+            name="input_ref",
+        ),
+        migrations.RemoveField(
+            model_name="aijob",
+            name="output_ref",
+        ),
+        migrations.RemoveField(
+            model_name="exportartifact",
+            name="course_id",
+        ),
+        migrations.RemoveField(
+            model_name="exportartifact",
+            name="path_s3",
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="celery_task_id",
+            field=models.CharField(blank=True, max_length=36, null=True),
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="completed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="error_message",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="heartbeat_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="input_content_type",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="ai_jobs_as_input",
+                to="contenttypes.contenttype",
+            ),
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="input_data",
+            field=models.JSONField(
+                default=dict, help_text="Input parameters for the job"
+            ),
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="input_object_id",
+            field=models.CharField(blank=True, max_length=36, null=True),
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="lease_expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="lease_owner",
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="output_content_type",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="ai_jobs_as_output",
+                to="contenttypes.contenttype",
+            ),
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="output_data",
+            field=models.JSONField(default=dict, help_text="Output data from the job"),
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="output_object_id",
+            field=models.CharField(blank=True, max_length=36, null=True),
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="owner",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="ai_jobs",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="parent",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="children",
+                to="jobs.aijob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="progress_message",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="progress_percentage",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="retry_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="token_usage",
+            field=models.JSONField(default=dict, help_text="Token usage breakdown"),
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="aijob",
+            name="use_result_cache",
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name="exportartifact",
+            name="course",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="export_artifacts",
+                to="courses.course",
+            ),
+        ),
+        migrations.AddField(
+            model_name="exportartifact",
+            name="download_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="exportartifact",
+            name="expires_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When this artifact expires and should be deleted",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="exportartifact",
+            name="export_settings",
+            field=models.JSONField(
+                default=dict, help_text="Settings used for this export"
+            ),
+        ),
+        migrations.AddField(
+            model_name="exportartifact",
+            name="file_path",
+            field=models.CharField(
+                default="", help_text="S3 path to the export file", max_length=500
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="exportartifact",
+            name="file_size_bytes",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="exportartifact",
+            name="job",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="artifacts",
+                to="jobs.aijob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="exportartifact",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name="aijob",
+            name="cost_cents",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Cost in cents for this job"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="aijob",
+            name="id",
+            field=models.UUIDField(
+                default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+            ),
+        ),
+        migrations.AlterField(
+            model_name="aijob",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("outline", "Course Outline"),
+                    ("lesson", "Lesson Generation"),
+                    ("quiz", "Quiz Generation"),
+                    ("lecture", "Lecture Materials"),
+                    ("export", "Content Export"),
+                    ("batch", "Job Batch"),
+                ],
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="aijob",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("running", "Running"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                    ("cancelled", "Cancelled"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="exportartifact",
+            name="checksum",
+            field=models.CharField(help_text="SHA256 checksum", max_length=64),
+        ),
+        migrations.AlterField(
+            model_name="exportartifact",
+            name="id",
+            field=models.UUIDField(
+                default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+            ),
+        ),
+        migrations.AlterField(
+            model_name="exportartifact",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("olx", "Open edX (OLX)"),
+                    ("scorm", "SCORM 1.2"),
+                    ("qti", "QTI 2.1"),
+                    ("udemy", "Udemy Bundle"),
+                    ("teachable", "Teachable Bundle"),
+                ],
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="aijob",
+            index=models.Index(
+                fields=["owner", "status"], name="jobs_aijob_owner_i_4bb526_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="aijob",
+            index=models.Index(
+                fields=["kind", "status"], name="jobs_aijob_kind_8c3ada_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="aijob",
+            index=models.Index(
+                fields=["celery_task_id"], name="jobs_aijob_celery__bf4ec5_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="aijob",
+            index=models.Index(
+                fields=["created_at"], name="jobs_aijob_created_778a59_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="aijob",
+            index=models.Index(
+                fields=["status", "lease_expires_at"],
+                name="jobs_aijob_status_313cb9_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="exportartifact",
+            index=models.Index(
+                fields=["course", "kind"], name="jobs_export_course__cf4516_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="exportartifact",
+            index=models.Index(
+                fields=["created_at"], name="jobs_export_created_c612b1_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="exportartifact",
+            index=models.Index(
+                fields=["expires_at"], name="jobs_export_expires_0c64d8_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="idempotencykey",
+            name="job",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="idempotency_keys",
+                to="jobs.aijob",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="idempotencykey",
+            index=models.Index(fields=["key"], name="jobs_idempo_key_2d8254_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="idempotencykey",
+            index=models.Index(
+                fields=["expires_at"], name="jobs_idempo_expires_92c40b_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+import json
+
+from django.db import migrations, models
+
+
+def encode_responses(apps, schema_editor):
+    """Keep stored replays: the JSON body becomes the bytes that are replayed."""
+    IdempotencyKey = apps.get_model("jobs", "IdempotencyKey")
+    for key in IdempotencyKey.objects.exclude(state="processing").iterator():
+        key.response_body = json.dumps(key.response_data).encode()
+        key.response_content_type = "application/json"
+        key.save(update_fields=["response_body", "response_content_type"])
+
+
+def decode_responses(apps, schema_editor):
+    IdempotencyKey = apps.get_model("jobs", "IdempotencyKey")
+    for key in IdempotencyKey.objects.exclude(response_body=b"").iterator():
+        try:
+            key.response_data = json.loads(bytes(key.response_body))
+        except ValueError:
+            key.response_data = {}
+        key.save(update_fields=["response_data"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("jobs", "0002_catch_up_with_models"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="idempotencykey",
+            name="response_body",
+            field=models.BinaryField(default=b""),
+        ),
+        migrations.AddField(
+            model_name="idempotencykey",
+            name="response_content_type",
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.RunPython(encode_responses, decode_responses),
+        migrations.RemoveField(
+            model_name="idempotencykey",
+            name="response_data",
+        ),
+    ]
@@ -21,6 +21,8 @@ class AIJob(models.Model):
         QUIZ = "quiz", "Quiz Generation"
         LECTURE = "lecture", "Lecture Materials"
         EXPORT = "export", "Content Export"
+        # Parent of jobs submitted together (see jobs.batches); never run itself
+        BATCH = "batch", "Job Batch"
 
     class Status(models.TextChoices):
         PENDING = "pending", "Pending"
@@ -29,6 +31,9 @@ class AIJob(models.Model):
         FAILED = "failed", "Failed"
         CANCELLED = "cancelled", "Cancelled"
 
+    RUNNABLE_KINDS = tuple(kind for kind in JobKind.values if kind != "batch")
+    TERMINAL_STATUSES = (Status.COMPLETED, Status.FAILED, Status.CANCELLED)
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
     # Job metadata
@@ -39,6 +44,9 @@ class AIJob(models.Model):
 
     # User and ownership
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="ai_jobs")
+    parent = models.ForeignKey(
+        "self", on_delete=models.CASCADE, related_name="children", null=True, blank=True
+    )
 
     # Input reference (generic foreign key to any model)
     input_content_type = models.ForeignKey(
@@ -67,6 +75,9 @@ class AIJob(models.Model):
     output_object_id = models.CharField(max_length=36, null=True, blank=True)
     output_object = GenericForeignKey("output_content_type", "output_object_id")
 
+    # Off: skip the exact-match result cache lookup (see ai.result_cache)
+    use_result_cache = models.BooleanField(default=True)
+
     # Output data (for results that don't map to models)
     output_data = models.JSONField(default=dict, help_text="Output data from the job")
 
@@ -75,6 +86,14 @@ class AIJob(models.Model):
     started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
 
+    # Lease held by the worker running the job (see jobs.engine). While
+    # running, a heartbeat pushes lease_expires_at forward; once it lapses
+    # the reaper requeues or fails the job. On a pending retry it is the
+    # earliest time the job may be claimed again.
+    lease_owner = models.CharField(max_length=100, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
     # Error tracking
     error_message = models.TextField(blank=True)
     retry_count = models.PositiveIntegerField(default=0)
@@ -100,6 +119,7 @@ class AIJob(models.Model):
             models.Index(fields=["kind", "status"]),
             models.Index(fields=["celery_task_id"]),
             models.Index(fields=["created_at"]),
+            models.Index(fields=["status", "lease_expires_at"]),
         ]
 
     def __str__(self):
@@ -115,11 +135,7 @@ class AIJob(models.Model):
     @property
     def is_finished(self):
         """Check if job is in a terminal state."""
-        return self.status in [
-            self.Status.COMPLETED,
-            self.Status.FAILED,
-            self.Status.CANCELLED,
-        ]
+        return self.status in self.TERMINAL_STATUSES
 
 
 class ExportArtifact(models.Model):
@@ -193,15 +209,27 @@ class ExportArtifact(models.Model):
 class IdempotencyKey(models.Model):
     """
     Store idempotency keys to prevent duplicate job creation.
+
+    A row is inserted in the ``processing`` state before the request runs
+    (the unique ``key`` makes that the cross-process reservation) and flipped
+    to ``completed`` with the response once it succeeds.
     """
 
+    class State(models.TextChoices):
+        PROCESSING = "processing", "Processing"
+        COMPLETED = "completed", "Completed"
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     key = models.CharField(max_length=255, unique=True)
     request_hash = models.CharField(max_length=64)
+    state = models.CharField(
+        max_length=20, choices=State.choices, default=State.COMPLETED
+    )
 
-    # Response data
-    response_data = models.JSONField()
-    response_status = models.PositiveIntegerField()
+    # Response replayed verbatim (empty while processing)
+    response_body = models.BinaryField(default=b"")
+    response_content_type = models.CharField(max_length=100, blank=True)
+    response_status = models.PositiveIntegerField(default=0)
 
     # Reference to created job
     job = models.ForeignKey(
@@ -214,7 +242,9 @@ class IdempotencyKey(models.Model):
 
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
-    expires_at = models.DateTimeField(help_text="When this key expires")
+    expires_at = models.DateTimeField(
+        help_text="When this key expires; for processing rows, when the reservation goes stale"
+    )
 
     class Meta:
         indexes = [
@@ -0,0 +1,114 @@
+"""
+Coalesced progress reporting for running AIJobs.
+
+Handlers of long jobs may report progress many times a second. Writing each
+report is a row UPDATE on a hot table (plus its indexes and a broker event),
+so ``ProgressReporter`` keeps the latest value in the cache, where live
+readers (``GET jobs/<id>/status/``) pick it up at once, and writes it to the
+row only when ``AIJOB_PROGRESS_FLUSH_MS`` has passed since the last write,
+the percentage moved by at least ``AIJOB_PROGRESS_FLUSH_STEP`` points, or the
+job reached 100%. Row writes are ``save(update_fields=...)`` on the two
+progress columns, so ``updated_at`` and the other columns are left alone and
+the ``post_save`` event carries the new value to subscribers.
+
+    def run_lessons(job):
+        with ProgressReporter(job) as progress:
+            for i, lesson in enumerate(lessons, 1):
+                ...
+                progress.update(100 * i // len(lessons), f"Lesson {i}")
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import AIJob
+
+PROGRESS_FIELDS = ["progress_percentage", "progress_message"]
+# Long enough to outlive a job between flushes; readers fall back to the row
+LIVE_TIMEOUT = 3600
+
+
+def _key(job_id: Any) -> str:
+    return f"aijob:progress:{job_id}"
+
+
+def live(job_id: Any) -> dict[str, Any] | None:
+    """Latest reported progress of a job, or ``None`` if nothing is cached."""
+    return cache.get(_key(job_id))
+
+
+async def alive(job_id: Any) -> dict[str, Any] | None:
+    return await cache.aget(_key(job_id))
+
+
+class ProgressReporter:
+    def __init__(
+        self,
+        job: AIJob,
+        *,
+        flush_ms: float | None = None,
+        flush_step: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.job = job
+        self.flush_seconds = (
+            flush_ms
+            if flush_ms is not None
+            else getattr(settings, "AIJOB_PROGRESS_FLUSH_MS", 1000)
+        ) / 1000
+        self.flush_step = (
+            flush_step
+            if flush_step is not None
+            else getattr(settings, "AIJOB_PROGRESS_FLUSH_STEP", 10)
+        )
+        self.clock = clock
+        self.writes = 0
+        self._flushed = (job.progress_percentage, job.progress_message)
+        self._flushed_at = clock()
+        self._pending = False
+
+    def update(self, percentage: int, message: str | None = None) -> bool:
+        """Record progress; returns whether it was written to the row."""
+        percentage = max(0, min(100, int(percentage)))
+        if message is None:
+            message = self.job.progress_message
+        message = message[: AIJob._meta.get_field("progress_message").max_length]
+        self.job.progress_percentage, self.job.progress_message = percentage, message
+        cache.set(
+            _key(self.job.pk),
+            {"progress_percentage": percentage, "progress_message": message},
+            LIVE_TIMEOUT,
+        )
+        self._pending = (percentage, message) != self._flushed
+        if not self._pending:
+            return False
+        if (
+            percentage == 100
+            or abs(percentage - self._flushed[0]) >= self.flush_step
+            or self.clock() - self._flushed_at >= self.flush_seconds
+        ):
+            return self.flush()
+        return False
+
+    def flush(self) -> bool:
+        """Write buffered progress to the row, if any."""
+        if not self._pending:
+            return False
+        self.job.save(update_fields=PROGRESS_FIELDS)
+        self.writes += 1
+        self._flushed = (self.job.progress_percentage, self.job.progress_message)
+        self._flushed_at = self.clock()
+        self._pending = False
+        return True
+
+    def __enter__(self) -> ProgressReporter:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.flush()
@@ -0,0 +1,217 @@
+"""
+Fair-share dispatch of AIJobs across owners.
+
+With ``AIJOB_FAIR_SCHEDULING`` on, a new job is not sent to Celery at once.
+It waits in the database (``pending`` with no ``celery_task_id``) until the
+dispatcher releases it. Each lane keeps at most ``capacity`` jobs in flight
+(dispatched or running; default: the lane's worker concurrency), so the
+Celery queue stays short and the order of work is decided here, not by FIFO.
+
+Free slots go to owners by deficit round robin. Every round, each owner with
+waiting jobs earns its weight (``AIJOB_OWNER_WEIGHTS``, default 1) in credit,
+and each dispatched job costs one. Owners served least recently go first.
+``AIJOB_OWNER_MAX_INFLIGHT`` optionally caps one owner's in-flight jobs per
+lane. A tenant with 2,000 queued jobs therefore gets its share of the slots,
+and a user with one job waits at most about one round.
+
+The dispatcher runs on commit after a job is created, after a job finishes
+(a slot freed), and periodically via the ``dispatch_aijobs`` task or command
+as a safety net. Dispatch claims each job with a conditional UPDATE, so
+concurrent dispatchers cannot send a job twice. Deficits and rotation are
+per process and only steer fairness.
+"""
+
+from __future__ import annotations
+
+import statistics
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from .models import AIJob
+
+WAITING = Q(status=AIJob.Status.PENDING, celery_task_id__isnull=True)
+# Parked jobs (running without a lease, waiting on a batch) hold no worker
+IN_FLIGHT = (Q(status=AIJob.Status.RUNNING) & ~Q(lease_owner="")) | Q(
+    status=AIJob.Status.PENDING, celery_task_id__isnull=False
+)
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "AIJOB_FAIR_SCHEDULING", True))
+
+
+def owner_weight(owner_id: Any) -> float:
+    weights = getattr(settings, "AIJOB_OWNER_WEIGHTS", {})
+    return float(weights.get(owner_id, weights.get(str(owner_id), 1)))
+
+
+def lane_capacity(kind: str) -> int:
+    from .engine import lane_for
+
+    config = getattr(settings, "AIJOB_LANES", {}).get(kind, {})
+    return int(config.get("capacity", lane_for(kind).concurrency))
+
+
+class FairDispatcher:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._deficit: dict[tuple[str, Any], float] = defaultdict(float)
+        self._last_served: dict[tuple[str, Any], float] = {}
+        self._local = threading.local()
+
+    def pump(self, kind: str) -> int:
+        """Dispatch waiting ``kind`` jobs while the lane has free slots; returns the count."""
+        # Eager mode runs jobs inside dispatch, and their completion pumps
+        # again; the outer loop picks up the freed slots instead.
+        if getattr(self._local, "active", False):
+            return 0
+        self._local.active = True
+        try:
+            total = 0
+            while dispatched := self._round(kind):
+                total += dispatched
+            return total
+        finally:
+            self._local.active = False
+
+    def _round(self, kind: str) -> int:
+        from .engine import dispatch
+
+        jobs = AIJob.objects.filter(kind=kind)
+        free = lane_capacity(kind) - jobs.filter(IN_FLIGHT).count()
+        if free <= 0:
+            return 0
+        waiting = {
+            row["owner_id"]: row["oldest"]
+            for row in jobs.filter(WAITING)
+            .values("owner_id")
+            .annotate(oldest=Min("created_at"))
+        }
+        if not waiting:
+            return 0
+        cap = int(getattr(settings, "AIJOB_OWNER_MAX_INFLIGHT", 0))
+        in_flight = dict(
+            jobs.filter(IN_FLIGHT, owner_id__in=list(waiting))
+            .values_list("owner_id")
+            .annotate(n=Count("id"))
+            .values_list("owner_id", "n")
+        )
+
+        with self._lock:
+            # Least recently served first; never-served owners by oldest job
+            order = sorted(
+                waiting,
+                key=lambda owner: (
+                    self._last_served.get((kind, owner), 0.0),
+                    waiting[owner],
+                ),
+            )
+            for owner in list(self._deficit):
+                if owner[0] == kind and owner[1] not in waiting:
+                    del self._deficit[owner]
+
+        # Quantum relative to the lightest waiting owner, so every round
+        # releases at least one job even with fractional weights
+        unit = min(owner_weight(owner) for owner in waiting)
+        dispatched = 0
+        for owner in order:
+            if free <= 0:
+                break
+            if cap and in_flight.get(owner, 0) >= cap:
+                continue
+            key = (kind, owner)
+            with self._lock:
+                self._deficit[key] += owner_weight(owner) / unit
+            while (
+                free > 0
+                and self._deficit[key] >= 1
+                and not (cap and in_flight.get(owner, 0) >= cap)
+            ):
+                job_id = (
+                    jobs.filter(WAITING, owner_id=owner)
+                    .order_by("created_at")
+                    .values_list("pk", flat=True)
+                    .first()
+                )
+                if job_id is None:
+                    break
+                with self._lock:
+                    self._deficit[key] -= 1
+                    self._last_served[key] = time.monotonic()
+                if dispatch(job_id, kind):
+                    dispatched += 1
+                    free -= 1
+                    in_flight[owner] = in_flight.get(owner, 0) + 1
+        return dispatched
+
+    def reset(self) -> None:
+        with self._lock:
+            self._deficit.clear()
+            self._last_served.clear()
+
+
+dispatcher = FairDispatcher()
+
+
+def pump_all() -> int:
+    return sum(dispatcher.pump(kind) for kind in AIJob.RUNNABLE_KINDS)
+
+
+def owner_stats(window: timedelta = timedelta(hours=1)) -> list[dict[str, Any]]:
+    """
+    Per owner and kind: waiting jobs, in-flight jobs, age of the oldest
+    waiting job, and the p95 creation-to-start wait of jobs started within
+    ``window``.
+    """
+    now = timezone.now()
+    stats: dict[tuple[Any, str], dict[str, Any]] = {}
+
+    def entry(owner_id: Any, kind: str) -> dict[str, Any]:
+        return stats.setdefault(
+            (owner_id, kind),
+            {
+                "owner": owner_id,
+                "kind": kind,
+                "waiting": 0,
+                "in_flight": 0,
+                "oldest_wait_seconds": None,
+                "p95_wait_seconds": None,
+            },
+        )
+
+    for row in (
+        AIJob.objects.filter(WAITING)
+        .values("owner_id", "kind")
+        .annotate(n=Count("id"), oldest=Min("created_at"))
+    ):
+        item = entry(row["owner_id"], row["kind"])
+        item["waiting"] = row["n"]
+        item["oldest_wait_seconds"] = round((now - row["oldest"]).total_seconds(), 3)
+    for owner_id, kind, n in (
+        AIJob.objects.filter(IN_FLIGHT)
+        .values_list("owner_id", "kind")
+        .annotate(n=Count("id"))
+        .values_list("owner_id", "kind", "n")
+    ):
+        entry(owner_id, kind)["in_flight"] = n
+
+    waits: dict[tuple[Any, str], list[float]] = defaultdict(list)
+    for owner_id, kind, created, started in AIJob.objects.filter(
+        started_at__gte=now - window
+    ).values_list("owner_id", "kind", "created_at", "started_at"):
+        waits[(owner_id, kind)].append((started - created).total_seconds())
+    for key, values in waits.items():
+        p95 = statistics.quantiles(values, n=20)[-1] if len(values) > 1 else values[0]
+        entry(*key)["p95_wait_seconds"] = round(p95, 3)
+
+    return sorted(
+        stats.values(),
+        key=lambda item: (item["kind"], -item["waiting"], str(item["owner"])),
+    )
@@ -0,0 +1,25 @@
+"""
+Celery tasks for the jobs app (discovered by ``core.celery``).
+"""
+
+from core.celery import app
+
+from . import engine, maintenance, scheduler
+
+if app is not None:
+
+    @app.task(name=engine.TASK_NAME, ignore_result=True)
+    def run_aijob(job_id: str) -> None:
+        engine.execute(job_id)
+
+    @app.task(name="jobs.dispatch_aijobs", ignore_result=True)
+    def dispatch_aijobs() -> int:
+        return scheduler.pump_all()
+
+    @app.task(name="jobs.reap_aijob_leases", ignore_result=True)
+    def reap_aijob_leases() -> None:
+        maintenance.reap_expired_leases()
+
+    @app.task(name="jobs.purge_idempotency_keys", ignore_result=True)
+    def purge_idempotency_keys() -> None:
+        maintenance.purge_expired_idempotency_keys()
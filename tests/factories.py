@@ -25,5 +25,5 @@ class LessonFactory(factory.django.DjangoModelFactory):
 
     module = factory.SubFactory(ModuleFactory)
     title = factory.Faker("sentence", nb_words=4)
-    markdown = "# Intro"
+    content = "# Intro"
 
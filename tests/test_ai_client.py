@@ -0,0 +1,243 @@
+import io
+import json
+import threading
+import time
+
+import pytest
+from ai import client as ai_client
+from ai.bedrock import BedrockBackend, client_error, parse_events, request_body
+from ai.client import Chunk, ModelClient, ModelError, ModelRequest, ThrottledError, TokenBucket
+from ai.fake import FakeBackend
+from django.core.management import call_command
+from jobs.models import AIJob
+
+
+def test_complete_streams_text_and_usage():
+    seen = []
+    client = ModelClient(FakeBackend(reply="The cell is the unit of life.", chunk_chars=8))
+    completion = client.complete(ModelRequest("Explain cells"), on_text=seen.append)
+    assert completion.text == "The cell is the unit of life."
+    assert seen[0] == "The cell" and seen[-1] == completion.text and len(seen) == 4
+    assert completion.usage.output_tokens > 0
+    assert completion.model_id == "test-model"
+    assert completion.stop_reason == "end_turn"
+
+
+def test_throttling_is_retried_until_the_budget_runs_out():
+    backend = FakeBackend(throttle_first=2)
+    assert ModelClient(backend, max_retries=2, retry_base=0).complete(ModelRequest("x")).text
+    assert backend.calls == 3
+
+    with pytest.raises(ThrottledError):
+        ModelClient(FakeBackend(throttle_first=5), max_retries=1, retry_base=0).complete(
+            ModelRequest("x")
+        )
+
+
+def test_no_retry_once_text_was_delivered():
+    class Flaky:
+        name = "flaky"
+        calls = 0
+
+        def stream(self, request, model_id):
+            self.calls += 1
+            yield Chunk(text="partial")
+            raise ThrottledError("mid-stream")
+
+    backend, parts = Flaky(), []
+    with pytest.raises(ThrottledError):
+        ModelClient(backend, retry_base=0).complete(ModelRequest("x"), on_text=parts.append)
+    assert backend.calls == 1 and parts == ["partial"]
+
+
+def test_concurrency_is_capped_by_the_semaphore():
+    active, peak, lock = [0], [0], threading.Lock()
+
+    class Slow:
+        name = "slow"
+
+        def stream(self, request, model_id):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            yield Chunk(text="ok")
+
+    client = ModelClient(Slow(), max_concurrency=2)
+    threads = [
+        threading.Thread(target=client.complete, args=(ModelRequest("x"),)) for _ in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+
+
+def test_token_bucket_refills_at_its_rate():
+    now = [0.0]
+    bucket = TokenBucket(rate=1.0, capacity=2, clock=lambda: now[0])
+    assert bucket.acquire() and bucket.acquire()
+    assert not bucket.acquire(timeout=0.5)
+    now[0] = 1.0
+    assert bucket.acquire(timeout=0)
+    # Oversized requests wait for a full bucket rather than forever
+    now[0] = 3.0
+    assert bucket.acquire(10, timeout=0)
+
+
+def test_process_client_follows_settings(settings):
+    settings.AI_FAKE_BACKEND = {"reply": "configured"}
+    first = ai_client.get_client()
+    assert first is ai_client.get_client()
+    assert isinstance(first.backend, FakeBackend)
+    assert first.complete(ModelRequest("x")).text == "configured"
+    settings.AI_MAX_CONCURRENCY = 3
+    assert ai_client.get_client() is not first
+    assert ai_client.get_client().max_concurrency == 3
+
+
+def _event(payload):
+    return {"chunk": {"bytes": json.dumps(payload).encode()}}
+
+
+def test_bedrock_stream_events_are_parsed():
+    events = [
+        _event({"type": "message_start", "message": {"usage": {"input_tokens": 12}}}),
+        _event({"type": "content_block_delta", "delta": {"type": "text_delta", "text": "Hel"}}),
+        _event({"type": "content_block_delta", "delta": {"type": "text_delta", "text": "lo"}}),
+        _event(
+            {
+                "type": "message_delta",
+                "delta": {"stop_reason": "end_turn"},
+                "usage": {"output_tokens": 2},
+            }
+        ),
+    ]
+    chunks = list(parse_events(events))
+    assert "".join(c.text for c in chunks) == "Hello"
+    assert (chunks[-1].usage.input_tokens, chunks[-1].usage.output_tokens) == (12, 2)
+    assert chunks[-1].stop_reason == "end_turn"
+
+    with pytest.raises(ThrottledError):
+        list(parse_events([{"throttlingException": {"message": "slow down"}}]))
+    body = request_body(ModelRequest("Hi", system="Be brief", max_tokens=10))
+    assert body["system"] == "Be brief" and body["messages"] == [{"role": "user", "content": "Hi"}]
+
+
+def test_bedrock_error_codes_match_either_spelling():
+    assert type(client_error("ThrottlingException", "")) is ThrottledError
+    assert type(client_error("throttlingException", "")) is ThrottledError
+    assert type(client_error("modelStreamErrorException", "")) is ModelError
+
+
+def test_bedrock_mid_stream_throttling_is_retried():
+    pytest.importorskip("boto3")
+    exceptions = pytest.importorskip("botocore.exceptions")
+
+    class Runtime:
+        calls = 0
+
+        def invoke_model_with_response_stream(self, **kwargs):
+            self.calls += 1
+            return {"body": self.events()}
+
+        def events(self):
+            # botocore raises exception events while the body is iterated
+            if self.calls == 1:
+                error = {"Error": {"Code": "throttlingException", "Message": "Too many tokens"}}
+                raise exceptions.EventStreamError(error, "InvokeModelWithResponseStream")
+            yield _event({"type": "content_block_delta", "delta": {"text": "Hi"}})
+
+    backend = BedrockBackend.__new__(BedrockBackend)
+    backend.client = Runtime()
+    assert ModelClient(backend, retry_base=0).complete(ModelRequest("x")).text == "Hi"
+    assert backend.client.calls == 2
+
+
+def _fake_reply(backend, prompt="Explain photosynthesis", **metadata):
+    return ModelClient(backend).complete(ModelRequest(prompt, metadata=metadata)).text
+
+
+def test_fake_replies_are_deterministic_and_seeded():
+    lesson = _fake_reply(FakeBackend(), kind="lesson", topic="Photosynthesis")
+    assert lesson == _fake_reply(FakeBackend(), kind="lesson", topic="Photosynthesis")
+    assert lesson != _fake_reply(FakeBackend(seed=7), kind="lesson", topic="Photosynthesis")
+    assert lesson != _fake_reply(
+        FakeBackend(), "Explain respiration", kind="lesson", topic="Photosynthesis"
+    )
+    body = json.loads(lesson)
+    assert body["title"].startswith("Photosynthesis: ") and body["content"].startswith("## ")
+
+
+def test_fake_payload_shapes_follow_metadata():
+    outline = json.loads(
+        _fake_reply(FakeBackend(), kind="outline", modules=3, lessons_per_module=4)
+    )
+    assert [len(m["lessons"]) for m in outline["modules"]] == [4, 4, 4]
+    quiz = json.loads(_fake_reply(FakeBackend(), kind="quiz", questions=2))
+    assert len(quiz["questions"]) == 2
+    assert all(0 <= q["answer"] < len(q["choices"]) == 4 for q in quiz["questions"])
+
+    short = _fake_reply(FakeBackend(output_tokens={"text": 20}))
+    long = _fake_reply(FakeBackend(output_tokens={"dist": "uniform", "low": 900, "high": 1000}))
+    assert len(short) * 10 < len(long)
+
+
+def test_fake_latency_cadence_and_throttling():
+    sleeps = []
+    backend = FakeBackend(
+        latency={"dist": "lognormal", "median": 0.5, "sigma": 0.2},
+        chunk_delay={"dist": "fixed", "value": 0.01},
+        chunk_chars=100,
+        sleep=sleeps.append,
+    )
+    text = _fake_reply(backend, kind="text")
+    assert 0.2 < sleeps[0] < 1.5
+    assert sleeps[1:] == [0.01] * (-(-len(text) // 100) - 1)
+
+    with pytest.raises(ThrottledError):
+        ModelClient(FakeBackend(throttle_rate=1.0), max_retries=2, retry_base=0).complete(
+            ModelRequest("x")
+        )
+
+    def pattern():
+        backend = FakeBackend(throttle_rate=0.5, seed=3)
+        outcomes = []
+        for _ in range(20):
+            try:
+                list(backend.stream(ModelRequest("x"), "m"))
+                outcomes.append(True)
+            except ThrottledError:
+                outcomes.append(False)
+        return outcomes
+
+    assert pattern() == pattern() and 0 < sum(pattern()) < 20
+
+
+def test_bench_model_client_command():
+    out = io.StringIO()
+    call_command(
+        "bench_model_client", requests=20, latency=0, chunk_delay=0, kind="quiz", stdout=out
+    )
+    assert out.getvalue().startswith("20 requests in ")
+    assert "0 throttled" in out.getvalue()
+
+
+def test_bench_model_client_jobs_mode(transactional_db):
+    out = io.StringIO()
+    call_command(
+        "bench_model_client",
+        jobs=2,
+        threads=1,
+        latency=0,
+        chunk_delay=0,
+        lessons_per_module=2,
+        stdout=out,
+    )
+    # Each outline fans out 2 x 2 lessons
+    assert out.getvalue().startswith("10 jobs (2 outlines) in ")
+    assert "0 not completed" in out.getvalue()
+    assert not AIJob.objects.exists()
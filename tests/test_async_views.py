@@ -0,0 +1,88 @@
+import io
+import json
+
+import pytest
+from api import async_views
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import AsyncClient, AsyncRequestFactory
+from jobs.models import AIJob, ExportArtifact
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .factories import CourseFactory, LessonFactory, ModuleFactory
+
+
+@pytest.fixture
+def alice(db):
+    return User.objects.create_user("alice")
+
+
+def _headers(user):
+    return {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+
+
+def test_job_status_is_owner_scoped(alice, settings):
+    settings.ALLOW_ANON_WRITE_FOR_TESTS = False
+    job = AIJob.objects.create(
+        owner=alice, kind="outline", status="running", progress_percentage=30
+    )
+    other = AIJob.objects.create(owner=User.objects.create_user("bob"), kind="outline")
+
+    async def scenario():
+        client = AsyncClient()
+        return (
+            await client.get(f"/api/v1/jobs/{job.id}/status/", headers=_headers(alice)),
+            await client.get(f"/api/v1/jobs/{other.id}/status/", headers=_headers(alice)),
+            await client.get(f"/api/v1/jobs/{job.id}/status/"),
+        )
+
+    mine, theirs, anon = async_to_sync(scenario)()
+    assert mine.status_code == 200
+    assert mine.json()["id"] == str(job.id)
+    assert (mine.json()["status"], mine.json()["progress_percentage"]) == ("running", 30)
+    assert set(mine.json()) == set(async_views.JOB_STATUS_FIELDS)
+    assert theirs.status_code == 404
+    assert anon.status_code == 401
+
+
+def test_artifact_metadata(alice):
+    course = CourseFactory(owner=alice)
+    artifact = ExportArtifact.objects.create(
+        course=course, kind="scorm", file_path="a.zip", checksum="0" * 64
+    )
+
+    async def scenario():
+        return await AsyncClient().get(
+            f"/api/v1/artifacts/{artifact.id}/metadata/", headers=_headers(alice)
+        )
+
+    resp = async_to_sync(scenario)()
+    assert resp.status_code == 200
+    assert resp.json()["course"] == str(course.id)
+    assert resp.json()["job"] is None
+
+
+def test_async_course_tree_matches_drf_action(alice):
+    caches["representations"].clear()
+    course = CourseFactory(owner=alice)
+    LessonFactory(module=ModuleFactory(course=course), title="Cells")
+    request = AsyncRequestFactory().get("/", headers=_headers(alice))
+
+    first = async_to_sync(async_views.course_tree)(request, pk=course.id)
+    second = async_to_sync(async_views.course_tree)(request, pk=course.id)
+    assert (first["X-Cache"], second["X-Cache"]) == ("MISS", "HIT")
+    assert first.content == second.content
+
+    drf = APIClient().get(f"/api/v1/courses/{course.id}/tree/?format=json")
+    assert drf.json() == json.loads(first.content)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bench_async_reads_command():
+    out = io.StringIO()
+    call_command("bench_async_reads", requests=6, concurrency=3, modules=1, lessons=2, stdout=out)
+    lines = out.getvalue().splitlines()
+    assert [line.split()[0] for line in lines[2:]] == ["livez", "job", "artifact", "course"]
@@ -0,0 +1,147 @@
+from contextlib import contextmanager
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from jobs import engine
+from jobs.models import AIJob, IdempotencyKey
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def alice(db):
+    return User.objects.create_user("alice")
+
+
+@pytest.fixture
+def client(alice):
+    client = APIClient()
+    client.force_authenticate(alice)
+    return client
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    monkeypatch.setitem(engine._handlers, "lesson", lambda job: {"lesson": job.input_data["n"]})
+    monkeypatch.setitem(engine._handlers, "quiz", lambda job: {"quiz": job.input_data["n"]})
+
+
+PAYLOAD = {
+    "jobs": [{"kind": "lesson", "input_data": {"n": n}} for n in range(3)]
+    + [{"kind": "quiz", "input_data": {"n": n}} for n in range(2)]
+}
+
+
+def test_batch_is_inserted_in_bulk_and_tracked_by_parent(
+    client, handlers, django_capture_on_commit_callbacks
+):
+    with (
+        CaptureQueriesContext(connection) as queries,
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        resp = client.post("/api/v1/jobs/batch/", PAYLOAD, format="json")
+    assert resp.status_code == 201
+    inserts = [
+        q for q in queries.captured_queries if q["sql"].startswith('INSERT INTO "jobs_aijob"')
+    ]
+    assert len(inserts) == 2  # the parent, then every child at once
+
+    parent = AIJob.objects.get(pk=resp.json()["parent"]["id"])
+    assert parent.kind == AIJob.JobKind.BATCH
+    assert (parent.status, parent.progress_percentage, parent.progress_message) == (
+        AIJob.Status.COMPLETED,
+        100,
+        "5/5 done",
+    )
+    children = AIJob.objects.filter(parent=parent)
+    assert sorted(map(str, children.values_list("pk", flat=True))) == sorted(resp.json()["jobs"])
+    assert set(children.values_list("status", flat=True)) == {AIJob.Status.COMPLETED}
+
+
+def test_parent_reports_partial_progress_and_failures(
+    alice, monkeypatch, django_capture_on_commit_callbacks
+):
+    from jobs import batches
+
+    def lesson(job):
+        if job.input_data["n"] == 1:
+            raise ValueError("bad outline entry")
+        return {}
+
+    monkeypatch.setitem(engine._handlers, "lesson", lesson)
+    parent, created = batches.submit(
+        alice, [{"kind": "lesson", "input_data": {"n": n}} for n in range(3)]
+    )
+    assert created
+    child = parent.children.order_by("created_at").first()
+    AIJob.objects.filter(pk=child.pk).update(status=AIJob.Status.COMPLETED)
+    batches.refresh(parent.pk)
+    parent.refresh_from_db()
+    assert (parent.status, parent.progress_percentage, parent.progress_message) == (
+        AIJob.Status.RUNNING,
+        33,
+        "1/3 done",
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        engine.dispatch_many({"lesson": list(parent.children.values_list("pk", flat=True))})
+    parent.refresh_from_db()
+    assert parent.status == AIJob.Status.FAILED
+    assert parent.error_message == "1 of 3 jobs failed"
+    assert parent.output_data == {"children": {"completed": 2, "failed": 1}}
+
+
+def test_batch_honours_idempotency_key(client, handlers, django_capture_on_commit_callbacks):
+    headers = {"Idempotency-Key": "course-42-lessons"}
+    with django_capture_on_commit_callbacks(execute=True):
+        first = client.post("/api/v1/jobs/batch/", PAYLOAD, format="json", headers=headers)
+        replay = client.post("/api/v1/jobs/batch/", PAYLOAD, format="json", headers=headers)
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert replay.json() == first.json()
+
+    # Stored response gone (expired and purged): the key still finds the batch
+    IdempotencyKey.objects.all().delete()
+    cache.clear()
+    with django_capture_on_commit_callbacks(execute=True):
+        late = client.post("/api/v1/jobs/batch/", PAYLOAD, format="json", headers=headers)
+    assert late.status_code == 200
+    assert late.json()["parent"]["id"] == first.json()["parent"]["id"]
+    assert AIJob.objects.filter(kind=AIJob.JobKind.BATCH).count() == 1
+    assert AIJob.objects.exclude(kind=AIJob.JobKind.BATCH).count() == 5
+
+
+def test_without_fair_scheduling_children_go_out_over_one_connection(alice, settings, monkeypatch):
+    from jobs import batches
+
+    settings.AIJOB_FAIR_SCHEDULING = False
+    settings.CELERY_TASK_ALWAYS_EAGER = False
+    sent, producers = [], []
+
+    class App:
+        @contextmanager
+        def producer_or_acquire(self):
+            producers.append(object())
+            yield producers[-1]
+
+        def send_task(self, name, args, **options):
+            sent.append((args[0], options["queue"], options["producer"]))
+
+    monkeypatch.setattr(engine, "celery_app", App())
+    parent, _ = batches.submit(alice, PAYLOAD["jobs"])
+    ids = {"lesson": [], "quiz": []}
+    for pk, kind in parent.children.values_list("pk", "kind"):
+        ids[kind].append(pk)
+
+    assert engine.dispatch_many(ids) == 5
+    assert len(producers) == 1
+    assert {queue for _, queue, _ in sent} == {"aijobs.lesson", "aijobs.quiz"}
+    assert engine.dispatch_many(ids) == 0
+
+
+def test_batch_validation(client, settings):
+    settings.AIJOB_BATCH_MAX_SIZE = 2
+    assert client.post("/api/v1/jobs/batch/", PAYLOAD, format="json").status_code == 400
+    assert client.post("/api/v1/jobs/batch/", {"jobs": []}, format="json").status_code == 400
+    assert client.post("/api/v1/jobs/", {"kind": "batch"}, format="json").status_code == 400
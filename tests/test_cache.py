@@ -0,0 +1,78 @@
+import time
+
+import pytest
+from django.core.cache import cache
+
+from core.cache import FakeRedis, ResilientRedisCache
+
+
+@pytest.fixture
+def backend(request):
+    url = f"redis://fake/{request.node.name}"
+    yield ResilientRedisCache(
+        url,
+        {
+            "KEY_PREFIX": "p",
+            "VERSION": 2,
+            "OPTIONS": {
+                "CLIENT_FACTORY": "core.cache.fake_redis_client",
+                "FAILURE_THRESHOLD": 2,
+                "RECOVERY_SECONDS": 0.05,
+            },
+        },
+    )
+    FakeRedis(url).server.down = False
+
+
+def test_default_cache_uses_fake_redis_with_prefix():
+    cache.set("greeting", {"hello": "world"})
+    assert cache.get("greeting") == {"hello": "world"}
+    assert FakeRedis("redis://fake/0").get("test:1:greeting") is not None
+    cache.delete("greeting")
+
+
+def test_operations(backend):
+    assert backend.add("a", 1)
+    assert not backend.add("a", 2)
+    assert backend.incr("a", 5) == 6
+    with pytest.raises(ValueError):
+        backend.incr("missing")
+    backend.set_many({"b": b"\x00bytes", "c": [1, 2]})
+    assert backend.get_many(["a", "b", "c", "d"]) == {"a": 6, "b": b"\x00bytes", "c": [1, 2]}
+    backend.delete_many(["b", "c"])
+    assert not backend.has_key("b")
+    # Key prefix and version are part of the stored key
+    assert FakeRedis(backend._url).get("p:2:a") == b"6"
+    assert backend.get("a", version=3) is None
+
+
+def test_timeouts(backend):
+    backend.set("short", "x", timeout=0.02)
+    backend.set("gone", "x", timeout=0)
+    backend.set("forever", "x", timeout=None)
+    assert backend.get("gone") is None
+    time.sleep(0.03)
+    assert backend.get("short") is None
+    assert backend.get("forever") == "x"
+    assert backend.touch("forever", 0.02)
+    time.sleep(0.03)
+    assert backend.get("forever") is None
+
+
+def test_breaker_degrades_to_local_memory_and_recovers(backend):
+    backend.set("stale", "before outage")
+    server = FakeRedis(backend._url).server
+    server.down = True
+
+    # Writes and reads keep working against local memory
+    backend.set("stale", "during outage")
+    assert backend.get("stale") == "during outage"
+    assert backend.breaker.state == "open"
+
+    server.down = False
+    time.sleep(0.06)
+    # The half-open trial succeeds; keys touched while degraded are dropped
+    # from Redis rather than serving the value written before the outage
+    assert backend.get("other") is None
+    assert backend.breaker.state == "closed"
+    assert backend.get("stale") is None
@@ -0,0 +1,220 @@
+import io
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
+from jobs import engine
+from jobs.maintenance import reap_expired_leases
+from jobs.models import AIJob, ExportArtifact
+from rest_framework.test import APIClient
+
+from .factories import CourseFactory, LessonFactory, ModuleFactory
+
+
+@pytest.fixture
+def alice(db):
+    return User.objects.create_user("alice")
+
+
+def _run(job, capture):
+    with capture(execute=True):
+        engine.enqueue(job)
+    job.refresh_from_db()
+    return job
+
+
+def test_job_runs_through_registered_handler(
+    alice, monkeypatch, django_capture_on_commit_callbacks
+):
+    monkeypatch.setitem(engine._handlers, "outline", lambda job: {"echo": job.input_data["topic"]})
+    job = AIJob.objects.create(owner=alice, kind="outline", input_data={"topic": "cells"})
+
+    job = _run(job, django_capture_on_commit_callbacks)
+    assert job.status == AIJob.Status.COMPLETED
+    assert job.output_data == {"echo": "cells"}
+    assert job.progress_percentage == 100
+    assert job.started_at and job.completed_at
+
+
+def test_transient_failures_are_retried_with_count(
+    alice, monkeypatch, django_capture_on_commit_callbacks
+):
+    attempts = []
+
+    def flaky(job):
+        attempts.append(job.retry_count)
+        if len(attempts) < 3:
+            raise engine.RetryableJobError("throttled")
+        return {"ok": True}
+
+    monkeypatch.setitem(engine._handlers, "lesson", flaky)
+    job = _run(AIJob.objects.create(owner=alice, kind="lesson"), django_capture_on_commit_callbacks)
+    assert attempts == [0, 1, 2]
+    assert (job.status, job.retry_count, job.error_message) == (AIJob.Status.COMPLETED, 2, "")
+
+
+def test_retries_are_bounded(alice, settings, monkeypatch, django_capture_on_commit_callbacks):
+    settings.AIJOB_MAX_RETRIES = 1
+
+    def always_throttled(job):
+        raise engine.RetryableJobError("throttled")
+
+    monkeypatch.setitem(engine._handlers, "quiz", always_throttled)
+    job = _run(AIJob.objects.create(owner=alice, kind="quiz"), django_capture_on_commit_callbacks)
+    assert (job.status, job.retry_count, job.error_message) == (AIJob.Status.FAILED, 1, "throttled")
+
+
+def test_unknown_kind_and_errors_fail_without_retry(
+    alice, monkeypatch, django_capture_on_commit_callbacks
+):
+    monkeypatch.delitem(engine._handlers, "lecture", raising=False)
+    job = _run(
+        AIJob.objects.create(owner=alice, kind="lecture"), django_capture_on_commit_callbacks
+    )
+    assert job.status == AIJob.Status.FAILED
+    assert "No handler" in job.error_message
+    assert job.retry_count == 0
+
+
+def test_transitions_are_conditional(alice, monkeypatch):
+    calls = []
+    monkeypatch.setitem(engine._handlers, "outline", lambda job: calls.append(job))
+    job = AIJob.objects.create(owner=alice, kind="outline", status=AIJob.Status.CANCELLED)
+    assert engine.execute(job.pk) is None
+    assert not engine.transition(job.pk, [AIJob.Status.PENDING], AIJob.Status.RUNNING)
+    assert calls == []
+
+
+def test_lanes_prioritise_outline_over_long_jobs():
+    outline, lecture = engine.lane_for("outline"), engine.lane_for("lecture")
+    assert outline.queue != lecture.queue
+    assert outline.priority > lecture.priority
+    out = io.StringIO()
+    call_command("aijob_lanes", stdout=out)
+    assert "-Q aijobs.outline -c 8" in out.getvalue()
+
+
+def test_api_created_export_job_runs(alice, django_capture_on_commit_callbacks, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    course = CourseFactory(owner=alice)
+    LessonFactory(module=ModuleFactory(course=course))
+    client = APIClient()
+    client.force_authenticate(alice)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = client.post(
+            "/api/v1/jobs/",
+            {"kind": "export", "input_data": {"course_id": str(course.id)}},
+            format="json",
+        )
+    assert resp.status_code == 201
+    job = AIJob.objects.get(pk=resp.json()["id"])
+    assert job.status == AIJob.Status.COMPLETED
+    artifact = ExportArtifact.objects.get(pk=job.output_data["artifact_id"])
+    assert artifact.job_id == job.pk
+
+
+def test_running_job_holds_lease_and_heartbeat_renews_it(alice, monkeypatch):
+    seen = {}
+
+    def handler(job):
+        job.refresh_from_db()
+        seen["owner"], seen["expires"] = job.lease_owner, job.lease_expires_at
+        assert engine.heartbeat(job.pk, job.lease_owner)
+        assert not engine.heartbeat(job.pk, "someone-else")
+        return {}
+
+    monkeypatch.setitem(engine._handlers, "outline", handler)
+    job = AIJob.objects.create(owner=alice, kind="outline")
+    assert engine.execute(job.pk, worker="w1") == AIJob.Status.COMPLETED
+    assert seen["owner"] == "w1" and seen["expires"] > timezone.now()
+    job.refresh_from_db()
+    assert (job.lease_owner, job.lease_expires_at) == ("", None)
+
+
+def test_result_is_dropped_after_lease_is_lost(alice, monkeypatch):
+    def reaped_meanwhile(job):
+        AIJob.objects.filter(pk=job.pk).update(lease_owner="new-worker")
+        return {"late": True}
+
+    monkeypatch.setitem(engine._handlers, "outline", reaped_meanwhile)
+    job = AIJob.objects.create(owner=alice, kind="outline")
+    assert engine.execute(job.pk, worker="old-worker") == AIJob.Status.RUNNING
+    job.refresh_from_db()
+    assert job.output_data == {}
+
+
+def test_reaper_requeues_or_fails_expired_leases(
+    alice, settings, django_capture_on_commit_callbacks
+):
+    settings.AIJOB_MAX_RETRIES = 1
+    settings.AIJOB_FAIR_SCHEDULING = False
+    settings.CELERY_TASK_ALWAYS_EAGER = False
+    past, future = timezone.now() - timedelta(minutes=5), timezone.now() + timedelta(minutes=5)
+    running = {"status": AIJob.Status.RUNNING, "lease_owner": "dead", "celery_task_id": "t"}
+    stuck = AIJob.objects.create(owner=alice, kind="lesson", lease_expires_at=past, **running)
+    exhausted = AIJob.objects.create(
+        owner=alice, kind="lesson", lease_expires_at=past, retry_count=1, **running
+    )
+    alive = AIJob.objects.create(owner=alice, kind="lesson", lease_expires_at=future, **running)
+
+    result = reap_expired_leases(batch_size=1)
+    assert (result.requeued, result.failed, result.batches) == (1, 1, 2)
+    stuck.refresh_from_db()
+    assert (stuck.status, stuck.retry_count, stuck.lease_owner, stuck.celery_task_id) == (
+        AIJob.Status.PENDING,
+        1,
+        "",
+        None,
+    )
+    exhausted.refresh_from_db()
+    assert exhausted.status == AIJob.Status.FAILED
+    alive.refresh_from_db()
+    assert alive.status == AIJob.Status.RUNNING
+
+    out = io.StringIO()
+    call_command("reap_aijob_leases", stdout=out)
+    assert "requeued 0, failed 0" in out.getvalue()
+
+
+def test_reaper_finishes_batch_of_exhausted_child(alice, settings):
+    from jobs import batches
+
+    settings.AIJOB_MAX_RETRIES = 1
+    settings.CELERY_TASK_ALWAYS_EAGER = False
+    parent, _ = batches.submit(alice, [{"kind": "lesson", "input_data": {"n": 0}}])
+    past = timezone.now() - timedelta(minutes=5)
+    parent.children.update(
+        status=AIJob.Status.RUNNING, lease_owner="dead", lease_expires_at=past, retry_count=1
+    )
+
+    result = reap_expired_leases()
+    assert (result.requeued, result.failed) == (0, 1)
+    parent.refresh_from_db()
+    assert parent.status == AIJob.Status.FAILED
+    assert parent.error_message == "1 of 1 jobs failed"
+
+
+def test_db_workers_claim_oldest_claimable_job(alice, monkeypatch):
+    monkeypatch.setitem(engine._handlers, "quiz", lambda job: {"n": job.input_data["n"]})
+    held = AIJob.objects.create(
+        owner=alice,
+        kind="quiz",
+        input_data={"n": 0},
+        lease_expires_at=timezone.now() + timedelta(minutes=1),
+    )
+    first = AIJob.objects.create(owner=alice, kind="quiz", input_data={"n": 1})
+    second = AIJob.objects.create(owner=alice, kind="quiz", input_data={"n": 2})
+    AIJob.objects.create(owner=alice, kind="lecture")
+
+    assert engine.claim_next(["quiz"], "w1") == first.pk
+    assert engine.run_next(["quiz"]) == (second.pk, AIJob.Status.COMPLETED)
+    assert engine.claim_next(["quiz"], "w2") is None
+
+    out = io.StringIO()
+    call_command("run_aijob_worker", kinds="quiz", once=True, stdout=out)
+    assert out.getvalue() == ""
+    held.refresh_from_db()
+    assert held.status == AIJob.Status.PENDING
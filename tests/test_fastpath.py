@@ -0,0 +1,102 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from api.fastpath import compile_spec
+from api.serializers import (
+    AIJobSerializer,
+    CourseSerializer,
+    ExportArtifactSerializer,
+    LessonSerializer,
+    LessonSummarySerializer,
+)
+from jobs.models import AIJob, ExportArtifact
+
+from .factories import CourseFactory, LessonFactory, ModuleFactory
+
+
+@pytest.fixture
+def content_tree(db):
+    owner = User.objects.create_user("owner", password="x")
+    course = CourseFactory(goals=["g1", "g two"], platform_targets=["scorm"])
+    CourseFactory()  # course without modules
+    m1 = ModuleFactory(course=course, order=1)
+    m2 = ModuleFactory(course=course, order=2)
+    LessonFactory(module=m1, order=1, assets=[{"src": "a.png"}], learning_objectives=["x"])
+    LessonFactory(module=m2, order=1, content="ünicode body")
+    job = AIJob.objects.create(
+        kind=AIJob.JobKind.OUTLINE,
+        owner=owner,
+        input_data={"topic": "t"},
+        output_data={"modules": [{"title": "M", "lessons": list(range(5))}]},
+        started_at=timezone.now(),
+    )
+    AIJob.objects.create(kind=AIJob.JobKind.QUIZ, owner=owner)
+    ExportArtifact.objects.create(
+        course=course,
+        kind=ExportArtifact.ExportKind.SCORM,
+        file_path="exports/x.zip",
+        file_size_bytes=2**40,
+        checksum="0" * 64,
+        export_settings={"lesson_count": 2},
+        job=job,
+        expires_at=timezone.now() + timedelta(days=1),
+    )
+    ExportArtifact.objects.create(course=course, kind="qti", file_path="y", checksum="1" * 64)
+    return course
+
+
+def _get(path):
+    resp = Client().get(path)
+    assert resp.status_code == 200
+    return json.loads(resp.content)
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/api/v1/courses/",
+        "/api/v1/lessons/",
+        "/api/v1/jobs/",
+        "/api/v1/artifacts/",
+        "/api/v1/courses/?fields=title,modules",
+        "/api/v1/courses/?omit=modules",
+        "/api/v1/lessons/?fields=title,content,assets",
+        "/api/v1/jobs/?omit=output_data",
+        "/api/v1/artifacts/?page=1",
+    ],
+)
+def test_fast_list_matches_model_serializer(content_tree, path):
+    with override_settings(API_FAST_LIST_ENABLED=False):
+        expected = _get(path)
+    with override_settings(API_FAST_LIST_ENABLED=True):
+        actual = _get(path)
+    assert expected["count"] > 0
+    assert actual == expected
+
+
+@pytest.mark.parametrize(
+    "serializer_class",
+    [
+        CourseSerializer,
+        LessonSerializer,
+        LessonSummarySerializer,
+        AIJobSerializer,
+        ExportArtifactSerializer,
+    ],
+)
+def test_hot_serializers_compile(serializer_class):
+    spec = compile_spec(serializer_class)
+    assert spec is not None
+    assert list(spec.order) == list(serializer_class().fields)
+
+
+def test_course_list_loads_modules_in_one_query(content_tree, django_assert_max_num_queries):
+    for _ in range(3):
+        ModuleFactory(course=CourseFactory(), order=1)
+    with django_assert_max_num_queries(3):  # count + page + modules
+        Client().get("/api/v1/courses/")
@@ -0,0 +1,97 @@
+import json
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from assessment.models import Question, Quiz
+from courses.models import Lesson
+
+from .factories import LessonFactory
+
+
+def _items(data):
+    return data if isinstance(data, list) else data.get("results", [])
+
+
+def test_lesson_list_is_compact_and_skips_content_column(db):
+    LessonFactory(content="x" * 10_000)
+    client = Client()
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get("/api/v1/lessons/")
+    assert resp.status_code == 200
+    item = _items(resp.json())[0]
+    assert "content" not in item
+    assert set(item) == {"id", "module", "title", "estimated_minutes", "order"}
+    select_sql = [q["sql"] for q in ctx.captured_queries if "courses_lesson" in q["sql"]]
+    assert select_sql and all('"content"' not in sql for sql in select_sql)
+
+
+def test_lesson_detail_keeps_full_representation(db):
+    lesson = LessonFactory()
+    resp = Client().get(f"/api/v1/lessons/{lesson.id}/")
+    assert resp.status_code == 200
+    assert resp.json()["content"] == lesson.content
+
+
+def test_fields_param_selects_subset_and_prunes_sql(db):
+    lesson = LessonFactory()
+    client = Client()
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get(f"/api/v1/lessons/{lesson.id}/?fields=title")
+    assert resp.json() == {"id": str(lesson.id), "title": lesson.title}
+    sql = next(q["sql"] for q in ctx.captured_queries if "courses_lesson" in q["sql"])
+    assert '"content"' not in sql
+    assert '"assets"' not in sql
+
+
+def test_fields_param_on_list_uses_full_serializer(db):
+    LessonFactory(content="body")
+    resp = Client().get("/api/v1/lessons/?fields=title,content")
+    item = _items(resp.json())[0]
+    assert set(item) == {"id", "title", "content"}
+    assert item["content"] == "body"
+
+
+def test_fields_param_does_not_prune_writes(db):
+    lesson = LessonFactory()
+    resp = Client().patch(
+        f"/api/v1/lessons/{lesson.id}/?fields=title",
+        data=json.dumps({"title": "New", "content": "Rewritten"}),
+        content_type="application/json",
+    )
+    assert resp.status_code == 200
+    lesson.refresh_from_db()
+    assert (lesson.title, lesson.content) == ("New", "Rewritten")
+
+
+def test_omit_param_defers_columns(db):
+    lesson = LessonFactory()
+    client = Client()
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get(f"/api/v1/lessons/{lesson.id}/?omit=content,assets")
+    body = resp.json()
+    assert "content" not in body and "assets" not in body
+    assert body["title"] == lesson.title
+    sql = next(q["sql"] for q in ctx.captured_queries if "courses_lesson" in q["sql"])
+    assert '"content"' not in sql
+
+
+def test_quiz_list_does_not_embed_questions(db):
+    lesson = LessonFactory()
+    quiz = Quiz.objects.create(
+        title="Checkpoint",
+        content_type=ContentType.objects.get_for_model(Lesson),
+        object_id=str(lesson.id),
+    )
+    Question.objects.create(
+        quiz=quiz, question_type="mcq", prompt="?", choices=["a", "b"], correct_answer="a"
+    )
+    client = Client()
+    item = _items(client.get("/api/v1/quizzes/").json())[0]
+    assert "questions" not in item
+    detail = client.get(f"/api/v1/quizzes/{quiz.id}/").json()
+    assert len(detail["questions"]) == 1
+    embedded = _items(client.get("/api/v1/quizzes/?fields=title,questions").json())[0]
+    assert set(embedded) == {"id", "title", "questions"}
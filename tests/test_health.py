@@ -1,4 +1,8 @@
 import json
+import time
+
+from core import health
+from core.health import CheckResult, HealthMonitor
 from django.test import Client
 
 
@@ -9,3 +13,54 @@ def test_health_endpoints_smoke(db):
         assert resp.status_code == 200
         body = json.loads(resp.content)
         assert "ok" in body
+
+
+def _counting(calls, delay=0.0, ok=True):
+    def check():
+        calls.append(1)
+        time.sleep(delay)
+        return CheckResult(ok=ok)
+
+    return check
+
+
+def test_checks_run_concurrently_with_deadline():
+    fast, slow = [], []
+    monitor = HealthMonitor(
+        {"fast": _counting(fast), "slow": _counting(slow, delay=0.5)}, timeout=0.05
+    )
+    start = time.perf_counter()
+    results = monitor.run_checks()
+    assert time.perf_counter() - start < 0.4
+    assert results["fast"].ok
+    assert not results["slow"].ok
+    assert "Timed out" in results["slow"].detail
+
+
+def test_results_are_cached_and_refreshed_in_background():
+    calls = []
+    monitor = HealthMonitor({"db": _counting(calls)}, ttl=0.05)
+    first, age = monitor.results()
+    assert first["db"].ok and age == 0.0
+    monitor.results()
+    assert len(calls) == 1
+
+    time.sleep(0.06)
+    stale, age = monitor.results()
+    assert stale is first and age >= 0.05
+    for _ in range(50):
+        if len(calls) == 2:
+            break
+        time.sleep(0.01)
+    assert len(calls) == 2
+    assert monitor.results()[0] is not first
+
+
+def test_livez_touches_no_dependency(monkeypatch):
+    def boom():
+        raise AssertionError("liveness must not run checks")
+
+    monkeypatch.setattr(health, "get_monitor", boom)
+    resp = Client().get("/livez/")
+    assert resp.status_code == 200
+    assert resp.json() == {"ok": True, "status": "alive"}
@@ -0,0 +1,187 @@
+import io
+import json
+import threading
+from datetime import timedelta
+
+import pytest
+from core.middleware import IdempotencyKeyMiddleware
+from courses.models import Course
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import Client, RequestFactory
+from django.utils import timezone
+from jobs.maintenance import purge_expired_idempotency_keys
+from jobs.models import IdempotencyKey
+
+PAYLOAD = json.dumps({"title": "Once", "audience": "students"})
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _post(client, key, body=PAYLOAD):
+    return client.post(
+        "/api/v1/courses/", data=body, content_type="application/json", HTTP_IDEMPOTENCY_KEY=key
+    )
+
+
+def _hash(key, body=PAYLOAD):
+    class _Request:
+        path = "/api/v1/courses/"
+
+    request = _Request()
+    request.body = body.encode()
+    return IdempotencyKeyMiddleware(None)._get_request_hash(request, key)
+
+
+def _reserve(key, request_hash):
+    IdempotencyKey.objects.create(
+        key=key,
+        request_hash=request_hash,
+        state=IdempotencyKey.State.PROCESSING,
+        expires_at=timezone.now() + timedelta(minutes=1),
+    )
+
+
+def test_duplicate_post_is_replayed(db):
+    client = Client()
+    first = _post(client, "k-1")
+    second = _post(client, "k-1")
+    assert first.status_code == second.status_code == 201
+    assert second.json() == first.json()
+    assert second["Idempotent-Replayed"] == "true"
+    assert Course.objects.filter(title="Once").count() == 1
+
+    record = IdempotencyKey.objects.get(key="k-1")
+    assert record.state == IdempotencyKey.State.COMPLETED
+    assert record.response_status == 201
+
+    # Replays survive a cache flush (another worker, a restart)
+    cache.clear()
+    assert _post(client, "k-1").json() == first.json()
+    assert Course.objects.filter(title="Once").count() == 1
+
+
+def test_key_reused_with_different_body_is_rejected(db):
+    client = Client()
+    _post(client, "k-2")
+    resp = _post(client, "k-2", json.dumps({"title": "Other", "audience": "x"}))
+    assert resp.status_code == 422
+    assert not Course.objects.filter(title="Other").exists()
+
+
+def test_in_flight_duplicate_gets_409(db, settings):
+    settings.IDEMPOTENCY_WAIT_SECONDS = 0.05
+    _reserve("k-3", _hash("k-3"))
+
+    resp = _post(Client(), "k-3")
+    assert resp.status_code == 409
+    assert resp["Retry-After"] == "1"
+    assert not Course.objects.filter(title="Once").exists()
+
+
+def test_in_flight_duplicate_waits_for_first_result(db, settings):
+    settings.IDEMPOTENCY_WAIT_SECONDS = 5
+    request_hash = _hash("k-4")
+    _reserve("k-4", request_hash)
+
+    def finish():
+        cache.set(f"idempotent:{request_hash}", (201, "application/json", b'{"id":"first"}'))
+
+    timer = threading.Timer(0.1, finish)
+    timer.start()
+    resp = _post(Client(), "k-4")
+    timer.join()
+    assert resp.status_code == 201
+    assert resp.json() == {"id": "first"}
+    assert not Course.objects.filter(title="Once").exists()
+
+
+def test_stale_reservation_is_taken_over(db):
+    IdempotencyKey.objects.create(
+        key="k-5",
+        request_hash=_hash("k-5"),
+        state=IdempotencyKey.State.PROCESSING,
+        expires_at=timezone.now() - timedelta(seconds=1),
+    )
+    assert _post(Client(), "k-5").status_code == 201
+    assert IdempotencyKey.objects.get(key="k-5").state == IdempotencyKey.State.COMPLETED
+
+
+def test_failed_request_releases_reservation(db):
+    client = Client()
+    bad = json.dumps({"audience": "no title"})
+    assert _post(client, "k-6", bad).status_code == 400
+    assert not IdempotencyKey.objects.filter(key="k-6").exists()
+    # Nothing was recorded, so a retry runs the view again instead of replaying
+    assert _post(client, "k-6", bad).status_code == 400
+
+
+def test_replay_returns_stored_bytes_verbatim(db):
+    calls = []
+
+    def view(request):
+        calls.append(request)
+        return HttpResponse(b"\x00binary\xff", status=202, content_type="application/octet-stream")
+
+    middleware = IdempotencyKeyMiddleware(view)
+    # Non-UTF-8 body: hashed as raw bytes, never decoded
+    body = b"\xff\xfe not utf-8"
+
+    def post():
+        request = RequestFactory().post(
+            "/api/v1/upload/",
+            data=body,
+            content_type="application/octet-stream",
+            HTTP_IDEMPOTENCY_KEY="k-7",
+        )
+        return middleware(request)
+
+    first = post()
+    cache.clear()
+    replay = post()
+    assert len(calls) == 1
+    assert replay.status_code == 202
+    assert replay.content == first.content == b"\x00binary\xff"
+    assert replay["Content-Type"] == "application/octet-stream"
+
+
+def test_bench_idempotency_command(db):
+    out = io.StringIO()
+    call_command("bench_idempotency", requests=3, body_bytes=64, stdout=out)
+    labels = [line[:20].strip() for line in out.getvalue().splitlines()[2:]]
+    assert labels == ["no key", "first execution", "replay (cache)", "replay (database)"]
+    assert not IdempotencyKey.objects.exists()
+
+
+def _keys(prefix, count, expires_in):
+    IdempotencyKey.objects.bulk_create(
+        IdempotencyKey(
+            key=f"{prefix}-{i}", request_hash="0" * 64, expires_at=timezone.now() + expires_in
+        )
+        for i in range(count)
+    )
+
+
+def test_purge_deletes_only_expired_keys_in_batches(db):
+    _keys("old", 5, timedelta(minutes=-1))
+    _keys("live", 2, timedelta(minutes=1))
+
+    result = purge_expired_idempotency_keys(batch_size=2)
+    assert (result.deleted, result.batches) == (5, 3)
+    assert sorted(IdempotencyKey.objects.values_list("key", flat=True)) == ["live-0", "live-1"]
+
+
+def test_purge_command_reports_and_respects_max_batches(db):
+    _keys("old", 5, timedelta(minutes=-1))
+    out = io.StringIO()
+    call_command("purge_idempotency_keys", batch_size=2, max_batches=1, stdout=out)
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith("before: 5 rows (5 expired)")
+    assert lines[1].startswith("purged 2 rows in 1 batches")
+    assert lines[2].startswith("after: 3 rows (3 expired)")
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User
+from django.test import AsyncClient
+from jobs import events
+from jobs.models import AIJob
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+@pytest.fixture
+def alice(db):
+    return User.objects.create_user("alice")
+
+
+def _auth(user):
+    return {"headers": {"Authorization": f"Bearer {AccessToken.for_user(user)}"}}
+
+
+def _data(frame):
+    event, data = frame.decode().strip().split("\n")
+    assert event == "event: job"
+    return json.loads(data.removeprefix("data: "))
+
+
+def test_job_stream_pushes_updates_and_closes_when_finished(
+    alice, django_capture_on_commit_callbacks
+):
+    job = AIJob.objects.create(owner=alice, kind=AIJob.JobKind.OUTLINE)
+
+    def progress(status, pct, message):
+        with django_capture_on_commit_callbacks(execute=True):
+            job.status, job.progress_percentage, job.progress_message = status, pct, message
+            job.save()
+
+    async def scenario():
+        resp = await AsyncClient().get(f"/api/v1/jobs/{job.id}/events/", **_auth(alice))
+        assert resp.status_code == 200
+        assert resp["Content-Type"] == "text/event-stream"
+        frames = aiter(resp.streaming_content)
+        assert await anext(frames) == b"retry: 3000\n\n"
+        assert _data(await anext(frames))["status"] == "pending"
+
+        await sync_to_async(progress)("running", 40, "Drafting modules")
+        update = _data(await anext(frames))
+        assert (update["id"], update["progress_percentage"], update["progress_message"]) == (
+            str(job.id),
+            40,
+            "Drafting modules",
+        )
+
+        await sync_to_async(progress)("completed", 100, "Done")
+        assert _data(await anext(frames))["status"] == "completed"
+        with pytest.raises(StopAsyncIteration):
+            await anext(frames)
+
+    async_to_sync(scenario)()
+
+
+def test_active_jobs_stream_snapshot_and_heartbeat(alice, settings):
+    settings.JOB_EVENTS_HEARTBEAT_SECONDS = 0.01
+    running = AIJob.objects.create(owner=alice, kind="lesson", status="running")
+    AIJob.objects.create(owner=alice, kind="quiz", status="completed")
+    AIJob.objects.create(owner=User.objects.create_user("bob"), kind="quiz", status="running")
+
+    async def scenario():
+        resp = await AsyncClient().get("/api/v1/jobs/events/", **_auth(alice))
+        frames = aiter(resp.streaming_content)
+        await anext(frames)
+        assert _data(await anext(frames))["id"] == str(running.id)
+        assert await anext(frames) == b": keepalive\n\n"
+        await resp.streaming_content.aclose()
+
+    async_to_sync(scenario)()
+
+
+def test_stream_requires_authentication_and_ownership(alice):
+    job = AIJob.objects.create(owner=User.objects.create_user("bob"), kind="outline")
+
+    async def scenario():
+        client = AsyncClient()
+        anon = await client.get(f"/api/v1/jobs/{job.id}/events/")
+        other = await client.get(f"/api/v1/jobs/{job.id}/events/", **_auth(alice))
+        return anon, other
+
+    anon, other = async_to_sync(scenario)()
+    assert anon.status_code == 401
+    assert other.status_code == 404
+    assert other["Content-Type"] == "application/problem+json"
+
+
+def test_failed_snapshot_closes_the_subscription(alice, monkeypatch):
+    AIJob.objects.create(owner=alice, kind="lesson", status="running")
+
+    def boom(job):
+        raise RuntimeError("snapshot failed")
+
+    monkeypatch.setattr(events, "job_event", boom)
+    with pytest.raises(RuntimeError):
+        async_to_sync(AsyncClient().get)("/api/v1/jobs/events/", **_auth(alice))
+    assert events.channel_for(alice.pk) not in events.get_broker()._subscribers
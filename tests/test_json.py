@@ -0,0 +1,72 @@
+import io
+import json
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.test import Client, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from core import jsonlib
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+BACKENDS = ["stdlib"] + (["orjson"] if jsonlib.orjson is not None else [])
+
+PAYLOAD = {
+    "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "at": datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    "naive": datetime(2024, 5, 1, 12, 30),
+    "price": Decimal("9.99"),
+    "label": gettext_lazy("Draft"),
+    "nested": {"list": [1, 2.5, None, True], "text": "ünïcödé  "},
+    1: "int key",
+}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_renderer_matches_drf_shapes(backend):
+    with override_settings(JSON_BACKEND=backend):
+        fast = FastJSONRenderer().render(PAYLOAD)
+    drf = JSONRenderer().render(PAYLOAD)
+    assert json.loads(fast) == json.loads(drf)
+    assert b"\\u2028" in fast
+
+
+def test_indented_output_falls_back_to_drf():
+    out = FastJSONRenderer().render({"a": 1}, "application/json; indent=2")
+    assert out == JSONRenderer().render({"a": 1}, "application/json; indent=2")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_parser_roundtrip_and_errors(backend):
+    with override_settings(JSON_BACKEND=backend):
+        parser = FastJSONParser()
+        assert parser.parse(io.BytesIO('{"a": "ü"}'.encode())) == {"a": "ü"}
+        with pytest.raises(ParseError):
+            parser.parse(io.BytesIO(b"{not json"))
+        with pytest.raises(ParseError):
+            parser.parse(io.BytesIO(b'{"a": NaN}'))
+
+
+def test_api_uses_fast_renderer_and_parser(db):
+    client = Client()
+    resp = client.post(
+        "/api/v1/courses/",
+        data=json.dumps({"title": "Ünïcode", "audience": "all"}),
+        content_type="application/json",
+    )
+    assert resp.status_code == 201
+    assert resp.json()["title"] == "Ünïcode"
+    bad = client.post("/api/v1/courses/", data="{", content_type="application/json")
+    assert bad.status_code == 400
+
+
+def test_bench_json_command_runs():
+    out = io.StringIO()
+    call_command("bench_json", modules=2, lessons=2, iterations=1, stdout=out)
+    assert "fast (stdlib)" in out.getvalue()
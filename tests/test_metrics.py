@@ -0,0 +1,114 @@
+import json
+
+import pytest
+from core import metrics
+from core.metrics import Counter, Histogram, Registry
+from django.test import Client
+from jobs.models import AIJob
+
+from .factories import CourseFactory
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    metrics.REGISTRY.reset()
+    yield
+    metrics.REGISTRY.reset()
+
+
+def _samples(text):
+    return {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in text.splitlines()
+        if not line.startswith("#")
+    }
+
+
+def test_metrics_endpoint_reports_requests_queries_cache_and_queue(db, django_user_model):
+    course = CourseFactory()
+    owner = django_user_model.objects.create_user("alice")
+    AIJob.objects.create(owner=owner, kind="outline", status="pending")
+    AIJob.objects.create(owner=owner, kind="outline", status="completed")
+    client = Client()
+    client.get(f"/api/v1/courses/{course.id}/")
+    client.get(f"/api/v1/courses/{course.id}/")
+    client.post(
+        "/api/v1/courses/",
+        data=json.dumps({"title": "T", "audience": "a"}),
+        content_type="application/json",
+        HTTP_IDEMPOTENCY_KEY="m-1",
+    )
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp["Content-Type"].startswith("text/plain; version=0.0.4")
+    samples = _samples(resp.content.decode())
+
+    route = "api/v1/courses/(?P<pk>[^/.]+)/$"
+    assert (
+        samples[f'http_request_duration_seconds_count{{method="GET",route="{route}",status="200"}}']
+        == 2
+    )
+    assert samples[f'db_queries_total{{route="{route}"}}'] >= 1
+    assert samples['cache_requests_total{cache="representation.course",result="miss"}'] == 1
+    assert samples['cache_requests_total{cache="representation.course",result="hit"}'] == 1
+    assert samples['cache_requests_total{cache="idempotency",result="miss"}'] == 1
+    assert samples['aijob_queue_depth{kind="outline",status="pending"}'] == 1
+    assert 'aijob_queue_depth{kind="outline",status="completed"}' not in samples
+
+
+def test_metrics_token(db, settings):
+    settings.METRICS_TOKEN = "s3cret"
+    assert Client().get("/metrics").status_code == 401
+    assert Client().get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret").status_code == 200
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    hist = registry.register(Histogram("h", "help", ("kind",), buckets=(1, 10)))
+    for value in (0.5, 1, 5, 50):
+        hist.observe(value, "x")
+    samples = _samples(registry.render())
+    assert samples['h_bucket{kind="x",le="1"}'] == 2
+    assert samples['h_bucket{kind="x",le="10"}'] == 3
+    assert samples['h_bucket{kind="x",le="+Inf"}'] == 4
+    assert samples['h_sum{kind="x"}'] == 56.5
+
+
+def test_multiprocess_snapshots_are_summed(tmp_path, settings):
+    settings.METRICS_MULTIPROC_DIR = str(tmp_path)
+    registry = Registry()
+    counter = registry.register(Counter("c", "help", ("route",)))
+    counter.inc("a", amount=2)
+    # Another worker's snapshot
+    (tmp_path / "99999999.json").write_text(json.dumps({"c": [[["a"], 3.0], [["b"], 1.0]]}))
+    registry.flush(force=True)
+    assert sorted(p.name for p in tmp_path.iterdir())[-1] == "99999999.json"
+
+    samples = _samples(registry.render())
+    assert samples['c{route="a"}'] == 5
+    assert samples['c{route="b"}'] == 1
+
+
+def test_worker_jobs_flush_their_samples(db, tmp_path, settings, monkeypatch, django_user_model):
+    from jobs import engine
+
+    settings.METRICS_MULTIPROC_DIR = str(tmp_path)
+    settings.METRICS_FLUSH_SECONDS = 0
+    monkeypatch.setitem(engine._handlers, "quiz", lambda job: {})
+    job = AIJob.objects.create(owner=django_user_model.objects.create_user("alice"), kind="quiz")
+    engine.execute(job.pk)
+    (snapshot,) = tmp_path.glob("*.json")
+    assert "aijob_wait_seconds" in json.loads(snapshot.read_text())
+
+
+def test_model_calls_flush_their_samples(tmp_path, settings):
+    from ai.client import ModelRequest, get_client
+
+    settings.METRICS_MULTIPROC_DIR = str(tmp_path)
+    settings.METRICS_FLUSH_SECONDS = 0
+    get_client().complete(ModelRequest(prompt="Say hi"))
+    (snapshot,) = tmp_path.glob("*.json")
+    assert {"ai_tokens_total", "ai_request_duration_seconds"} <= set(
+        json.loads(snapshot.read_text())
+    )
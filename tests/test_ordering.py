@@ -0,0 +1,90 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from courses.models import Lesson, Module
+from courses.ordering import ORDER_GAP, Siblings
+
+from .factories import CourseFactory, LessonFactory, ModuleFactory
+
+LESSONS = Siblings(Lesson, "module")
+
+
+@pytest.fixture
+def lessons(db):
+    module = ModuleFactory()
+    return [LessonFactory(module=module, title=f"L{i}") for i in range(4)]
+
+
+def _titles(module):
+    return list(module.lessons.values_list("title", flat=True))
+
+
+def test_new_rows_are_appended_with_gaps(lessons):
+    assert [lesson.order for lesson in lessons] == [ORDER_GAP * i for i in range(1, 5)]
+
+
+@pytest.mark.parametrize(
+    "payload, expected",
+    [
+        ({"after": 0}, ["L0", "L3", "L1", "L2"]),
+        ({"before": 0}, ["L3", "L0", "L1", "L2"]),
+        ({"position": "first"}, ["L3", "L0", "L1", "L2"]),
+        ({"before": 2}, ["L0", "L1", "L3", "L2"]),
+    ],
+)
+def test_move_endpoint(settings, lessons, payload, expected):
+    settings.ALLOW_ANON_WRITE_FOR_TESTS = True
+    payload = {key: str(lessons[v].id) if key != "position" else v for key, v in payload.items()}
+    resp = APIClient().post(f"/api/v1/lessons/{lessons[3].id}/move/", payload, format="json")
+    assert resp.status_code == 200, resp.content
+    assert _titles(lessons[0].module) == expected
+
+
+def test_move_writes_only_the_moved_row(lessons):
+    with CaptureQueriesContext(connection) as ctx:
+        LESSONS.move(lessons[3], after=lessons[0].pk)
+    writes = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+    assert len(writes) == 1
+
+
+def test_exhausted_gap_rebalances_parent(lessons):
+    # Repeatedly inserting into the same slot halves the gap each time
+    for _ in range(20):
+        LESSONS.move(lessons[3], after=lessons[0].pk)
+        LESSONS.move(lessons[2], after=lessons[0].pk)
+    assert _titles(lessons[0].module)[0] == "L0"
+    orders = list(lessons[0].module.lessons.values_list("order", flat=True))
+    assert orders == sorted(set(orders))
+
+
+def test_move_rejects_anchor_from_another_parent(settings, lessons):
+    settings.ALLOW_ANON_WRITE_FOR_TESTS = True
+    other = LessonFactory()
+    resp = APIClient().post(
+        f"/api/v1/lessons/{lessons[0].id}/move/", {"after": str(other.id)}, format="json"
+    )
+    assert resp.status_code == 400
+    assert resp["Content-Type"].startswith("application/problem+json")
+
+
+def test_rebalance_command_converts_dense_orders(db):
+    course = CourseFactory()
+    for i in range(3):
+        ModuleFactory(course=course, order=i + 1, title=f"M{i}")
+    out = io.StringIO()
+
+    call_command("rebalance_orders", stdout=out)
+    assert "courses.Module: rebalanced 1 parents (3 rows)" in out.getvalue()
+    assert list(Module.objects.filter(course=course).values_list("title", "order")) == [
+        ("M0", ORDER_GAP),
+        ("M1", 2 * ORDER_GAP),
+        ("M2", 3 * ORDER_GAP),
+    ]
+
+    call_command("rebalance_orders", stdout=out)
+    assert "courses.Module: rebalanced 0 parents" in out.getvalue()
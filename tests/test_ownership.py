@@ -0,0 +1,105 @@
+import io
+
+import pytest
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from assessment.models import Question, Quiz
+from courses.models import Lesson, Module
+
+from .factories import CourseFactory, LessonFactory, ModuleFactory
+
+
+@pytest.fixture
+def users(db):
+    return User.objects.create_user("alice"), User.objects.create_user("bob")
+
+
+@pytest.fixture
+def tree(users):
+    alice, _ = users
+    course = CourseFactory(owner=alice)
+    module = ModuleFactory(course=course)
+    lesson = LessonFactory(module=module)
+    quiz = Quiz.objects.create(
+        title="Q",
+        content_type=ContentType.objects.get_for_model(Lesson),
+        object_id=str(lesson.id),
+    )
+    question = Question.objects.create(
+        quiz=quiz, question_type="mcq", prompt="?", choices=["a"], correct_answer="a"
+    )
+    return course, module, lesson, quiz, question
+
+
+def _keys(obj):
+    obj.refresh_from_db()
+    return obj.course_id, obj.owner_id
+
+
+def test_keys_filled_on_create(tree, users):
+    course, module, lesson, quiz, question = tree
+    assert module.owner_id == users[0].pk
+    for obj in (lesson, quiz, question):
+        assert _keys(obj) == (course.id, users[0].pk)
+
+
+def test_ownership_transfer_cascades(tree, users):
+    course, module, lesson, quiz, question = tree
+    course.transfer_ownership(users[1])
+    module.refresh_from_db()
+    assert module.owner_id == users[1].pk
+    for obj in (lesson, quiz, question):
+        assert _keys(obj) == (course.id, users[1].pk)
+
+
+def test_moving_module_updates_descendants(tree, users):
+    _, module, lesson, quiz, question = tree
+    other = CourseFactory(owner=users[1])
+    module.course = other
+    module.save()
+    for obj in (lesson, quiz, question):
+        assert _keys(obj) == (other.id, users[1].pk)
+
+
+def test_resync_command_repairs_bulk_updates(tree, users):
+    course, module, lesson, quiz, question = tree
+    Lesson.objects.filter(pk=lesson.pk).update(owner=None)
+    Question.objects.filter(pk=question.pk).update(owner=users[1])
+    call_command("sync_ownership_keys", stdout=io.StringIO())
+    assert _keys(lesson) == (course.id, users[0].pk)
+    assert _keys(question) == (course.id, users[0].pk)
+
+
+@override_settings(ALLOW_ANON_WRITE_FOR_TESTS=False)
+@pytest.mark.parametrize("path", ["modules", "lessons", "quizzes", "questions"])
+def test_owner_filter_is_single_predicate(tree, users, path):
+    client = APIClient()
+    client.force_authenticate(users[0])
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get(f"/api/v1/{path}/")
+    assert resp.json()["count"] == 1
+    sql = [q["sql"] for q in ctx.captured_queries if "owner_id" in q["sql"]]
+    assert sql and all("JOIN" not in q for q in sql)
+
+    client.force_authenticate(users[1])
+    assert client.get(f"/api/v1/{path}/").json()["count"] == 0
+
+
+@override_settings(ALLOW_ANON_WRITE_FOR_TESTS=False)
+def test_object_permission_uses_denormalized_owner(tree, users):
+    _, _, lesson, _, _ = tree
+    client = APIClient()
+    client.force_authenticate(users[0])
+    resp = client.patch(f"/api/v1/lessons/{lesson.id}/", {"title": "New"}, format="json")
+    assert resp.status_code == 200
+    # Another user cannot even see it
+    client.force_authenticate(users[1])
+    resp = client.patch(f"/api/v1/lessons/{lesson.id}/", {"title": "X"}, format="json")
+    assert resp.status_code == 404
+    assert Module.objects.filter(owner=users[0]).count() == 1
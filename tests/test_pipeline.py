@@ -0,0 +1,174 @@
+import pytest
+from ai import pipeline
+from courses.models import Lesson, Module
+from courses.ordering import ORDER_GAP
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from jobs import engine
+from jobs.models import AIJob
+from rest_framework.test import APIClient
+
+from .factories import CourseFactory, ModuleFactory
+
+
+@pytest.fixture
+def alice(db):
+    return User.objects.create_user("alice")
+
+
+@pytest.fixture
+def course(alice):
+    return CourseFactory(owner=alice, title="Photosynthesis")
+
+
+def _generate(owner, course, capture, **input_data):
+    job = AIJob.objects.create(
+        owner=owner,
+        kind=AIJob.JobKind.OUTLINE,
+        input_data={
+            "course_id": str(course.pk),
+            "modules": 2,
+            "lessons_per_module": 3,
+            **input_data,
+        },
+    )
+    with capture(execute=True):
+        engine.execute(job.pk)
+        # Parked on its lessons, which are sent on commit
+        job.refresh_from_db()
+        parked = (job.status, job.lease_owner)
+    job.refresh_from_db()
+    return job, parked
+
+
+def test_outline_fans_out_lessons_in_bulk(alice, course, django_capture_on_commit_callbacks):
+    existing = ModuleFactory(course=course)
+    with CaptureQueriesContext(connection) as queries:
+        outline, parked = _generate(alice, course, django_capture_on_commit_callbacks)
+    inserts = [
+        q["sql"].split()[2] for q in queries.captured_queries if q["sql"].startswith("INSERT")
+    ]
+    assert inserts.count('"courses_module"') == 1
+    assert inserts.count('"courses_lesson"') == 1
+
+    assert parked == (AIJob.Status.RUNNING, "")
+    assert (outline.status, outline.progress_percentage) == (AIJob.Status.COMPLETED, 100)
+    modules = list(course.modules.exclude(pk=existing.pk))
+    assert [str(m.pk) for m in modules] == outline.output_data["module_ids"]
+    assert [m.order for m in modules] == [
+        existing.order + ORDER_GAP,
+        existing.order + 2 * ORDER_GAP,
+    ]
+    lessons = Lesson.objects.filter(module__in=modules)
+    assert lessons.count() == 6
+    assert {(lesson.owner_id, lesson.course_id) for lesson in lessons} == {(alice.pk, course.pk)}
+    assert all(lesson.content.startswith("## ") for lesson in lessons)
+
+    batch = AIJob.objects.get(pk=outline.output_data["batch_id"])
+    assert batch.parent_id == outline.pk
+    assert (batch.status, batch.progress_percentage, batch.progress_message) == (
+        AIJob.Status.COMPLETED,
+        100,
+        "6/6 done",
+    )
+    children = list(batch.children.all())
+    assert batch.cost_cents == sum(child.cost_cents for child in children) > 0
+    assert outline.token_usage["output_tokens"] > 0
+    assert outline.cost_cents > batch.cost_cents
+    assert outline.progress_message == "6/6 done"
+
+
+def test_skeleton_only(alice, course, django_capture_on_commit_callbacks):
+    outline, parked = _generate(
+        alice, course, django_capture_on_commit_callbacks, generate_lessons=False
+    )
+    assert parked == (AIJob.Status.COMPLETED, "")
+    assert "batch_id" not in outline.output_data
+    assert Module.objects.filter(course=course).count() == 2
+    assert not AIJob.objects.filter(kind=AIJob.JobKind.LESSON).exists()
+
+
+def test_failed_lesson_is_retried_alone(
+    alice, course, monkeypatch, django_capture_on_commit_callbacks
+):
+    calls, broken = [], set()
+
+    def lesson(job):
+        calls.append(job.input_data["lesson_id"])
+        if not broken:
+            broken.add(job.input_data["lesson_id"])
+        if job.input_data["lesson_id"] in broken:
+            raise ValueError("model returned nonsense")
+        return pipeline.run_lesson(job)
+
+    monkeypatch.setitem(engine._handlers, "lesson", lesson)
+    outline, _ = _generate(alice, course, django_capture_on_commit_callbacks)
+    batch = AIJob.objects.get(pk=outline.output_data["batch_id"])
+    assert batch.status == outline.status == AIJob.Status.FAILED
+    assert batch.error_message == outline.error_message == "1 of 6 jobs failed"
+    assert len(calls) == 6
+    own_cost = outline.cost_cents - batch.cost_cents
+
+    broken.clear()
+    broken.add("fixed")
+    client = APIClient()
+    client.force_authenticate(alice)
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = client.post(f"/api/v1/jobs/{batch.pk}/retry/")
+    assert resp.status_code == 202
+    assert resp.json()["retried"] == 1
+    assert len(calls) == 7
+    batch.refresh_from_db()
+    outline.refresh_from_db()
+    assert (batch.status, batch.error_message, batch.progress_message) == (
+        AIJob.Status.COMPLETED,
+        "",
+        "6/6 done",
+    )
+    assert (outline.status, outline.error_message) == (AIJob.Status.COMPLETED, "")
+    assert outline.cost_cents == own_cost + batch.cost_cents
+    assert client.post(f"/api/v1/jobs/{batch.pk}/retry/").json()["retried"] == 0
+    assert client.post(f"/api/v1/jobs/{outline.pk}/retry/").status_code == 400
+
+
+def test_throttled_lesson_backs_off_and_retries(
+    alice, course, settings, django_capture_on_commit_callbacks
+):
+    settings.AI_MAX_RETRIES = 0
+    settings.AI_FAKE_BACKEND = {"throttle_first": 1}
+    lesson = Lesson.objects.create(module=ModuleFactory(course=course), title="Light", content="")
+    job = AIJob.objects.create(
+        owner=alice,
+        kind=AIJob.JobKind.LESSON,
+        input_data={"lesson_id": str(lesson.pk), "title": "Light"},
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        engine.execute(job.pk)
+    job.refresh_from_db()
+    lesson.refresh_from_db()
+    assert (job.status, job.retry_count) == (AIJob.Status.COMPLETED, 1)
+    assert lesson.content == job.output_data["content"]
+
+
+def test_result_cache_hit_still_applies_the_lesson(
+    alice, course, settings, django_capture_on_commit_callbacks
+):
+    from django.core.cache import caches
+
+    settings.AI_RESULT_CACHE_ENABLED = True
+    caches["ai_results"].clear()
+    lesson = Lesson.objects.create(module=ModuleFactory(course=course), title="Light", content="")
+    input_data = {"lesson_id": str(lesson.pk), "title": "Light"}
+    with django_capture_on_commit_callbacks(execute=True):
+        first = AIJob.objects.create(owner=alice, kind=AIJob.JobKind.LESSON, input_data=input_data)
+        engine.execute(first.pk)
+    Lesson.objects.filter(pk=lesson.pk).update(content="edited")
+    with django_capture_on_commit_callbacks(execute=True):
+        second = AIJob.objects.create(owner=alice, kind=AIJob.JobKind.LESSON, input_data=input_data)
+        engine.execute(second.pk)
+    second.refresh_from_db()
+    lesson.refresh_from_db()
+    assert second.token_usage["result_cache"]["hit"]
+    assert lesson.content == second.output_data["content"] != "edited"
+    caches["ai_results"].clear()
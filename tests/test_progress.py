@@ -0,0 +1,78 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from jobs import progress
+from jobs.models import AIJob
+from jobs.progress import ProgressReporter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def job(db):
+    return AIJob.objects.create(
+        owner=User.objects.create_user("alice"), kind="lecture", status="running"
+    )
+
+
+def _row(job):
+    return AIJob.objects.values_list("progress_percentage", "progress_message").get(pk=job.pk)
+
+
+def test_updates_are_coalesced_by_time_and_step(job):
+    clock = Clock()
+    reporter = ProgressReporter(job, flush_ms=500, flush_step=10, clock=clock)
+    for pct in range(1, 10):
+        assert not reporter.update(pct, "drafting")
+    assert reporter.writes == 0
+    assert _row(job) == (0, "")
+    assert progress.live(job.pk) == {"progress_percentage": 9, "progress_message": "drafting"}
+
+    assert reporter.update(10)
+    assert _row(job) == (10, "drafting")
+    clock.now = 0.6
+    assert reporter.update(11)
+    assert reporter.update(100, "done")
+    assert reporter.writes == 3
+    assert _row(job) == (100, "done")
+
+
+def test_flush_writes_only_progress_columns(job):
+    updated_at = job.updated_at
+    with ProgressReporter(job, flush_ms=60_000) as reporter:
+        reporter.update(3, "x" * 400)
+        with CaptureQueriesContext(connection) as queries:
+            reporter.flush()
+        assert not reporter.flush()
+    (sql,) = [q["sql"] for q in queries.captured_queries if q["sql"].startswith("UPDATE")]
+    assert "progress_percentage" in sql and "updated_at" not in sql
+    job.refresh_from_db()
+    assert (job.progress_percentage, len(job.progress_message), job.updated_at) == (
+        3,
+        255,
+        updated_at,
+    )
+
+
+def test_status_endpoint_serves_live_progress(job):
+    reporter = ProgressReporter(job, flush_ms=60_000, flush_step=50)
+    reporter.update(42, "halfway-ish")
+
+    async def fetch():
+        return await AsyncClient().get(f"/api/v1/jobs/{job.id}/status/")
+
+    body = async_to_sync(fetch)().json()
+    assert (body["progress_percentage"], body["progress_message"]) == (42, "halfway-ish")
+    assert _row(job) == (0, "")
+
+    AIJob.objects.filter(pk=job.pk).update(status="completed", progress_percentage=100)
+    assert async_to_sync(fetch)().json()["progress_percentage"] == 100
@@ -0,0 +1,63 @@
+import pytest
+from ai import result_cache
+from ai.prompts import PromptRegistry, registry
+from jinja2 import UndefinedError
+
+
+@pytest.fixture
+def prompts(tmp_path):
+    (tmp_path / "lesson.jinja").write_text(
+        "{% set system %}Reply with JSON.{% endset %}\nTeach {{ title }}{% if level %} at level {{ level }}{% endif %}.\n"
+    )
+    return PromptRegistry(tmp_path)
+
+
+def test_renders_system_and_body(prompts):
+    prompt = prompts.render("lesson", title="Light", level=2)
+    assert (prompt.name, prompt.system, prompt.text) == (
+        "lesson",
+        "Reply with JSON.",
+        "Teach Light at level 2.",
+    )
+    assert prompt.version == prompts.version("lesson") != ""
+
+
+def test_missing_variables_raise(prompts):
+    with pytest.raises(UndefinedError):
+        prompts.render("lesson", title="Light")
+    with pytest.raises(LookupError):
+        prompts.get("quiz")
+    assert prompts.version("quiz") == ""
+
+
+def test_templates_are_compiled_once(prompts, monkeypatch):
+    template = prompts.get("lesson")
+    monkeypatch.setattr(prompts, "_env", None)
+    for level in range(100):
+        prompts.render("lesson", title="Light", level=level)
+    assert prompts.get("lesson") is template
+
+
+def test_version_is_the_content_hash(prompts, tmp_path, monkeypatch, settings):
+    monkeypatch.setattr(result_cache, "registry", prompts)
+    before = result_cache.key_for("lesson", {"title": "Light"})
+    assert result_cache.template_version("lesson") == prompts.version("lesson")
+    settings.AI_PROMPT_VERSIONS = {"lesson": "v2"}
+    assert result_cache.template_version("lesson") == f"{prompts.version('lesson')}+v2"
+    del settings.AI_PROMPT_VERSIONS
+
+    (tmp_path / "lesson.jinja").write_text("Teach {{ title }} again.")
+    # Read once per process: an edit lands on restart (deploy)
+    assert result_cache.key_for("lesson", {"title": "Light"}) == before
+    prompts.clear()
+    assert result_cache.key_for("lesson", {"title": "Light"}) != before
+    assert prompts.render("lesson", title="Light").text == "Teach Light again."
+
+
+def test_shipped_templates():
+    assert {"outline", "lesson", "quiz"} <= set(registry.names())
+    quiz = registry.render("quiz", questions=5, title="Light", topic="Photosynthesis", content="")
+    assert (
+        quiz.text == 'Write 5 multiple-choice questions on "Light" from a course on Photosynthesis.'
+    )
+    assert "JSON" in quiz.system
@@ -0,0 +1,124 @@
+import pytest
+from api import cache as representation_cache
+from assessment.models import Question, Quiz
+from courses.models import Lesson, Module
+from courses.ordering import Siblings
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .factories import CourseFactory, LessonFactory, ModuleFactory
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    caches["representations"].clear()
+    representation_cache.reset_stats()
+
+
+@pytest.fixture
+def alice(db):
+    return User.objects.create_user("alice")
+
+
+@pytest.fixture
+def client(alice):
+    api = APIClient()
+    api.force_authenticate(alice)
+    return api
+
+
+@pytest.fixture
+def course(alice):
+    course = CourseFactory(owner=alice)
+    module = ModuleFactory(course=course, order=0, title="M1")
+    ModuleFactory(course=course, order=0, title="M2")
+    LessonFactory(module=module, title="Original")
+    return course
+
+
+def test_retrieve_is_served_from_cache(client, course):
+    url = f"/api/v1/courses/{course.id}/"
+    first = client.get(url)
+    with CaptureQueriesContext(connection) as ctx:
+        second = client.get(url)
+    assert first["X-Cache"] == "MISS" and second["X-Cache"] == "HIT"
+    assert first.json() == second.json()
+    assert len(ctx.captured_queries) == 0
+    assert representation_cache.stats()["course"]["hit_rate"] == 0.5
+
+
+def test_tree_payload_and_invalidation_on_lesson_save(client, course):
+    url = f"/api/v1/courses/{course.id}/tree/"
+    data = client.get(url).json()
+    assert [m["title"] for m in data["modules"]] == ["M1", "M2"]
+    assert data["modules"][0]["lessons"][0]["title"] == "Original"
+
+    lesson = Lesson.objects.get(title="Original")
+    lesson.title = "Edited"
+    lesson.save()
+
+    resp = client.get(url)
+    assert resp["X-Cache"] == "MISS"
+    assert resp.json()["modules"][0]["lessons"][0]["title"] == "Edited"
+
+
+def test_quiz_changes_invalidate_tree_only(client, course):
+    tree_url = f"/api/v1/courses/{course.id}/tree/"
+    course_url = f"/api/v1/courses/{course.id}/"
+    client.get(tree_url)
+    client.get(course_url)
+
+    lesson = Lesson.objects.get(title="Original")
+    quiz = Quiz.objects.create(
+        title="Check",
+        content_type=ContentType.objects.get_for_model(Lesson),
+        object_id=str(lesson.id),
+    )
+    Question.objects.create(
+        quiz=quiz, question_type="mcq", prompt="?", choices=["a"], correct_answer="a"
+    )
+
+    assert client.get(course_url)["X-Cache"] == "HIT"
+    tree = client.get(tree_url)
+    assert tree["X-Cache"] == "MISS"
+    assert tree.json()["quizzes"][0]["questions"][0]["prompt"] == "?"
+
+
+def test_move_invalidates_course_representation(client, course):
+    url = f"/api/v1/courses/{course.id}/"
+    client.get(url)
+    m1, m2 = Module.objects.filter(course=course)
+    Siblings(Module, "course").move(m2, before=m1.pk)
+    assert [m["title"] for m in client.get(url).json()["modules"]] == ["M2", "M1"]
+
+
+def test_ownership_transfer_retires_previous_owner_entries(client, course, settings):
+    settings.ALLOW_ANON_WRITE_FOR_TESTS = False
+    lesson = Lesson.objects.get(title="Original")
+    url = f"/api/v1/lessons/{lesson.id}/"
+    assert client.get(url)["X-Cache"] == "MISS"
+    assert client.get(url)["X-Cache"] == "HIT"
+
+    course.transfer_ownership(User.objects.create_user("bob"))
+    assert client.get(url).status_code == 404
+
+
+def test_fieldset_requests_bypass_cache(client, course):
+    resp = client.get(f"/api/v1/courses/{course.id}/?fields=title")
+    assert "X-Cache" not in resp
+    assert set(resp.json()) == {"id", "title"}
+
+
+def test_per_process_backend_is_refused_outside_debug(settings):
+    settings.CACHES = {
+        **settings.CACHES,
+        "representations": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+    assert not representation_cache.shared()
+    assert not representation_cache.enabled()
+    settings.REPRESENTATION_CACHE_ALLOW_LOCAL = True
+    assert representation_cache.enabled()
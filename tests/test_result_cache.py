@@ -0,0 +1,93 @@
+import pytest
+from ai import result_cache
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from jobs import engine
+from jobs.models import AIJob
+
+
+@pytest.fixture
+def calls(db, settings, monkeypatch):
+    settings.AI_RESULT_CACHE_ENABLED = True
+    caches["ai_results"].clear()
+    calls = []
+
+    def lesson(job):
+        calls.append(job.pk)
+        AIJob.objects.filter(pk=job.pk).update(
+            cost_cents=12, token_usage={"input": 900, "output": 400}
+        )
+        return {"content": f"Lesson on {job.input_data['topic']}"}
+
+    monkeypatch.setitem(engine._handlers, "lesson", lesson)
+    monkeypatch.setitem(engine._handlers, "export", lambda job: calls.append(job.pk) or {})
+    yield calls
+    caches["ai_results"].clear()
+
+
+@pytest.fixture
+def alice(db):
+    return User.objects.create_user("alice")
+
+
+def _run(owner, kind="lesson", **fields):
+    job = AIJob.objects.create(owner=owner, kind=kind, **fields)
+    engine.execute(job.pk)
+    job.refresh_from_db()
+    return job
+
+
+def test_identical_rerun_is_served_from_cache(alice, calls):
+    first = _run(alice, input_data={"topic": "Photosynthesis", "level": 2})
+    again = _run(alice, input_data={"level": 2, "topic": "  Photosynthesis "})
+
+    assert calls == [first.pk]
+    assert again.status == AIJob.Status.COMPLETED
+    assert again.output_data == first.output_data
+    assert again.cost_cents == 0
+    record = again.token_usage["result_cache"]
+    assert record["hit"] and record["saved_cost_cents"] == 12
+    assert record["saved_token_usage"] == {"input": 900, "output": 400}
+    assert "result_cache" not in first.token_usage
+
+
+def test_key_covers_model_and_template_version(alice, calls, settings):
+    _run(alice, input_data={"topic": "Cells"})
+    settings.BEDROCK_MODEL_ID = "another-model"
+    _run(alice, input_data={"topic": "Cells"})
+    settings.AI_PROMPT_VERSIONS = {"lesson": "v2"}
+    _run(alice, input_data={"topic": "Cells"})
+    _run(alice, input_data={"topic": "Mitosis"})
+    assert len(calls) == 4
+
+
+def test_opt_out_regenerates_and_refreshes_entry(alice, calls):
+    _run(alice, input_data={"topic": "Cells"})
+    fresh = _run(alice, input_data={"topic": "Cells"}, use_result_cache=False)
+    assert len(calls) == 2
+    assert fresh.cost_cents == 12
+    _run(alice, input_data={"topic": "Cells"})
+    assert len(calls) == 2
+
+
+def test_non_ai_kinds_are_not_cached(alice, calls):
+    _run(alice, kind="export", input_data={"course_id": "x"})
+    _run(alice, kind="export", input_data={"course_id": "x"})
+    assert len(calls) == 2
+    assert not result_cache.cacheable("export")
+
+
+def test_lru_eviction_is_bounded(alice, calls, settings):
+    settings.CACHES = {
+        **settings.CACHES,
+        "ai_results": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "ai-results-small",
+            "OPTIONS": {"MAX_ENTRIES": 2, "CULL_FREQUENCY": 2},
+        },
+    }
+    for topic in ("a", "b", "c"):
+        _run(alice, input_data={"topic": topic})
+    assert len(calls) == 3
+    _run(alice, input_data={"topic": "c"})
+    assert len(calls) == 3
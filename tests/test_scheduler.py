@@ -0,0 +1,119 @@
+import io
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from jobs import engine, scheduler
+from jobs.models import AIJob
+
+
+class Broker:
+    """Stands in for the Celery app: records what was sent, runs on demand."""
+
+    def __init__(self):
+        self.sent = []
+
+    def send_task(self, name, args, **options):
+        self.sent.append(args[0])
+
+    def run_next(self):
+        engine.execute(self.sent.pop(0))
+        scheduler.dispatcher.pump("lesson")
+
+
+@pytest.fixture
+def broker(db, settings, monkeypatch):
+    settings.CELERY_TASK_ALWAYS_EAGER = False
+    settings.AIJOB_LANES = {"lesson": {"queue": "aijobs.lesson", "concurrency": 1, "priority": 5}}
+    broker = Broker()
+    monkeypatch.setattr(engine, "celery_app", broker)
+    monkeypatch.setitem(engine._handlers, "lesson", lambda job: {})
+    scheduler.dispatcher.reset()
+    yield broker
+    scheduler.dispatcher.reset()
+
+
+@pytest.fixture
+def owners(db):
+    return User.objects.create_user("tenant"), User.objects.create_user("solo")
+
+
+def _owner_of(job_id):
+    return AIJob.objects.get(pk=job_id).owner.username
+
+
+def _submit(owner, n):
+    return [AIJob.objects.create(owner=owner, kind="lesson") for _ in range(n)]
+
+
+def test_small_owner_is_not_stuck_behind_bulk_submission(broker, owners):
+    tenant, solo = owners
+    _submit(tenant, 20)
+    _submit(solo, 2)
+
+    assert scheduler.dispatcher.pump("lesson") == 1
+    assert len(broker.sent) == 1
+    started = []
+    for _ in range(6):
+        started.append(_owner_of(broker.sent[0]))
+        broker.run_next()
+    # Both of solo's jobs ran within the first few slots, not after all 20
+    assert started[:4].count("solo") == 2
+    assert AIJob.objects.filter(owner=solo, status=AIJob.Status.COMPLETED).count() == 2
+
+
+def test_lane_capacity_limits_in_flight_jobs(broker, owners, settings):
+    settings.AIJOB_LANES["lesson"]["capacity"] = 3
+    _submit(owners[0], 10)
+    assert scheduler.dispatcher.pump("lesson") == 3
+    assert scheduler.dispatcher.pump("lesson") == 0
+    assert AIJob.objects.filter(scheduler.IN_FLIGHT).count() == 3
+
+
+def test_weights_and_per_owner_cap(broker, owners, settings):
+    tenant, solo = owners
+    settings.AIJOB_LANES["lesson"]["capacity"] = 6
+    settings.AIJOB_OWNER_WEIGHTS = {tenant.pk: 2}
+    _submit(tenant, 10)
+    _submit(solo, 10)
+    scheduler.dispatcher.pump("lesson")
+    assert sorted(map(_owner_of, broker.sent)) == ["solo"] * 2 + ["tenant"] * 4
+
+    scheduler.dispatcher.reset()
+    broker.sent.clear()
+    AIJob.objects.update(celery_task_id=None)
+    settings.AIJOB_OWNER_MAX_INFLIGHT = 1
+    scheduler.dispatcher.pump("lesson")
+    assert sorted(map(_owner_of, broker.sent)) == ["solo", "tenant"]
+
+
+def test_claim_prevents_double_dispatch(broker, owners):
+    (job,) = _submit(owners[0], 1)
+    assert engine.dispatch(job.pk, "lesson")
+    assert not engine.dispatch(job.pk, "lesson")
+    assert broker.sent == [str(job.pk)]
+
+
+def test_owner_stats_and_endpoint(broker, owners):
+    tenant, solo = owners
+    _submit(tenant, 3)
+    _submit(solo, 1)
+    scheduler.dispatcher.pump("lesson")
+    broker.run_next()
+
+    rows = {row["owner"]: row for row in scheduler.owner_stats()}
+    assert rows[tenant.pk]["waiting"] + rows[solo.pk]["waiting"] == 2
+    assert rows[tenant.pk]["in_flight"] + rows[solo.pk]["in_flight"] == 1
+    assert any(row["p95_wait_seconds"] is not None for row in rows.values())
+
+    out = io.StringIO()
+    call_command("dispatch_aijobs", stdout=out)
+    assert "dispatched 0 job(s)" in out.getvalue()
+
+    client = APIClient()
+    client.force_authenticate(User.objects.create_superuser("root"))
+    resp = client.get("/api/v1/jobs/scheduler/stats/")
+    assert resp.status_code == 200
+    assert {row["kind"] for row in resp.json()} == {"lesson"}